@@ -0,0 +1,79 @@
+"""
+Alembic 迁移环境
+
+数据库连接与应用共用 app.core.database.DATABASE_URL（SQLite 自动使用 aiosqlite 驱动），
+也可通过 `alembic -x database_url=...` 临时指定。迁移以异步引擎在线执行；
+每个版本单独一个事务，以便版本中可用 autocommit_block 执行 CREATE INDEX CONCURRENTLY。
+"""
+from logging.config import fileConfig
+import asyncio
+
+from alembic import context
+from sqlalchemy import Uuid, pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database import DATABASE_URL, Base
+import app.models  # noqa: F401  注册所有模型
+
+config = context.config
+
+# 应用内调用（init_db）时沿用应用的日志配置
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def get_database_url() -> str:
+    return context.get_x_argument(as_dictionary=True).get("database_url") or DATABASE_URL
+
+
+def compare_type(context, inspected_column, metadata_column, inspected_type, metadata_type):
+    """SQLite 将 UUID 列反射为 NUMERIC，忽略这一差异；其余交给默认比较"""
+    if context.dialect.name == "sqlite" and isinstance(metadata_type, Uuid):
+        return False
+    return None
+
+
+def configure_context(**kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        compare_type=compare_type,
+        # SQLite 不支持大部分 ALTER，使用批量模式（重建表）
+        render_as_batch=get_database_url().startswith("sqlite"),
+        transaction_per_migration=True,
+        **kwargs
+    )
+
+
+def run_migrations_offline() -> None:
+    """离线模式：输出 SQL 脚本而不连接数据库"""
+    configure_context(url=get_database_url(), literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    configure_context(connection=connection)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(get_database_url(), poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as connection:
+            await connection.run_sync(do_run_migrations)
+    finally:
+        await engine.dispose()
+
+
+def run_migrations_online() -> None:
+    asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,378 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 22:47:28.789318
+
+与当前模型一致的完整结构（等价于 Base.metadata.create_all 建出的库）。
+PostgreSQL 上 wheelset_measurements 为按 inspection_date 按月分区的表，并创建分区维护函数
+ensure_wheelset_measurement_partition 及当月起12个月的分区。
+热点表的二级索引通过 create_index_concurrently 创建，对已有数据的库重跑时也不阻塞读写。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import create_index_concurrently, drop_index_concurrently
+
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 热点表二级索引：(索引名, 表名, 列)
+HOT_INDEXES = [
+    ('idx_wear_trend_data_vehicle_component_date', 'wear_trend_data', ['vehicle_id', 'component_type', 'date']),
+    ('idx_wear_predictions_vehicle_created', 'wear_predictions', ['vehicle_id', 'created_at']),
+    ('idx_prediction_results_vehicle_created', 'prediction_results', ['vehicle_id', 'created_at']),
+    ('idx_wheelset_statistics_vehicle_inspection', 'wheelset_statistics', ['vehicle_id', 'inspection_date']),
+    ('idx_wheelset_statistics_inspection_id', 'wheelset_statistics', ['inspection_date', 'id']),
+    ('idx_overhaul_plans_planned_start_id', 'overhaul_plans', ['planned_start_date', 'id']),
+    ('idx_overhaul_items_plan', 'overhaul_items', ['overhaul_plan_id']),
+    ('idx_overhaul_spare_parts_plan', 'overhaul_spare_parts', ['overhaul_plan_id']),
+]
+
+ENUM_TYPES = ('overhaultype', 'overhaullevel', 'overhaulstatus')
+
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_wheelset_measurement_partition(month DATE)
+RETURNS VOID AS $$
+DECLARE
+    start_date DATE := date_trunc('month', month)::DATE;
+    end_date DATE := (date_trunc('month', month) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := 'wheelset_measurements_' || to_char(start_date, 'YYYY_MM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF wheelset_measurements FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_date, end_date
+    );
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CREATE_INITIAL_PARTITIONS = """
+SELECT ensure_wheelset_measurement_partition(month::DATE)
+FROM generate_series(
+    date_trunc('month', CURRENT_DATE),
+    date_trunc('month', CURRENT_DATE) + INTERVAL '12 months',
+    INTERVAL '1 month'
+) AS month
+"""
+
+
+def upgrade() -> None:
+    op.create_table('overhaul_standards',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('vehicle_type', sa.String(length=50), nullable=False),
+    sa.Column('overhaul_level', sa.Enum('A1', 'A2', 'A3', 'B1', 'B2', 'C1', 'C2', name='overhaullevel'), nullable=False),
+    sa.Column('mileage_interval', sa.Float(), nullable=True),
+    sa.Column('time_interval', sa.Integer(), nullable=True),
+    sa.Column('whichever_first', sa.String(length=5), nullable=True),
+    sa.Column('standard_duration_days', sa.Integer(), nullable=True),
+    sa.Column('required_items', sa.JSON(), nullable=True),
+    sa.Column('optional_items', sa.JSON(), nullable=True),
+    sa.Column('standard_cost_min', sa.Float(), nullable=True),
+    sa.Column('standard_cost_max', sa.Float(), nullable=True),
+    sa.Column('technical_requirements', sa.Text(), nullable=True),
+    sa.Column('quality_standards', sa.Text(), nullable=True),
+    sa.Column('acceptance_criteria', sa.Text(), nullable=True),
+    sa.Column('applicable_from', sa.Date(), nullable=True),
+    sa.Column('applicable_to', sa.Date(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('username', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('full_name', sa.String(length=255), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_superuser', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('vehicles',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('vehicle_code', sa.String(length=50), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('line_number', sa.String(length=20), nullable=False),
+    sa.Column('manufacture_date', sa.Date(), nullable=False),
+    sa.Column('commissioning_date', sa.Date(), nullable=False),
+    sa.Column('total_mileage', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('current_wear_values', sa.Text(), nullable=True),
+    sa.Column('last_inspection_date', sa.Date(), nullable=True),
+    sa.Column('next_maintenance_date', sa.Date(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('overhaul_plans',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('plan_code', sa.String(length=50), nullable=False),
+    sa.Column('vehicle_id', sa.UUID(), nullable=True),
+    sa.Column('train_number', sa.String(length=20), nullable=False),
+    sa.Column('overhaul_type', sa.Enum('SCHEDULED', 'EMERGENCY', 'UPGRADE', 'ACCIDENT', name='overhaultype'), nullable=False),
+    sa.Column('overhaul_level', sa.Enum('A1', 'A2', 'A3', 'B1', 'B2', 'C1', 'C2', name='overhaullevel'), nullable=False),
+    sa.Column('status', sa.Enum('PLANNING', 'APPROVED', 'IN_PROGRESS', 'SUSPENDED', 'COMPLETED', 'CANCELLED', name='overhaulstatus'), nullable=True),
+    sa.Column('planned_start_date', sa.Date(), nullable=False),
+    sa.Column('planned_end_date', sa.Date(), nullable=False),
+    sa.Column('actual_start_date', sa.Date(), nullable=True),
+    sa.Column('actual_end_date', sa.Date(), nullable=True),
+    sa.Column('mileage_at_overhaul', sa.Float(), nullable=True),
+    sa.Column('next_overhaul_mileage', sa.Float(), nullable=True),
+    sa.Column('estimated_cost', sa.Float(), nullable=True),
+    sa.Column('actual_cost', sa.Float(), nullable=True),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('contractor', sa.String(length=200), nullable=True),
+    sa.Column('workshop', sa.String(length=200), nullable=True),
+    sa.Column('responsible_person', sa.String(length=100), nullable=True),
+    sa.Column('contact_phone', sa.String(length=20), nullable=True),
+    sa.Column('approval_status', sa.String(length=50), nullable=True),
+    sa.Column('approved_by', sa.UUID(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('approval_notes', sa.Text(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('technical_requirements', sa.Text(), nullable=True),
+    sa.Column('safety_requirements', sa.Text(), nullable=True),
+    sa.Column('quality_standards', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=True),
+    sa.Column('updated_by', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['approved_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['updated_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('prediction_results',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('vehicle_id', sa.UUID(), nullable=False),
+    sa.Column('risk_level', sa.String(length=20), nullable=True),
+    sa.Column('overall_confidence', sa.Float(), nullable=False),
+    sa.Column('prediction_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('total_predictions', sa.Integer(), nullable=True),
+    sa.Column('maintenance_priority', sa.String(length=20), nullable=True),
+    sa.Column('next_maintenance_date', sa.Date(), nullable=True),
+    sa.Column('input_fingerprint', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('wear_predictions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('vehicle_id', sa.UUID(), nullable=False),
+    sa.Column('component_type', sa.String(length=50), nullable=False),
+    sa.Column('component_position', sa.String(length=50), nullable=False),
+    sa.Column('current_wear', sa.Float(), nullable=False),
+    sa.Column('predicted_wear', sa.Float(), nullable=False),
+    sa.Column('wear_rate', sa.Float(), nullable=False),
+    sa.Column('remaining_life_days', sa.Integer(), nullable=False),
+    sa.Column('remaining_life_mileage', sa.Float(), nullable=False),
+    sa.Column('replacement_date', sa.Date(), nullable=False),
+    sa.Column('confidence_score', sa.Float(), nullable=False),
+    sa.Column('prediction_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('prediction_horizon_days', sa.Integer(), nullable=True),
+    sa.Column('last_rewheeling_date', sa.Date(), nullable=True),
+    sa.Column('current_mileage', sa.Float(), nullable=True),
+    sa.Column('next_rewheeling_mileage', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('wear_trend_data',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('vehicle_id', sa.UUID(), nullable=False),
+    sa.Column('component_type', sa.String(length=50), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('wear_value', sa.Float(), nullable=False),
+    sa.Column('mileage', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('wheelset_measurements',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('inspection_date', sa.Date(), nullable=False),
+    sa.Column('vehicle_id', sa.UUID(), nullable=False),
+    sa.Column('wheelset_position', sa.String(length=20), nullable=False),
+    sa.Column('current_diameter', sa.Float(), nullable=False),
+    sa.Column('flange_thickness', sa.Float(), nullable=True),
+    sa.Column('flange_height', sa.Float(), nullable=True),
+    sa.Column('qr_value', sa.Float(), nullable=True),
+    sa.Column('mileage_at_measurement', sa.Float(), nullable=True),
+    sa.Column('last_rewheeling_date', sa.Date(), nullable=True),
+    sa.Column('next_rewheeling_mileage', sa.Float(), nullable=True),
+    sa.Column('wear_rate', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('inspector', sa.String(length=100), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id', 'inspection_date'),
+    postgresql_partition_by='RANGE (inspection_date)'
+    )
+    op.create_table('wheelset_statistics',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('vehicle_id', sa.UUID(), nullable=False),
+    sa.Column('wheelset_position', sa.String(length=20), nullable=False),
+    sa.Column('current_diameter', sa.Float(), nullable=False),
+    sa.Column('flange_thickness', sa.Float(), nullable=True),
+    sa.Column('flange_height', sa.Float(), nullable=True),
+    sa.Column('qr_value', sa.Float(), nullable=True),
+    sa.Column('mileage_at_measurement', sa.Float(), nullable=True),
+    sa.Column('last_rewheeling_date', sa.Date(), nullable=True),
+    sa.Column('next_rewheeling_mileage', sa.Float(), nullable=True),
+    sa.Column('wear_rate', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('inspection_date', sa.Date(), nullable=False),
+    sa.Column('inspector', sa.String(length=100), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('vehicle_id', 'wheelset_position', name='uq_wheelset_statistics_vehicle_position')
+    )
+    op.create_table('overhaul_items',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('overhaul_plan_id', sa.UUID(), nullable=True),
+    sa.Column('item_code', sa.String(length=50), nullable=False),
+    sa.Column('item_name', sa.String(length=200), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('carriage_number', sa.String(length=50), nullable=True),
+    sa.Column('component_type', sa.String(length=100), nullable=True),
+    sa.Column('work_content', sa.Text(), nullable=True),
+    sa.Column('technical_standard', sa.Text(), nullable=True),
+    sa.Column('inspection_method', sa.String(length=200), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('progress_percentage', sa.Integer(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('quality_check_status', sa.String(length=50), nullable=True),
+    sa.Column('quality_inspector', sa.String(length=100), nullable=True),
+    sa.Column('quality_check_date', sa.Date(), nullable=True),
+    sa.Column('quality_notes', sa.Text(), nullable=True),
+    sa.Column('labor_hours', sa.Float(), nullable=True),
+    sa.Column('material_cost', sa.Float(), nullable=True),
+    sa.Column('labor_cost', sa.Float(), nullable=True),
+    sa.Column('total_cost', sa.Float(), nullable=True),
+    sa.Column('spare_parts_used', sa.JSON(), nullable=True),
+    sa.Column('old_parts_disposal', sa.String(length=200), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['overhaul_plan_id'], ['overhaul_plans.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('overhaul_records',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('overhaul_plan_id', sa.UUID(), nullable=True),
+    sa.Column('vehicle_id', sa.UUID(), nullable=True),
+    sa.Column('train_number', sa.String(length=20), nullable=False),
+    sa.Column('overhaul_level', sa.Enum('A1', 'A2', 'A3', 'B1', 'B2', 'C1', 'C2', name='overhaullevel'), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('duration_days', sa.Integer(), nullable=True),
+    sa.Column('mileage_before', sa.Float(), nullable=True),
+    sa.Column('mileage_after', sa.Float(), nullable=True),
+    sa.Column('mileage_interval', sa.Float(), nullable=True),
+    sa.Column('total_cost', sa.Float(), nullable=True),
+    sa.Column('labor_cost', sa.Float(), nullable=True),
+    sa.Column('material_cost', sa.Float(), nullable=True),
+    sa.Column('spare_parts_cost', sa.Float(), nullable=True),
+    sa.Column('quality_score', sa.Integer(), nullable=True),
+    sa.Column('performance_improvement', sa.Text(), nullable=True),
+    sa.Column('problems_found', sa.Text(), nullable=True),
+    sa.Column('solutions_applied', sa.Text(), nullable=True),
+    sa.Column('report_url', sa.String(length=500), nullable=True),
+    sa.Column('photos', sa.JSON(), nullable=True),
+    sa.Column('documents', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['overhaul_plan_id'], ['overhaul_plans.id'], ),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('overhaul_spare_parts',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('overhaul_plan_id', sa.UUID(), nullable=True),
+    sa.Column('part_number', sa.String(length=100), nullable=False),
+    sa.Column('part_name', sa.String(length=200), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('manufacturer', sa.String(length=200), nullable=True),
+    sa.Column('planned_quantity', sa.Integer(), nullable=False),
+    sa.Column('actual_quantity', sa.Integer(), nullable=True),
+    sa.Column('unit', sa.String(length=20), nullable=True),
+    sa.Column('unit_price', sa.Float(), nullable=True),
+    sa.Column('total_price', sa.Float(), nullable=True),
+    sa.Column('stock_quantity', sa.Integer(), nullable=True),
+    sa.Column('warehouse_location', sa.String(length=100), nullable=True),
+    sa.Column('purchase_order_no', sa.String(length=100), nullable=True),
+    sa.Column('supplier', sa.String(length=200), nullable=True),
+    sa.Column('delivery_date', sa.Date(), nullable=True),
+    sa.Column('quality_certificate', sa.String(length=200), nullable=True),
+    sa.Column('warranty_period', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['overhaul_plan_id'], ['overhaul_plans.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_index(op.f('ix_vehicles_vehicle_code'), 'vehicles', ['vehicle_code'], unique=True)
+    op.create_index(op.f('ix_overhaul_plans_plan_code'), 'overhaul_plans', ['plan_code'], unique=True)
+    # 分区表上的索引自动作用于每个分区（分区父表不支持 CONCURRENTLY）
+    op.create_index(
+        'idx_wheelset_measurements_vehicle_position_date', 'wheelset_measurements',
+        ['vehicle_id', 'wheelset_position', 'inspection_date'], unique=False
+    )
+
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute(ENSURE_PARTITION_FUNCTION)
+        op.execute(CREATE_INITIAL_PARTITIONS)
+
+    for index_name, table_name, columns in HOT_INDEXES:
+        create_index_concurrently(index_name, table_name, columns)
+
+
+def downgrade() -> None:
+    for index_name, table_name, _ in reversed(HOT_INDEXES):
+        drop_index_concurrently(index_name, table_name)
+
+    is_postgresql = op.get_context().dialect.name == 'postgresql'
+    if is_postgresql:
+        # 删除分区父表会一并删除所有分区
+        op.execute('DROP FUNCTION IF EXISTS ensure_wheelset_measurement_partition(DATE)')
+
+    op.drop_index('idx_wheelset_measurements_vehicle_position_date', table_name='wheelset_measurements')
+    op.drop_index(op.f('ix_overhaul_plans_plan_code'), table_name='overhaul_plans')
+    op.drop_index(op.f('ix_vehicles_vehicle_code'), table_name='vehicles')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+
+    op.drop_table('overhaul_spare_parts')
+    op.drop_table('overhaul_records')
+    op.drop_table('overhaul_items')
+    op.drop_table('wheelset_statistics')
+    op.drop_table('wheelset_measurements')
+    op.drop_table('wear_trend_data')
+    op.drop_table('wear_predictions')
+    op.drop_table('prediction_results')
+    op.drop_table('overhaul_plans')
+    op.drop_table('vehicles')
+    op.drop_table('users')
+    op.drop_table('overhaul_standards')
+
+    if is_postgresql:
+        for enum_name in ENUM_TYPES:
+            sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,25 @@
+"""wear trend created_at index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 23:20:05.412873
+
+磨耗特征库按 created_at 水位线增量读取 wear_trend_data，预测时也按水位线补查新写入的行。
+"""
+from typing import Sequence, Union
+
+from app.core.migrations import create_index_concurrently, drop_index_concurrently
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index_concurrently('idx_wear_trend_data_created_at', 'wear_trend_data', ['created_at'])
+
+
+def downgrade() -> None:
+    drop_index_concurrently('idx_wear_trend_data_created_at', 'wear_trend_data')
@@ -2,7 +2,7 @@
 大修管理API端点
 Overhaul Management API Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_
 from typing import List, Optional
@@ -25,9 +25,14 @@ from app.schemas.overhaul import (
     OverhaulPlanQuery, OverhaulStatistics,
     OverhaulStatus, OverhaulType, OverhaulLevel
 )
+from app.services.dashboard_service import DashboardService
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, paginate_keyset, split_page
 
 router = APIRouter(prefix="/api/v1/overhaul", tags=["overhaul"])
 
+# 大修计划列表排序键（游标分页）
+OVERHAUL_PLAN_SORT_KEY = (OverhaulPlan.planned_start_date, OverhaulPlan.id)
+
 
 # ===================== Overhaul Plans =====================
 
@@ -76,6 +81,7 @@ async def create_overhaul_plan(
 
     await db.commit()
     await db.refresh(db_plan)
+    DashboardService.invalidate()
 
     # 加载关联数据
     result = await db.execute(
@@ -95,15 +101,39 @@ async def create_overhaul_plan(
 
 @router.get("/plans", response_model=List[OverhaulPlanResponse])
 async def get_overhaul_plans(
+    http_response: Response,
     query: OverhaulPlanQuery = Depends(),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取大修计划列表"""
-    stmt = select(OverhaulPlan).options(
-        selectinload(OverhaulPlan.items),
-        selectinload(OverhaulPlan.spare_parts)
-    )
+    """
+    获取大修计划列表
+
+    默认为汇总模式：检修项目数和平均进度由SQL聚合子查询计算，不加载检修项目和备件明细；
+    summary=false 时加载完整明细（明细通常通过 /plans/{plan_id} 获取）。
+    """
+    if query.summary:
+        item_count = (
+            select(func.count(OverhaulItem.id))
+            .where(OverhaulItem.overhaul_plan_id == OverhaulPlan.id)
+            .correlate(OverhaulPlan)
+            .scalar_subquery()
+        )
+        average_progress = (
+            select(func.avg(func.coalesce(OverhaulItem.progress_percentage, 0)))
+            .where(OverhaulItem.overhaul_plan_id == OverhaulPlan.id)
+            .correlate(OverhaulPlan)
+            .scalar_subquery()
+        )
+        stmt = select(OverhaulPlan, item_count, average_progress).options(
+            noload(OverhaulPlan.items),
+            noload(OverhaulPlan.spare_parts)
+        )
+    else:
+        stmt = select(OverhaulPlan).options(
+            selectinload(OverhaulPlan.items),
+            selectinload(OverhaulPlan.spare_parts)
+        )
 
     # 应用过滤条件
     filters = []
@@ -127,17 +157,38 @@ async def get_overhaul_plans(
     if filters:
         stmt = stmt.where(and_(*filters))
 
-    # 分页
-    stmt = stmt.offset((query.page - 1) * query.limit).limit(query.limit)
-    stmt = stmt.order_by(OverhaulPlan.planned_start_date.desc())
+    if query.include_total:
+        total = (await db.execute(
+            select(func.count()).select_from(OverhaulPlan).where(*filters)
+        )).scalar_one()
+        http_response.headers[TOTAL_COUNT_HEADER] = str(total)
+
+    # 分页：计划开始日期倒序，提供游标时按游标翻页
+    try:
+        stmt = paginate_keyset(
+            stmt, OVERHAUL_PLAN_SORT_KEY, query.limit, cursor=query.cursor,
+            descending=True, skip=(query.page - 1) * query.limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     result = await db.execute(stmt)
-    plans = result.scalars().all()
+    if query.summary:
+        rows = result.all()
+        aggregates = {plan.id: (count, progress) for plan, count, progress in rows}
+        plans, next_cursor = split_page([row[0] for row in rows], query.limit, OVERHAUL_PLAN_SORT_KEY)
+    else:
+        plans, next_cursor = split_page(result.scalars().all(), query.limit, OVERHAUL_PLAN_SORT_KEY)
+    if next_cursor:
+        http_response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     responses = []
     for plan in plans:
         response = OverhaulPlanResponse.from_orm(plan)
-        response.calculate_fields()
+        if query.summary:
+            response.calculate_fields(*aggregates[plan.id])
+        else:
+            response.calculate_fields()
         responses.append(response)
 
     return responses
@@ -206,6 +257,7 @@ async def update_overhaul_plan(
 
     await db.commit()
     await db.refresh(plan)
+    DashboardService.invalidate()
 
     # 重新加载关联数据
     result = await db.execute(
@@ -250,6 +302,7 @@ async def delete_overhaul_plan(
 
     await db.delete(plan)
     await db.commit()
+    DashboardService.invalidate()
 
     return {"message": "Overhaul plan deleted successfully"}
 
@@ -517,10 +570,8 @@ async def get_overhaul_statistics(
     current_user: User = Depends(get_current_user)
 ):
     """获取大修统计信息"""
-    # 基础查询
-    stmt = select(OverhaulPlan)
-
     # 时间过滤
+    period_filters = []
     if year:
         start_date = date(year, month or 1, 1)
         if month:
@@ -532,64 +583,72 @@ async def get_overhaul_statistics(
             # 整年
             end_date = date(year, 12, 31)
 
-        stmt = stmt.where(
+        period_filters = [
             OverhaulPlan.planned_start_date >= start_date,
             OverhaulPlan.planned_start_date <= end_date
-        )
-
-    result = await db.execute(stmt)
-    plans = result.scalars().all()
-
-    # 计算统计数据
-    stats = OverhaulStatistics()
-    stats.total_plans = len(plans)
-
-    for plan in plans:
-        # 状态统计
-        if plan.status == OverhaulStatus.PLANNING:
-            stats.planning += 1
-        elif plan.status == OverhaulStatus.IN_PROGRESS:
-            stats.in_progress += 1
-        elif plan.status == OverhaulStatus.COMPLETED:
-            stats.completed += 1
-
-        # 成本统计
-        if plan.actual_cost:
-            stats.total_cost += plan.actual_cost
-
-        # 级别统计
-        level = plan.overhaul_level.value
-        stats.by_level[level] = stats.by_level.get(level, 0) + 1
-
-        # 类型统计
-        type_name = plan.overhaul_type.value
-        stats.by_type[type_name] = stats.by_type.get(type_name, 0) + 1
-
-    # 计算平均工期
-    completed_plans = [p for p in plans if p.status == OverhaulStatus.COMPLETED]
-    if completed_plans:
-        total_duration = sum(
-            (p.actual_end_date - p.actual_start_date).days
-            for p in completed_plans
-            if p.actual_start_date and p.actual_end_date
-        )
-        stats.average_duration = total_duration / len(completed_plans)
-
-        # 计算准时率
-        on_time = sum(
-            1 for p in completed_plans
-            if p.actual_end_date <= p.planned_end_date
-        )
-        stats.on_time_rate = (on_time / len(completed_plans)) * 100
+        ]
 
-        # 计算成本偏差率
-        with_cost = [p for p in completed_plans if p.estimated_cost and p.actual_cost]
-        if with_cost:
-            total_variance = sum(
-                (p.actual_cost - p.estimated_cost) / p.estimated_cost * 100
-                for p in with_cost
-            )
-            stats.cost_variance_rate = total_variance / len(with_cost)
+    # 汇总统计：单次聚合查询
+    is_completed = OverhaulPlan.status == OverhaulStatus.COMPLETED
+    has_actual_dates = and_(
+        OverhaulPlan.actual_start_date.isnot(None),
+        OverhaulPlan.actual_end_date.isnot(None)
+    )
+    has_costs = and_(
+        OverhaulPlan.estimated_cost.isnot(None), OverhaulPlan.estimated_cost != 0,
+        OverhaulPlan.actual_cost.isnot(None), OverhaulPlan.actual_cost != 0
+    )
+    duration_days = _date_diff_days(
+        db.bind.dialect.name, OverhaulPlan.actual_end_date, OverhaulPlan.actual_start_date
+    )
+    summary_stmt = select(
+        func.count(),
+        func.count().filter(OverhaulPlan.status == OverhaulStatus.PLANNING),
+        func.count().filter(OverhaulPlan.status == OverhaulStatus.IN_PROGRESS),
+        func.count().filter(is_completed),
+        func.coalesce(func.sum(OverhaulPlan.actual_cost), 0),
+        func.coalesce(func.sum(duration_days).filter(and_(is_completed, has_actual_dates)), 0),
+        func.count().filter(and_(is_completed, OverhaulPlan.actual_end_date <= OverhaulPlan.planned_end_date)),
+        func.avg(
+            (OverhaulPlan.actual_cost - OverhaulPlan.estimated_cost) / OverhaulPlan.estimated_cost * 100
+        ).filter(and_(is_completed, has_costs))
+    ).select_from(OverhaulPlan)
+    if period_filters:
+        summary_stmt = summary_stmt.where(*period_filters)
+
+    (
+        total_plans, planning, in_progress, completed, total_cost,
+        total_duration, on_time, cost_variance_rate
+    ) = (await db.execute(summary_stmt)).one()
+
+    stats = OverhaulStatistics(
+        total_plans=total_plans,
+        planning=planning,
+        in_progress=in_progress,
+        completed=completed,
+        total_cost=float(total_cost)
+    )
+    if completed:
+        # 平均工期的分母与原有口径一致：全部已完成计划
+        stats.average_duration = float(total_duration) / completed
+        stats.on_time_rate = (on_time / completed) * 100
+        if cost_variance_rate is not None:
+            stats.cost_variance_rate = float(cost_variance_rate)
+
+    # 级别/类型分布：单次分组查询
+    group_stmt = select(
+        OverhaulPlan.overhaul_level, OverhaulPlan.overhaul_type, func.count()
+    ).group_by(OverhaulPlan.overhaul_level, OverhaulPlan.overhaul_type)
+    if period_filters:
+        group_stmt = group_stmt.where(*period_filters)
+
+    by_level = {}
+    by_type = {}
+    for level, type_, count in (await db.execute(group_stmt)).all():
+        by_level[level.value] = by_level.get(level.value, 0) + count
+        by_type[type_.value] = by_type.get(type_.value, 0) + count
+    stats.by_level = by_level
+    stats.by_type = by_type
 
     # 获取即将到来的计划
     upcoming_stmt = select(OverhaulPlan).where(
@@ -615,5 +674,13 @@ async def get_overhaul_statistics(
     return stats
 
 
+def _date_diff_days(dialect_name: str, end_column, start_column):
+    """两个日期列相差的天数（SQL表达式）"""
+    if dialect_name == "sqlite":
+        return func.julianday(end_column) - func.julianday(start_column)
+    # PostgreSQL: date - date 结果为整数天数
+    return end_column - start_column
+
+
 # 添加必要的导入到文件顶部
-from sqlalchemy.orm import selectinload
\ No newline at end of file
+from sqlalchemy.orm import noload, selectinload
\ No newline at end of file
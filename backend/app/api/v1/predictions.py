@@ -1,16 +1,28 @@
 """预测相关API"""
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, File, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import AsyncIterator, List, Literal, Optional
 from datetime import date, datetime
+import json
+import os
 import random
+import numpy as np
 from uuid import UUID
 
+from app.config import settings
 from app.core.database import get_db
-from app.schemas.prediction import PredictionRequest, PredictionResponse, BatchPredictionRequest, WearTrendData
+from app.schemas.prediction import PredictionRequest, PredictionResponse, BatchPredictionRequest, WearTrendData, PredictionJobRequest, PredictionJobStatus, LatestPredictionView, BulkTrendRequest, BulkTrendResponse, TrendSeries, WearTrendImportReport, WearModelInfo, WearModelRegistryStatus, WearModelTrainRequest, FeatureStoreStatus, LifeDistributionRequest, LifeDistributionResponse
+from app.ml.model_registry import wear_model_registry
+from app.services.feature_store_service import FeatureStoreService
+from app.services.prediction_engine import LIFE_QUANTILES
 from app.services.prediction_service import PredictionService
+from app.services.vehicle_resolver import vehicle_resolver
+from app.services.wear_trend_import_service import WearTrendImportService
+from app.tasks.prediction_jobs import prediction_job_runner
+from app.utils.downsampling import lttb_indices
 from app.models.vehicle import Vehicle
 from app.models.prediction import WearTrendData as WearTrendDataModel
 
@@ -25,7 +37,7 @@ async def predict_single_vehicle(
     """单车磨耗预测"""
     try:
         predictions, risk_level, overall_confidence, recommendations = await PredictionService.calculate_prediction(
-            db, request.vehicle_id, request.prediction_horizon_days
+            db, request.vehicle_id, request.prediction_horizon_days, request.incremental
         )
 
         return PredictionResponse(
@@ -42,29 +54,39 @@ async def predict_single_vehicle(
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
 @router.post("/batch")
 async def predict_batch_vehicles(
     request: BatchPredictionRequest,
-    db: AsyncSession = Depends(get_db)
+    http_request: Request,
+    stream: bool = Query(False, description="以NDJSON逐行流式返回")
 ):
-    """批量车辆预测"""
+    """批量车辆预测（多会话并发执行，返回失败车辆及原因）"""
+    prediction_date = datetime.now()
+    outcomes = PredictionService.iter_batch_predictions(
+        request.vehicle_ids, request.prediction_horizon_days, incremental=request.incremental
+    )
+
+    if stream or NDJSON_MEDIA_TYPE in http_request.headers.get("accept", ""):
+        return StreamingResponse(
+            _stream_batch_predictions(outcomes, prediction_date),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+
     results = []
-    for vehicle_id in request.vehicle_ids:
-        try:
-            # 为每辆车进行预测
-            single_request = PredictionRequest(
-                vehicle_id=vehicle_id,
-                prediction_horizon_days=request.prediction_horizon_days
-            )
-            result = await predict_single_vehicle(single_request, db)
-            results.append(result)
-        except Exception:
-            # 如果某辆车预测失败，记录错误但继续处理其他车辆
+    failed = []
+    async for vehicle_id, outcome, error in outcomes:
+        if error:
+            failed.append({"vehicle_id": vehicle_id, "error": error})
             continue
+        results.append(_build_prediction_response(vehicle_id, outcome, prediction_date))
 
     return {
         "total": len(results),
         "predictions": results,
+        "failed": failed,
         "summary": {
             "high_risk": sum(1 for r in results if r.risk_level == "high"),
             "medium_risk": sum(1 for r in results if r.risk_level == "medium"),
@@ -73,45 +95,240 @@ async def predict_batch_vehicles(
     }
 
 
+def _build_prediction_response(vehicle_id: str, outcome: tuple, prediction_date: datetime) -> PredictionResponse:
+    """将批量预测结果元组转换为响应模型"""
+    predictions, risk_level, overall_confidence, recommendations = outcome
+    return PredictionResponse(
+        vehicle_id=vehicle_id,
+        prediction_date=prediction_date,
+        risk_level=risk_level,
+        overall_confidence=overall_confidence,
+        predictions=predictions,
+        maintenance_recommendations=recommendations
+    )
+
+
+async def _stream_batch_predictions(outcomes, prediction_date: datetime) -> AsyncIterator[str]:
+    """
+    逐行输出批量预测结果（NDJSON）
+
+    每辆车完成即输出一行 {"type": "prediction", ...} 或 {"type": "error", ...}，
+    最后一行为 {"type": "summary", ...} 风险汇总，内存中只保留计数。
+    """
+    total = 0
+    failed = 0
+    risk_counts = {"high_risk": 0, "medium_risk": 0, "low_risk": 0}
+    async for vehicle_id, outcome, error in outcomes:
+        if error:
+            failed += 1
+            yield json.dumps({"type": "error", "vehicle_id": vehicle_id, "error": error}, ensure_ascii=False) + "\n"
+            continue
+        response = _build_prediction_response(vehicle_id, outcome, prediction_date)
+        total += 1
+        risk_key = f"{response.risk_level}_risk"
+        if risk_key in risk_counts:
+            risk_counts[risk_key] += 1
+        yield json.dumps({"type": "prediction", **response.model_dump(mode="json")}, ensure_ascii=False) + "\n"
+
+    yield json.dumps({"type": "summary", "total": total, "failed": failed, "summary": risk_counts}) + "\n"
+
+
+@router.post("/distribution", response_model=LifeDistributionResponse)
+async def predict_life_distribution(request: LifeDistributionRequest, db: AsyncSession = Depends(get_db)):
+    """概率预测：剩余寿命 P10/P50/P90 分位数（蒙特卡洛抽样，不写入预测记录）"""
+    n_samples = request.n_samples or settings.LIFE_DISTRIBUTION_SAMPLES
+    distributions, not_found = await PredictionService.calculate_life_distribution(
+        db, request.vehicle_ids, request.prediction_horizon_days, n_samples, request.seed
+    )
+    return LifeDistributionResponse(
+        quantiles=list(LIFE_QUANTILES),
+        n_samples=n_samples,
+        prediction_horizon_days=request.prediction_horizon_days,
+        distributions=distributions,
+        not_found=not_found
+    )
+
+
+@router.get("/vehicles/{vehicle_id}/latest", response_model=LatestPredictionView)
+async def get_latest_prediction(vehicle_id: str, db: AsyncSession = Depends(get_db)):
+    """获取车辆最新预测结果（带缓存）"""
+    uuid_vehicle_id = await vehicle_resolver.resolve(db, vehicle_id)
+    if uuid_vehicle_id is None:
+        raise HTTPException(status_code=404, detail=f"Vehicle with ID or code {vehicle_id} not found")
+
+    view = await PredictionService.get_latest_prediction_view(db, uuid_vehicle_id)
+    if view is None:
+        raise HTTPException(status_code=404, detail=f"No prediction found for vehicle {vehicle_id}")
+    return view
+
+
+@router.post("/jobs", response_model=PredictionJobStatus, status_code=202)
+async def create_prediction_job(request: PredictionJobRequest):
+    """提交车队/线路预测后台任务"""
+    job = await prediction_job_runner.submit(request.model_dump())
+    return _build_job_status(job)
+
+
+@router.get("/jobs/{job_id}", response_model=PredictionJobStatus)
+async def get_prediction_job(job_id: str):
+    """查询预测任务进度和结果"""
+    job = await prediction_job_runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Prediction job not found")
+    return _build_job_status(job)
+
+
+def _build_job_status(job: dict) -> PredictionJobStatus:
+    """将任务记录转换为响应模型"""
+    progress = round(job["processed"] / job["total"] * 100, 2) if job["total"] else 0.0
+    return PredictionJobStatus(
+        **{key: value for key, value in job.items() if key in PredictionJobStatus.model_fields},
+        progress=progress
+    )
+
+
+@router.get("/model", response_model=WearModelRegistryStatus)
+async def get_wear_model_status():
+    """查看磨耗模型注册表：当前版本、已加载模型参数和可用版本"""
+    model = wear_model_registry.get()
+    return WearModelRegistryStatus(
+        active_version=wear_model_registry.active_version(),
+        loaded=WearModelInfo(**model.summary()) if model else None,
+        versions=wear_model_registry.list_versions()
+    )
+
+
+@router.post("/model/train", response_model=WearModelInfo, status_code=201)
+async def train_wear_model(request: WearModelTrainRequest, db: AsyncSession = Depends(get_db)):
+    """用全车队趋势历史训练新版本磨耗模型（activate=True 时立即生效）"""
+    if request.version and request.version in wear_model_registry.list_versions():
+        raise HTTPException(status_code=409, detail=f"Model version {request.version} already exists")
+    model = await PredictionService.train_wear_model(db, request.version, request.activate)
+    return WearModelInfo(**model.summary())
+
+
+@router.post("/model/activate/{version}", response_model=WearModelRegistryStatus)
+async def activate_wear_model(version: str):
+    """切换当前生效的模型版本，各 worker 在下一次版本检查时热加载"""
+    try:
+        wear_model_registry.activate(version)
+    except (FileNotFoundError, ValueError):
+        raise HTTPException(status_code=404, detail=f"Model version {version} not found")
+    return await get_wear_model_status()
+
+
+@router.get("/features", response_model=FeatureStoreStatus)
+async def get_feature_store_status():
+    """查看磨耗特征库状态：当前数据版本、水位线和数据量"""
+    return FeatureStoreStatus(**FeatureStoreService.get_status())
+
+
+@router.post("/features/refresh", response_model=FeatureStoreStatus)
+async def refresh_feature_store(full: bool = Query(False, description="全量重建"), db: AsyncSession = Depends(get_db)):
+    """按水位线增量刷新磨耗特征库（full=True 时全量重建）"""
+    await FeatureStoreService.refresh(db, full)
+    return FeatureStoreStatus(**FeatureStoreService.get_status())
+
+
+@router.post("/trends/bulk", response_model=BulkTrendResponse)
+async def get_bulk_wear_trends(request: BulkTrendRequest, db: AsyncSession = Depends(get_db)):
+    """批量获取多车多部件磨耗趋势（列式返回，一次查询）"""
+    resolved_ids = await vehicle_resolver.resolve_many(db, request.vehicle_ids)
+    vehicle_codes = await vehicle_resolver.codes_for(db, list(set(resolved_ids.values())))
+    found = {
+        identifier: vehicle_id for identifier, vehicle_id in resolved_ids.items()
+        if vehicle_id in vehicle_codes
+    }
+    uuid_vehicle_ids = list({found[key]: None for key in request.vehicle_ids if key in found})
+
+    series = await PredictionService.get_wear_trend_series_bulk(
+        db, uuid_vehicle_ids, request.component_types, request.days, request.bucket
+    )
+
+    # 按请求的车辆顺序、部件顺序分组返回
+    return BulkTrendResponse(
+        series=[
+            TrendSeries(
+                vehicle_id=vehicle_id,
+                vehicle_code=vehicle_codes[vehicle_id],
+                component_type=component_type,
+                **series[(vehicle_id, component_type)]
+            )
+            for vehicle_id in uuid_vehicle_ids
+            for component_type in dict.fromkeys(request.component_types)
+            if (vehicle_id, component_type) in series
+        ],
+        not_found=[vehicle_id for vehicle_id in request.vehicle_ids if vehicle_id not in found]
+    )
+
+
+@router.post("/trends/import", response_model=WearTrendImportReport)
+async def import_wear_trend_data(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+    """
+    批量导入磨耗趋势数据（CSV/Excel）
+
+    表头需包含 vehicle_code（或 vehicle_id）、component_type、date、wear_value、mileage，
+    也支持对应的中文表头；不合格行在报告中列出行号和原因，其余行正常导入。
+    """
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    if extension not in settings.ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unsupported file type: {extension or 'unknown'}")
+    size = file.size
+    if size is None:
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)
+    if size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    try:
+        report = await WearTrendImportService.import_file(db, file.file, extension)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return WearTrendImportReport(**report)
+
+
 @router.get("/trends")
 async def get_wear_trends(
     vehicle_id: str,
     component_type: str,
     days: int = 90,
+    bucket: Optional[Literal["day", "week", "month"]] = Query(None, description="按日/周/月在数据库中聚合"),
+    max_points: Optional[int] = Query(None, ge=3, le=10000, description="最多返回点数（LTTB降采样）"),
     db: AsyncSession = Depends(get_db)
 ):
     """获取磨耗趋势"""
-    from uuid import UUID as uuid_lib
-    from sqlalchemy import select
-    
-    try:
-        # 尝试将vehicle_id转换为UUID
-        uuid_vehicle_id = uuid_lib(vehicle_id)
-    except ValueError:
-        # 如果不是UUID格式，尝试通过vehicle_code查找
-        vehicle_result = await db.execute(
-            select(Vehicle).where(Vehicle.vehicle_code == vehicle_id)
+    uuid_vehicle_id = await vehicle_resolver.resolve(db, vehicle_id)
+    if uuid_vehicle_id is None:
+        raise HTTPException(status_code=404, detail=f"Vehicle with ID or code {vehicle_id} not found")
+
+    if bucket:
+        # 数据库端聚合，每个桶一行
+        result = await PredictionService.get_wear_trend_buckets(
+            db, uuid_vehicle_id, component_type, days, bucket
         )
-        vehicle = vehicle_result.scalar_one_or_none()
-        if not vehicle:
-            raise HTTPException(status_code=404, detail=f"Vehicle with ID or code {vehicle_id} not found")
-        uuid_vehicle_id = vehicle.id
-
-    # 获取数据库中的趋势数据
-    trend_data = await PredictionService.get_wear_trend_data(
-        db, uuid_vehicle_id, component_type, days
-    )
+    else:
+        # 获取数据库中的趋势数据
+        trend_data = await PredictionService.get_wear_trend_data(
+            db, uuid_vehicle_id, component_type, days
+        )
+
+        # 以字典格式返回数据
+        result = []
+        for trend in trend_data:
+            result.append({
+                "id": str(trend.id),
+                "vehicle_id": str(trend.vehicle_id),
+                "component_type": trend.component_type,
+                "date": trend.date.isoformat(),
+                "wear_value": trend.wear_value,
+                "mileage": trend.mileage
+            })
+
+    if max_points and len(result) > max_points:
+        # 以日期序号为横轴、磨耗值为纵轴做LTTB降采样，保留曲线形态
+        x = np.array([date.fromisoformat(point["date"]).toordinal() for point in result], dtype=np.float64)
+        y = np.array([point["wear_value"] for point in result], dtype=np.float64)
+        result = [result[i] for i in lttb_indices(x, y, max_points)]
 
-    # 以字典格式返回数据
-    result = []
-    for trend in trend_data:
-        result.append({
-            "id": str(trend.id),
-            "vehicle_id": str(trend.vehicle_id),
-            "component_type": trend.component_type,
-            "date": trend.date.isoformat(),
-            "wear_value": trend.wear_value,
-            "mileage": trend.mileage
-        })
-
-    return result
\ No newline at end of file
+    return result
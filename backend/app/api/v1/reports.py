@@ -1,11 +1,17 @@
 """报表相关API"""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import date, datetime
 import random
 
+from app.core.auth import get_current_active_superuser
+from app.core.database import get_db
+from app.models.user import User
+from app.services.dashboard_service import DashboardService
+
 router = APIRouter()
 
 
@@ -19,61 +25,22 @@ class DashboardData(BaseModel):
     upcoming_maintenance: List[dict]
     risk_distribution: dict
     recent_alerts: List[dict]
+    generated_at: Optional[datetime] = None
 
 
 @router.get("/dashboard", response_model=DashboardData)
-async def get_dashboard_data():
-    """获取仪表板数据"""
-
-    return DashboardData(
-        total_vehicles=125,
-        active_vehicles=118,
-        vehicles_in_maintenance=7,
-        high_risk_vehicles=12,
-        total_predictions=450,
-        average_mileage=156000,
-        upcoming_maintenance=[
-            {
-                "vehicle_id": "SH-01-001",
-                "date": date(2024, 2, 15).isoformat(),
-                "type": "制动片更换",
-                "priority": "high"
-            },
-            {
-                "vehicle_id": "SH-02-005",
-                "date": date(2024, 2, 18).isoformat(),
-                "type": "轮对镟修",
-                "priority": "medium"
-            },
-            {
-                "vehicle_id": "SH-03-012",
-                "date": date(2024, 2, 20).isoformat(),
-                "type": "受电弓检查",
-                "priority": "low"
-            }
-        ],
-        risk_distribution={
-            "critical": 2,
-            "high": 10,
-            "medium": 25,
-            "low": 45,
-            "minimal": 43
-        },
-        recent_alerts=[
-            {
-                "time": datetime.now().isoformat(),
-                "level": "warning",
-                "message": "车辆SH-01-001制动片磨耗接近阈值",
-                "vehicle_id": "SH-01-001"
-            },
-            {
-                "time": datetime.now().isoformat(),
-                "level": "info",
-                "message": "完成车辆SH-09-008定期检查",
-                "vehicle_id": "SH-09-008"
-            }
-        ]
-    )
+async def get_dashboard_data(db: AsyncSession = Depends(get_db)):
+    """获取仪表板数据（来自定期刷新的聚合快照）"""
+    return await DashboardService.get_dashboard(db)
+
+
+@router.post("/dashboard/refresh", response_model=DashboardData)
+async def refresh_dashboard_data(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """忽略快照强制重新计算仪表板数据（仅超级管理员）"""
+    return await DashboardService.get_dashboard(db, force_refresh=True)
 
 
 @router.get("/statistics")
@@ -17,9 +17,10 @@ router = APIRouter()
 
 class VehicleList(BaseModel):
     items: List[VehicleSchema]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 @router.get("/", response_model=VehicleList)
@@ -28,21 +29,28 @@ async def get_vehicles(
     page_size: int = Query(20, ge=1, le=100),
     line_number: Optional[str] = None,
     status: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor，提供时忽略 page"),
+    include_total: bool = Query(True, description="是否统计总数"),
     db: AsyncSession = Depends(get_db)
 ):
     """获取车辆列表"""
     skip = (page - 1) * page_size
     
-    vehicles, total = await VehicleService.get_vehicles(
-        db, skip=skip, limit=page_size, 
-        line_number=line_number, status=status
-    )
+    try:
+        vehicles, total, next_cursor = await VehicleService.get_vehicles(
+            db, skip=skip, limit=page_size, 
+            line_number=line_number, status=status,
+            cursor=cursor, with_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return VehicleList(
         items=vehicles,
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
@@ -1,13 +1,19 @@
 """轮对统计相关API"""
 
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import date
 from uuid import UUID
 
 from app.core.database import get_db
-from app.schemas.wheelset_statistics import WheelsetStatistics, WheelsetStatisticsCreate, WheelsetStatisticsUpdate
+from app.schemas.wheelset_statistics import (
+    WheelsetStatistics, WheelsetStatisticsCreate, WheelsetStatisticsUpdate,
+    WheelsetStatisticsBulkUpsert, WheelsetStatisticsBulkUpsertResponse, WheelsetMeasurement
+)
+from app.services.vehicle_resolver import vehicle_resolver
 from app.services.wheelset_statistics_service import WheelsetStatisticsService
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
 
 
 router = APIRouter(prefix="/wheelset-statistics", tags=["wheelset-statistics"])
@@ -15,30 +21,69 @@ router = APIRouter(prefix="/wheelset-statistics", tags=["wheelset-statistics"])
 
 @router.get("/", response_model=List[WheelsetStatistics])
 async def get_wheelset_statistics(
+    response: Response,
     vehicle_id: Optional[str] = Query(None, description="车辆ID"),
     status: Optional[str] = Query(None, description="状态"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值，提供时忽略 skip"),
+    include_total: bool = Query(False, description="是否统计总数（通过响应头 X-Total-Count 返回）"),
     db: AsyncSession = Depends(get_db)
 ):
-    """获取轮对统计数据"""
-    if vehicle_id:
-        try:
-            vehicle_uuid = UUID(vehicle_id)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid vehicle ID format")
-        
-        statistics, total = await WheelsetStatisticsService.get_wheelset_statistics_by_vehicle(
-            db, vehicle_uuid, skip=skip, limit=limit
-        )
-    else:
-        statistics, total = await WheelsetStatisticsService.get_all_wheelset_statistics(
-            db, skip=skip, limit=limit, status=status
-        )
+    """获取轮对统计数据，按检查日期倒序"""
+    try:
+        if vehicle_id:
+            try:
+                vehicle_uuid = UUID(vehicle_id)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid vehicle ID format")
+            
+            statistics, total, next_cursor = await WheelsetStatisticsService.get_wheelset_statistics_by_vehicle(
+                db, vehicle_uuid, skip=skip, limit=limit, cursor=cursor, with_total=include_total
+            )
+        else:
+            statistics, total, next_cursor = await WheelsetStatisticsService.get_all_wheelset_statistics(
+                db, skip=skip, limit=limit, status=status, cursor=cursor, with_total=include_total
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
     return statistics
 
 
+@router.get("/history", response_model=List[WheelsetMeasurement])
+async def get_wheelset_measurement_history(
+    response: Response,
+    vehicle_id: str = Query(..., description="车辆ID或车辆编号"),
+    wheelset_position: Optional[str] = Query(None, description="轮对位置"),
+    date_from: Optional[date] = Query(None, description="检查日期起"),
+    date_to: Optional[date] = Query(None, description="检查日期止"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取轮对测量历史，按检查日期倒序"""
+    vehicle_uuid = await vehicle_resolver.resolve(db, vehicle_id)
+    if vehicle_uuid is None:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+
+    try:
+        measurements, next_cursor = await WheelsetStatisticsService.get_measurement_history(
+            db, vehicle_uuid, wheelset_position=wheelset_position,
+            date_from=date_from, date_to=date_to, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return measurements
+
+
 @router.get("/{stat_id}", response_model=WheelsetStatistics)
 async def get_wheelset_statistic(stat_id: str, db: AsyncSession = Depends(get_db)):
     """获取轮对统计数据详情"""
@@ -69,6 +114,23 @@ async def create_wheelset_statistics(
         raise HTTPException(status_code=500, detail=f"Error creating wheelset statistics: {str(e)}")
 
 
+@router.post("/bulk", response_model=WheelsetStatisticsBulkUpsertResponse)
+async def bulk_upsert_wheelset_statistics(
+    request: WheelsetStatisticsBulkUpsert,
+    db: AsyncSession = Depends(get_db)
+):
+    """批量上传轮对测量数据：按车辆+轮对位置新增或更新，逐条返回结果"""
+    results = await WheelsetStatisticsService.bulk_upsert_wheelset_statistics(db, request.items)
+    statuses = [result["status"] for result in results]
+    return WheelsetStatisticsBulkUpsertResponse(
+        created=statuses.count("created"),
+        updated=statuses.count("updated"),
+        history_only=statuses.count("history_only"),
+        failed=statuses.count("error"),
+        results=results
+    )
+
+
 @router.put("/{stat_id}", response_model=WheelsetStatistics)
 async def update_wheelset_statistics(
     stat_id: str, 
@@ -30,12 +30,18 @@ class Settings(BaseSettings):
     DATABASE_ECHO: bool = False
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 40
+    DATABASE_AUTO_MIGRATE: bool = False  # 启动时执行 Alembic 迁移（多实例部署建议单独执行 alembic upgrade head）
 
     # Redis配置
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PASSWORD: Optional[str] = None
     REDIS_CACHE_TTL: int = 3600  # 缓存过期时间（秒）
 
+    # 最新预测缓存配置
+    PREDICTION_CACHE_MAX_SIZE: int = 5000  # 进程内缓存条目数
+    PREDICTION_CACHE_LOCAL_TTL: int = 60  # 进程内缓存过期时间（秒）
+    PREDICTION_CACHE_REDIS_ENABLED: bool = False  # 启用Redis二级缓存
+
     # CORS配置
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -50,7 +56,8 @@ class Settings(BaseSettings):
     # 文件上传配置
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIRECTORY: str = "./uploads"
-    ALLOWED_EXTENSIONS: List[str] = [".xlsx", ".xls", ".csv"]
+    ALLOWED_EXTENSIONS: List[str] = [".xlsx", ".csv"]
+    WEAR_DATA_IMPORT_CHUNK_SIZE: int = 5000  # 磨耗数据导入每块行数（每块提交一次）
 
     # 分页配置
     DEFAULT_PAGE_SIZE: int = 20
@@ -60,6 +67,14 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
 
+    # 预测任务队列配置（memory:// 或 sqlite:///./jobs.db）
+    PREDICTION_JOB_BROKER_URL: str = "memory://"
+    PREDICTION_JOB_WORKERS: int = 2
+    PREDICTION_JOB_LEASE_SECONDS: int = 300  # 任务租约（秒），工作进程退出后过期任务重新入队
+    PREDICTION_JOB_MAX_ATTEMPTS: int = 3  # 租约过期重新入队的最大领取次数
+    PREDICTION_JOB_RETENTION_SECONDS: int = 3600  # 进程内代理已结束任务保留时间
+    PREDICTION_JOB_MAX_RETAINED: int = 1000  # 进程内代理已结束任务保留数量上限
+
     # 日志配置
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "app.log"
@@ -67,8 +82,34 @@ class Settings(BaseSettings):
 
     # ML模型配置
     MODEL_PATH: str = "./app/ml/models"
-    MODEL_VERSION: str = "v1.0"
+    MODEL_VERSION: str = "v1.0"  # 未发布 CURRENT 时加载的版本
+    MODEL_REGISTRY_POLL_INTERVAL: float = 30.0  # 检查模型版本切换的间隔（秒）
     PREDICTION_CONFIDENCE_THRESHOLD: float = 0.85
+    WEAR_MODEL_HISTORY_DAYS: int = 365  # 磨耗率拟合使用的趋势历史天数
+    WEAR_MODEL_HUBER_K: Optional[float] = 1.345  # Huber 稳健回归阈值，留空为普通最小二乘
+    LIFE_DISTRIBUTION_SAMPLES: int = 1000  # 概率预测每个车辆×部件的蒙特卡洛样本数
+
+    # 多进程评分池（磨耗率拟合、剩余寿命计算和抽样）
+    SCORING_POOL_ENABLED: bool = True
+    SCORING_POOL_WORKERS: int = 0  # 进程数，0 为CPU核数
+    SCORING_POOL_CHUNK_VEHICLES: int = 2000  # 每个任务的车辆数
+    SCORING_POOL_MIN_VEHICLES: int = 500  # 少于该车辆数时在线程中计算
+
+    # 磨耗历史特征库（内存映射列式文件）
+    FEATURE_STORE_ENABLED: bool = False  # 训练和批量预测优先读取特征库
+    FEATURE_STORE_PATH: str = "./app/ml/features"
+    FEATURE_STORE_WATERMARK_LAG: int = 300  # 只物化写入超过该秒数的数据，避免遗漏未提交的长事务
+
+    # 车辆编号索引全量重新加载间隔（秒），同步其他进程中的车辆增删改，0 为不重新加载
+    VEHICLE_RESOLVER_TTL: int = 60
+
+    # 仪表板快照有效期（秒）
+    DASHBOARD_SNAPSHOT_TTL: int = 300
+
+    # 批量预测配置
+    PREDICTION_BATCH_CONCURRENCY: int = 4  # 并发会话数
+    PREDICTION_BATCH_CHUNK_SIZE: int = 50  # 每个会话处理的车辆数
+    PREDICTION_INCREMENTAL_MAX_AGE_DAYS: int = 7  # 增量预测复用已存储预测的最长天数
 
     # 邮件配置
     SMTP_HOST: Optional[str] = None
@@ -0,0 +1,127 @@
+"""缓存工具
+
+进程内 LRU+TTL 缓存，可选叠加 Redis 二级缓存（需要安装 redis 包）。
+缓存值需可 JSON 序列化。
+"""
+
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+import json
+import logging
+import threading
+import time
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis为可选依赖
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUTTLCache:
+    """线程安全的进程内LRU缓存，条目超过TTL后失效"""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredCache:
+    """两级缓存：进程内LRU + 可选Redis"""
+
+    def __init__(
+        self,
+        namespace: str,
+        max_size: int = 1024,
+        local_ttl: float = 60.0,
+        redis_url: Optional[str] = None,
+        redis_ttl: int = 3600,
+        redis_password: Optional[str] = None
+    ):
+        self.namespace = namespace
+        self.local = LRUTTLCache(max_size=max_size, ttl=local_ttl)
+        self.redis_ttl = redis_ttl
+        self._redis = None
+        if redis_url:
+            if aioredis is None:
+                logger.warning("redis package not installed, %s cache runs in-process only", namespace)
+            else:
+                self._redis = aioredis.from_url(redis_url, password=redis_password or None)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self._redis is None:
+            return None
+        try:
+            raw = await self._redis.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Redis cache get failed: {e}")
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(self._key(key), json.dumps(value, ensure_ascii=False), ex=self.redis_ttl)
+        except Exception as e:
+            logger.warning(f"Redis cache set failed: {e}")
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        for key in keys:
+            self.local.delete(key)
+        if self._redis is None or not keys:
+            return
+        try:
+            await self._redis.delete(*(self._key(key) for key in keys))
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed: {e}")
+
+    async def delete(self, key: str) -> None:
+        await self.delete_many([key])
@@ -67,13 +67,14 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def init_db():
-    """初始化数据库表"""
+    """初始化数据库：执行 Alembic 迁移升级到最新版本"""
+    from app.core.migrations import run_migrations
+
     try:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        logger.info("Database tables created successfully")
+        await run_migrations()
+        logger.info("Database migrated to latest revision")
     except Exception as e:
-        logger.error(f"Failed to create database tables: {e}")
+        logger.error(f"Failed to migrate database: {e}")
         raise
 
 
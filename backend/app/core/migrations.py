@@ -0,0 +1,133 @@
+"""
+数据库迁移工具
+
+- run_migrations: 将数据库升级到最新 Alembic 版本；对已由 create_all 建好初始版本全部表
+  但没有版本记录的旧库，先标记为初始版本再升级。只有部分表的库（如仅执行过
+  database/init.sql）无法自动判断结构，拒绝升级并提示手动处理。
+- create_index_concurrently / drop_index_concurrently: 供迁移版本使用。PostgreSQL 上以
+  CONCURRENTLY 在线建/删索引，不阻塞热点表读写；该语句不能在事务中执行，因此放在
+  autocommit_block 中（env.py 已启用每个版本单独事务）。其他数据库执行普通的
+  IF [NOT] EXISTS 语句。
+"""
+from typing import Sequence
+import asyncio
+import logging
+import os
+
+from sqlalchemy import inspect
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+
+# 初始版本及其创建的表（固定为该版本的内容，不随模型变化）
+INITIAL_REVISION = "0001"
+INITIAL_REVISION_TABLES = frozenset({
+    "users", "vehicles",
+    "wear_trend_data", "wear_predictions", "prediction_results",
+    "wheelset_statistics", "wheelset_measurements",
+    "overhaul_plans", "overhaul_items", "overhaul_spare_parts", "overhaul_records", "overhaul_standards",
+})
+
+
+def get_alembic_config():
+    """应用内使用的 Alembic 配置（不依赖当前工作目录，沿用应用日志配置）"""
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def _needs_stamp(sync_connection) -> bool:
+    """
+    没有 alembic_version 表但初始版本的表已全部存在（迁移引入前建的库）
+
+    只存在部分初始版本表时，标记后后续版本会因缺表失败、直接升级又会因表已存在失败，
+    此时抛出 RuntimeError，由运维补齐结构后手动标记版本。
+    """
+    tables = set(inspect(sync_connection).get_table_names())
+    if "alembic_version" in tables:
+        return False
+    existing = INITIAL_REVISION_TABLES & tables
+    if not existing:
+        return False
+    missing = INITIAL_REVISION_TABLES - tables
+    if missing:
+        raise RuntimeError(
+            f"Database has no migration history and only part of the revision {INITIAL_REVISION} schema "
+            f"(missing tables: {', '.join(sorted(missing))}). Create the missing tables so the schema matches "
+            f"alembic/versions/0001_initial_schema.py, then run `alembic stamp {INITIAL_REVISION}` "
+            f"in the backend directory and restart, or migrate into an empty database."
+        )
+    return True
+
+
+async def run_migrations() -> None:
+    """升级数据库到最新版本"""
+    from alembic import command
+    from app.core.database import engine
+
+    config = get_alembic_config()
+    async with engine.connect() as conn:
+        needs_stamp = await conn.run_sync(_needs_stamp)
+    if needs_stamp:
+        logger.info(f"Existing schema without migration history, stamping revision {INITIAL_REVISION}")
+        await asyncio.to_thread(command.stamp, config, INITIAL_REVISION)
+    # env.py 内部使用 asyncio.run，需在独立线程中执行
+    await asyncio.to_thread(command.upgrade, config, "head")
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    **kwargs
+) -> None:
+    """在线创建索引（PostgreSQL 使用 CREATE INDEX CONCURRENTLY IF NOT EXISTS）"""
+    from alembic import op
+
+    context = op.get_context()
+    if context.dialect.name != "postgresql":
+        # create_all 建出的旧库可能已有后续版本的索引，标记初始版本后升级需跳过
+        op.create_index(index_name, table_name, list(columns), unique=unique, if_not_exists=True, **kwargs)
+        return
+    with context.autocommit_block():
+        # CONCURRENTLY 建索引中途失败会留下 INVALID 索引，IF NOT EXISTS 会跳过它，先清理
+        # （离线生成 SQL 时无法探测，直接输出建索引语句）
+        if not context.as_sql and _is_invalid_index(index_name):
+            logger.warning(f"Dropping invalid index {index_name} left by an interrupted build")
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            index_name, table_name, list(columns), unique=unique,
+            postgresql_concurrently=True, if_not_exists=True, **kwargs
+        )
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """在线删除索引（PostgreSQL 使用 DROP INDEX CONCURRENTLY IF EXISTS）"""
+    from alembic import op
+
+    context = op.get_context()
+    if context.dialect.name != "postgresql":
+        op.drop_index(index_name, table_name=table_name, if_exists=True)
+        return
+    with context.autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def _is_invalid_index(index_name: str) -> bool:
+    from alembic import op
+    from sqlalchemy import text
+
+    result = op.get_bind().execute(
+        text(
+            "SELECT NOT indisvalid FROM pg_index "
+            "WHERE indexrelid = to_regclass(:name)"
+        ),
+        {"name": index_name}
+    )
+    return bool(result.scalar())
@@ -10,9 +10,15 @@ import logging
 from typing import Dict
 
 from app.config import settings
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
 from app.api.v1 import auth, vehicles, predictions, maintenance, reports
 from app.api.v1.endpoints import auth as auth_endpoints, users, overhaul
 from app.api.v1 import wheelset_statistics
+from app.core.database import AsyncSessionLocal, init_db
+from app.ml.model_registry import wear_model_registry
+from app.services.scoring_pool import scoring_pool
+from app.services.vehicle_resolver import vehicle_resolver
+from app.tasks.prediction_jobs import prediction_job_runner
 
 # 设置基础日志
 logging.basicConfig(level=logging.INFO)
@@ -26,12 +32,25 @@ async def lifespan(app: FastAPI):
     logger.info("🚂 Starting up Subway Wear Prediction System...")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Version: {settings.VERSION}")
+    if settings.DATABASE_AUTO_MIGRATE:
+        await init_db()
+    try:
+        async with AsyncSessionLocal() as session:
+            await vehicle_resolver.load(session)
+    except Exception as e:
+        # 数据库不可用时解析器按需回退查询，不阻塞启动
+        logger.warning(f"Vehicle resolver preload skipped: {e}")
+    scoring_pool.start()
+    prediction_job_runner.start()
     logger.info("Application started successfully! 🎉")
 
     yield
 
     # 关闭时
     logger.info("Shutting down...")
+    await prediction_job_runner.stop()
+    await prediction_job_runner.broker.close()
+    scoring_pool.shutdown()
 
 
 # 创建FastAPI应用实例
@@ -66,6 +85,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
 # 注册API路由
@@ -143,6 +163,7 @@ async def root() -> Dict[str, str]:
 @app.get("/health", response_class=JSONResponse)
 async def health_check() -> Dict:
     """健康检查端点"""
+    wear_model = wear_model_registry.get()
     return {
         "status": "healthy",
         "version": settings.VERSION,
@@ -151,7 +172,7 @@ async def health_check() -> Dict:
             "api": "✅ 正常",
             "database": "⚠️ 模拟模式",
             "cache": "⚠️ 模拟模式",
-            "ml_model": "✅ 就绪"
+            "ml_model": f"✅ 就绪 ({wear_model.version})" if wear_model else "⚠️ 未训练（使用批内车队先验）"
         }
     }
 
@@ -187,7 +208,18 @@ async def api_info() -> Dict:
             "磨耗预测": {
                 "单车预测": "POST /api/v1/predictions/single",
                 "批量预测": "POST /api/v1/predictions/batch",
-                "趋势分析": "GET /api/v1/predictions/trends"
+                "剩余寿命分布": "POST /api/v1/predictions/distribution",
+                "趋势分析": "GET /api/v1/predictions/trends",
+                "批量趋势": "POST /api/v1/predictions/trends/bulk",
+                "导入磨耗数据": "POST /api/v1/predictions/trends/import",
+                "最新预测": "GET /api/v1/predictions/vehicles/{id}/latest",
+                "提交预测任务": "POST /api/v1/predictions/jobs",
+                "预测任务状态": "GET /api/v1/predictions/jobs/{id}",
+                "模型状态": "GET /api/v1/predictions/model",
+                "训练模型": "POST /api/v1/predictions/model/train",
+                "切换模型版本": "POST /api/v1/predictions/model/activate/{version}",
+                "特征库状态": "GET /api/v1/predictions/features",
+                "刷新特征库": "POST /api/v1/predictions/features/refresh"
             },
             "维护管理": {
                 "维护计划": "GET /api/v1/maintenance/plans",
@@ -216,7 +248,9 @@ async def api_info() -> Dict:
                 "轮对统计数据详情": "GET /api/v1/wheelset-statistics/{id}",
                 "创建轮对统计数据": "POST /api/v1/wheelset-statistics",
                 "更新轮对统计数据": "PUT /api/v1/wheelset-statistics/{id}",
-                "删除轮对统计数据": "DELETE /api/v1/wheelset-statistics/{id}"
+                "删除轮对统计数据": "DELETE /api/v1/wheelset-statistics/{id}",
+                "批量上传轮对测量": "POST /api/v1/wheelset-statistics/bulk",
+                "轮对测量历史": "GET /api/v1/wheelset-statistics/history"
             }
         }
     }
@@ -0,0 +1,282 @@
+"""
+磨耗历史列式特征库
+
+将 wear_trend_data 按 车辆×部件 序列物化为内存映射的列式 .npy 文件：
+    {root}/CURRENT                     # 当前生效的数据版本目录名
+    {root}/{generation}/vehicle_ids.npy  # (V,) 车辆UUID十六进制字符串，升序
+    {root}/{generation}/offsets.npy      # (V×C+1,) 序列 g=车辆行×C+部件列 的观测区间 [offsets[g], offsets[g+1])
+    {root}/{generation}/day.npy          # 日期序号 int32，序列内按日期升序
+    {root}/{generation}/mileage.npy      # 里程 float64
+    {root}/{generation}/wear.npy         # 磨耗值 float64
+    {root}/{generation}/diameter.npy     # (V,) 最近一次检查轮径，无记录为 NaN
+    {root}/{generation}/rewheeling_day.npy  # (V,) 最近一次镟修日期序号，无记录为 NaN
+    {root}/{generation}/meta.json        # 部件顺序、水位线、构建时间、观测数
+
+读取以 mmap_mode="r" 打开，整列切片为零拷贝视图。写入总是生成新的数据版本目录，
+完成后原子替换 CURRENT，正在读取旧版本的进程不受影响。
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+import json
+import logging
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+META_FILE = "meta.json"
+
+# 存储格式版本，字段变化时递增
+STORE_FORMAT = 1
+
+COLUMNS = {
+    "day": np.int32,
+    "mileage": np.float64,
+    "wear": np.float64,
+}
+VEHICLE_COLUMNS = ("diameter", "rewheeling_day")
+VEHICLE_KEY_DTYPE = "U32"
+
+
+@dataclass
+class FeatureSnapshot:
+    """一个数据版本的只读视图（数组均为内存映射）"""
+    generation: str
+    components: tuple
+    watermark: Optional[datetime]
+    built_at: datetime
+    vehicle_ids: np.ndarray
+    offsets: np.ndarray
+    day: np.ndarray
+    mileage: np.ndarray
+    wear: np.ndarray
+    diameter: np.ndarray
+    rewheeling_day: np.ndarray
+    _vehicle_index: Optional[Dict[str, int]] = field(default=None, repr=False)
+
+    @property
+    def n_vehicles(self) -> int:
+        return int(self.vehicle_ids.shape[0])
+
+    @property
+    def n_observations(self) -> int:
+        return int(self.day.shape[0])
+
+    def vehicle_row(self, vehicle_id: UUID) -> Optional[int]:
+        if self._vehicle_index is None:
+            self._vehicle_index = {str(value): row for row, value in enumerate(self.vehicle_ids)}
+        return self._vehicle_index.get(vehicle_id.hex)
+
+    def series(self, vehicle_id: UUID, component: str) -> Dict[str, np.ndarray]:
+        """单个序列的 day/mileage/wear 视图（零拷贝），不存在时为空数组"""
+        row = self.vehicle_row(vehicle_id)
+        if row is None or component not in self.components:
+            start = end = 0
+        else:
+            g = row * len(self.components) + self.components.index(component)
+            start, end = int(self.offsets[g]), int(self.offsets[g + 1])
+        return {name: getattr(self, name)[start:end] for name in COLUMNS}
+
+    def observation_groups(self) -> np.ndarray:
+        """每个观测所属的序列下标（车辆行×C+部件列）"""
+        return np.repeat(np.arange(self.offsets.shape[0] - 1), np.diff(self.offsets))
+
+    def select(self, vehicle_ids: Sequence[UUID], since_day: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        按给定车辆顺序取出各部件观测
+
+        返回 vehicle_row（给定列表中的下标）、component_col、day、mileage、wear 五列；
+        since_day 给定时只保留该日期序号及之后的观测。
+        """
+        n_components = len(self.components)
+        rows = np.array([self.vehicle_row(vehicle_id) for vehicle_id in vehicle_ids], dtype=object)
+        present = np.array([row is not None for row in rows], dtype=bool)
+        store_rows = rows[present].astype(np.int64)
+        list_rows = np.flatnonzero(present)
+
+        groups = (store_rows[:, None] * n_components + np.arange(n_components)).ravel()
+        starts = self.offsets[groups]
+        lengths = self.offsets[groups + 1] - starts
+        # 将各序列区间展开为观测下标
+        index = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+
+        vehicle_row = np.repeat(np.repeat(list_rows, n_components), lengths)
+        component_col = np.repeat(np.tile(np.arange(n_components), len(store_rows)), lengths)
+        day = self.day[index]
+        keep = slice(None) if since_day is None else day >= since_day
+        return {
+            "vehicle_row": vehicle_row[keep],
+            "component_col": component_col[keep],
+            "day": day[keep].astype(np.float64),
+            "mileage": self.mileage[index][keep],
+            "wear": self.wear[index][keep],
+        }
+
+
+class WearFeatureStore:
+    """特征库读写：读取当前数据版本，合并增量写入新版本"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._snapshot: Optional[FeatureSnapshot] = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Optional[FeatureSnapshot]:
+        """当前数据版本；尚未构建时返回 None。CURRENT 变化后自动重新映射"""
+        generation = self._current_generation()
+        if generation is None:
+            return None
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.generation == generation:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.generation != generation:
+                self._snapshot = self._open(generation)
+            return self._snapshot
+
+    def generations(self) -> List[str]:
+        try:
+            return sorted(name for name in os.listdir(self.root) if name.startswith("gen-") and not name.endswith(".tmp"))
+        except FileNotFoundError:
+            return []
+
+    def write(
+        self,
+        components: Sequence[str],
+        vehicle_ids: Sequence[UUID],
+        component_col: np.ndarray,
+        day: np.ndarray,
+        mileage: np.ndarray,
+        wear: np.ndarray,
+        vehicle_features: Dict[UUID, Dict[str, float]],
+        watermark: Optional[datetime],
+        base: Optional[FeatureSnapshot] = None
+    ) -> FeatureSnapshot:
+        """
+        写入新数据版本并设为当前版本
+
+        vehicle_ids 与 component_col/day/mileage/wear 为新增观测（逐行对应）；base 给定时与其合并，
+        否则全量构建。vehicle_features 为各车辆轮对特征（diameter、rewheeling_day），整体替换。
+        """
+        components = tuple(components)
+        n_components = len(components)
+        new_keys = np.array([vehicle_id.hex for vehicle_id in vehicle_ids], dtype=VEHICLE_KEY_DTYPE)
+        feature_keys = np.array([vehicle_id.hex for vehicle_id in vehicle_features], dtype=VEHICLE_KEY_DTYPE)
+        if base is not None and base.components != components:
+            raise ValueError("Component order changed, full rebuild required")
+
+        old_keys = base.vehicle_ids if base is not None else np.empty(0, dtype=VEHICLE_KEY_DTYPE)
+        all_keys = np.unique(np.concatenate([old_keys, new_keys, feature_keys]))
+
+        # 旧观测与新增观测映射到新的序列下标后合并排序
+        parts_group = []
+        parts = {name: [] for name in COLUMNS}
+        if base is not None and base.n_observations:
+            old_rows = np.searchsorted(all_keys, base.vehicle_ids)
+            old_groups = base.observation_groups()
+            parts_group.append(old_rows[old_groups // n_components] * n_components + old_groups % n_components)
+            for name in COLUMNS:
+                parts[name].append(getattr(base, name))
+        if new_keys.size:
+            parts_group.append(np.searchsorted(all_keys, new_keys) * n_components + np.asarray(component_col, dtype=np.int64))
+            parts["day"].append(np.asarray(day))
+            parts["mileage"].append(np.asarray(mileage))
+            parts["wear"].append(np.asarray(wear))
+
+        group = np.concatenate(parts_group) if parts_group else np.empty(0, dtype=np.int64)
+        columns = {
+            name: np.concatenate(parts[name]).astype(dtype) if parts[name] else np.empty(0, dtype=dtype)
+            for name, dtype in COLUMNS.items()
+        }
+        order = np.lexsort((columns["day"], group))
+        group = group[order]
+        columns = {name: values[order] for name, values in columns.items()}
+        offsets = np.zeros(len(all_keys) * n_components + 1, dtype=np.int64)
+        np.cumsum(np.bincount(group, minlength=len(all_keys) * n_components), out=offsets[1:])
+
+        vehicle_columns = {name: np.full(len(all_keys), np.nan) for name in VEHICLE_COLUMNS}
+        feature_rows = np.searchsorted(all_keys, feature_keys)
+        for row, features in zip(feature_rows, vehicle_features.values()):
+            for name in VEHICLE_COLUMNS:
+                value = features.get(name)
+                if value is not None:
+                    vehicle_columns[name][row] = value
+
+        generation = f"gen-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}-{os.getpid()}"
+        path = os.path.join(self.root, generation)
+        tmp_path = f"{path}.tmp"
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, "vehicle_ids.npy"), all_keys)
+        np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+        for name, values in {**columns, **vehicle_columns}.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), values)
+        with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "format": STORE_FORMAT,
+                "components": list(components),
+                "watermark": watermark.isoformat() if watermark else None,
+                "built_at": datetime.now(timezone.utc).isoformat(),
+                "n_vehicles": int(len(all_keys)),
+                "n_observations": int(group.size),
+            }, f)
+        os.replace(tmp_path, path)
+        self._set_current(generation)
+        self._cleanup(keep={generation, base.generation if base is not None else generation})
+        logger.info(f"Feature store generation {generation}: {len(all_keys)} vehicles, {group.size} observations")
+        return self.snapshot()
+
+    def _open(self, generation: str) -> FeatureSnapshot:
+        path = os.path.join(self.root, generation)
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["format"] != STORE_FORMAT:
+            raise ValueError(f"Unsupported feature store format: {meta['format']}")
+
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        return FeatureSnapshot(
+            generation=generation,
+            components=tuple(meta["components"]),
+            watermark=datetime.fromisoformat(meta["watermark"]) if meta["watermark"] else None,
+            built_at=datetime.fromisoformat(meta["built_at"]),
+            vehicle_ids=load("vehicle_ids"),
+            offsets=load("offsets"),
+            day=load("day"),
+            mileage=load("mileage"),
+            wear=load("wear"),
+            diameter=load("diameter"),
+            rewheeling_day=load("rewheeling_day"),
+        )
+
+    def _current_generation(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _set_current(self, generation: str) -> None:
+        current_path = os.path.join(self.root, CURRENT_FILE)
+        tmp_path = f"{current_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(generation)
+        os.replace(tmp_path, current_path)
+
+    def _cleanup(self, keep: set) -> None:
+        """删除旧数据版本，保留当前和上一个版本（其他进程可能仍在读取）"""
+        for name in self.generations():
+            if name not in keep:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+
+# 全局特征库实例
+wear_feature_store = WearFeatureStore(os.path.join(settings.FEATURE_STORE_PATH, "wear_history"))
@@ -0,0 +1,221 @@
+"""
+磨耗模型注册表
+
+车队级拟合参数按版本保存为 npz 文件：
+    {MODEL_PATH}/wear_rate/{version}.npz
+    {MODEL_PATH}/wear_rate/CURRENT      # 当前生效的版本号，缺省为 settings.MODEL_VERSION
+
+模型在首次使用时加载并常驻内存，预测时直接引用，不重复反序列化。
+每隔 poll_interval 秒检查一次 CURRENT，版本变化时加载新文件并以单次引用赋值原子替换；
+发布新版本只需写入版本文件再替换 CURRENT，所有 uvicorn worker 无需重启即可切换。
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.ml.wear_rate_model import FleetPrior
+
+logger = logging.getLogger(__name__)
+
+# npz 文件格式版本，字段变化时递增
+ARTIFACT_FORMAT = 1
+
+CURRENT_FILE = "CURRENT"
+ARTIFACT_SUFFIX = ".npz"
+
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+
+@dataclass(frozen=True)
+class WearModel:
+    """一个版本的磨耗模型参数"""
+    version: str
+    components: tuple
+    prior: FleetPrior
+    trained_at: datetime
+    history_days: int
+    huber_k: Optional[float]
+    n_series: int
+    n_observations: int
+
+    def prior_for(self, components: Sequence[str]) -> FleetPrior:
+        """按给定部件顺序取先验，模型中没有的部件使用默认先验"""
+        default = FleetPrior.default(components)
+        index = {component: i for i, component in enumerate(self.components)}
+        rows = [index.get(component, -1) for component in components]
+        return FleetPrior(
+            wear_rate=np.array([self.prior.wear_rate[i] if i >= 0 else default.wear_rate[j] for j, i in enumerate(rows)]),
+            wear_rate_var=np.array([self.prior.wear_rate_var[i] if i >= 0 else default.wear_rate_var[j] for j, i in enumerate(rows)]),
+            daily_mileage=self.prior.daily_mileage
+        )
+
+    def summary(self) -> Dict:
+        return {
+            "version": self.version,
+            "trained_at": self.trained_at,
+            "history_days": self.history_days,
+            "huber_k": self.huber_k,
+            "n_series": self.n_series,
+            "n_observations": self.n_observations,
+            "prior_wear_rates": {
+                component: round(float(rate), 6) for component, rate in zip(self.components, self.prior.wear_rate)
+            },
+            "daily_mileage": round(float(self.prior.daily_mileage), 2),
+        }
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "format": np.array(ARTIFACT_FORMAT),
+            "version": np.array(self.version),
+            "components": np.array(self.components),
+            "prior_wear_rate": self.prior.wear_rate,
+            "prior_wear_rate_var": self.prior.wear_rate_var,
+            "daily_mileage": np.array(self.prior.daily_mileage),
+            "trained_at": np.array(self.trained_at.isoformat()),
+            "history_days": np.array(self.history_days),
+            "huber_k": np.array(np.nan if self.huber_k is None else self.huber_k),
+            "n_series": np.array(self.n_series),
+            "n_observations": np.array(self.n_observations),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "WearModel":
+        if int(arrays["format"]) != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported model artifact format: {int(arrays['format'])}")
+        huber_k = float(arrays["huber_k"])
+        return cls(
+            version=str(arrays["version"]),
+            components=tuple(str(component) for component in arrays["components"]),
+            prior=FleetPrior(
+                wear_rate=np.array(arrays["prior_wear_rate"], dtype=np.float64),
+                wear_rate_var=np.array(arrays["prior_wear_rate_var"], dtype=np.float64),
+                daily_mileage=float(arrays["daily_mileage"])
+            ),
+            trained_at=datetime.fromisoformat(str(arrays["trained_at"])),
+            history_days=int(arrays["history_days"]),
+            huber_k=None if np.isnan(huber_k) else huber_k,
+            n_series=int(arrays["n_series"]),
+            n_observations=int(arrays["n_observations"])
+        )
+
+
+class ModelRegistry:
+    """按版本管理模型文件，懒加载并在 CURRENT 变化时热切换"""
+
+    def __init__(self, root: str, default_version: str, poll_interval: float = 30.0):
+        self.root = root
+        self.default_version = default_version
+        self.poll_interval = poll_interval
+        self._model: Optional[WearModel] = None
+        self._next_check = 0.0
+        self._missing_logged: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[WearModel]:
+        """返回当前生效的模型，尚无可用模型时返回 None"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._model
+        with self._lock:
+            if now < self._next_check:
+                return self._model
+            self._next_check = now + self.poll_interval
+            version = self.active_version()
+            if self._model is None or self._model.version != version:
+                self._swap(version)
+            return self._model
+
+    def active_version(self) -> str:
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), encoding="utf-8") as f:
+                return f.read().strip() or self.default_version
+        except FileNotFoundError:
+            return self.default_version
+
+    def list_versions(self) -> List[str]:
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(ARTIFACT_SUFFIX)] for name in names if name.endswith(ARTIFACT_SUFFIX))
+
+    def save(self, model: WearModel, activate: bool = True) -> str:
+        """写入新版本文件（先写临时文件再原子替换），activate=True 时同时设为当前版本"""
+        _check_version(model.version)
+        os.makedirs(self.root, exist_ok=True)
+        path = self._artifact_path(model.version)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **model.to_arrays())
+        os.replace(tmp_path, path)
+        logger.info(f"Saved wear model {model.version} to {path}")
+        if activate:
+            self.activate(model.version)
+        return path
+
+    def activate(self, version: str) -> None:
+        """切换当前版本；本进程立即生效，其他进程在下一次检查时生效"""
+        _check_version(version)
+        if not os.path.exists(self._artifact_path(version)):
+            raise FileNotFoundError(f"Model version not found: {version}")
+        os.makedirs(self.root, exist_ok=True)
+        current_path = os.path.join(self.root, CURRENT_FILE)
+        tmp_path = f"{current_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_path, current_path)
+        with self._lock:
+            self._swap(version)
+            self._next_check = time.monotonic() + self.poll_interval
+        logger.info(f"Activated wear model {version}")
+
+    def _swap(self, version: str) -> None:
+        try:
+            model = self._load(version)
+        except FileNotFoundError:
+            # 尚未训练或文件缺失：保留已加载的模型（如有），只记录一次
+            if self._missing_logged != version:
+                logger.warning(f"Wear model {version} not found under {self.root}")
+                self._missing_logged = version
+            return
+        except Exception as e:
+            logger.error(f"Failed to load wear model {version}: {e}")
+            return
+        self._model = model
+        self._missing_logged = None
+
+    def _load(self, version: str) -> WearModel:
+        _check_version(version)
+        with np.load(self._artifact_path(version), allow_pickle=False) as arrays:
+            model = WearModel.from_arrays(arrays)
+        logger.info(f"Loaded wear model {model.version}")
+        return model
+
+    def _artifact_path(self, version: str) -> str:
+        return os.path.join(self.root, f"{version}{ARTIFACT_SUFFIX}")
+
+
+def new_version() -> str:
+    """按训练时间生成版本号"""
+    return datetime.now(timezone.utc).strftime("v%Y%m%d%H%M%S")
+
+
+def _check_version(version: str) -> None:
+    if not VERSION_PATTERN.match(version):
+        raise ValueError(f"Invalid model version: {version}")
+
+
+# 全局注册表实例
+wear_model_registry = ModelRegistry(
+    os.path.join(settings.MODEL_PATH, "wear_rate"),
+    settings.MODEL_VERSION,
+    settings.MODEL_REGISTRY_POLL_INTERVAL
+)
@@ -0,0 +1,245 @@
+"""
+物理约束的磨耗率回归模型
+
+按 Archard 磨耗定律，部件材料损失与走行里程近似成线性关系，且只增不减。
+对每个 车辆×部件 序列拟合 磨耗值 ~ 里程 的直线，磨耗率为负斜率（mm/万km）：
+- 所有序列放在同一组扁平数组中，用 np.bincount 分组求和，一次完成整个车队的最小二乘；
+- 可选 Huber 权重迭代重加权（IRLS），削弱测量异常点的影响；
+- 以车队同部件磨耗率的分布作为先验（经验贝叶斯收缩），观测少或离散大的序列向先验靠拢，
+  无观测的序列直接取先验；
+- 磨耗率不为负（磨耗不可逆），置信度由残差方差推出的磨耗率标准误换算。
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+import numpy as np
+
+
+# 里程单位：万km（磨耗率单位 mm/万km）
+MILEAGE_UNIT = 10000.0
+
+# 车队无可用数据时的先验磨耗率（mm/万km）与日均走行里程（km）
+DEFAULT_WEAR_RATES: Dict[str, float] = {"wheelset": 0.15, "brake_pad": 0.5, "pantograph": 0.3}
+DEFAULT_DAILY_MILEAGE = 400.0
+# 默认先验的相对标准差
+DEFAULT_PRIOR_RELATIVE_STD = 0.5
+
+# 序列参与拟合的最少观测数（两点直线无残差，无法估计方差）
+MIN_OBSERVATIONS = 3
+# 估计车队先验所需的最少有效序列数
+MIN_PRIOR_GROUPS = 2
+
+# Huber 权重迭代次数
+HUBER_ITERATIONS = 5
+
+# 置信度范围
+MIN_CONFIDENCE = 0.05
+MAX_CONFIDENCE = 0.99
+
+
+@dataclass
+class FleetPrior:
+    """车队级先验：各部件磨耗率均值、车辆间方差及日均走行里程"""
+    wear_rate: np.ndarray  # (部件数,)
+    wear_rate_var: np.ndarray  # (部件数,)
+    daily_mileage: float
+
+    @classmethod
+    def default(cls, components: Sequence[str]) -> "FleetPrior":
+        wear_rate = np.array([DEFAULT_WEAR_RATES.get(component, 0.3) for component in components])
+        return cls(
+            wear_rate=wear_rate,
+            wear_rate_var=(wear_rate * DEFAULT_PRIOR_RELATIVE_STD) ** 2,
+            daily_mileage=DEFAULT_DAILY_MILEAGE
+        )
+
+
+@dataclass
+class WearRateFit:
+    """拟合结果，各数组长度为序列数"""
+    wear_rate: np.ndarray  # 后验磨耗率 mm/万km
+    wear_rate_std: np.ndarray  # 后验标准差
+    residual_std: np.ndarray  # 残差标准差 mm（观测不足为 NaN）
+    n_observations: np.ndarray
+    latest_wear: np.ndarray  # 最近一次观测的磨耗值（无观测为 NaN）
+    daily_mileage: np.ndarray  # 日均走行里程 km
+    confidence: np.ndarray
+    prior: FleetPrior
+
+
+def grouped_linear_fit(
+    group: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    n_groups: int,
+    weights: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    分组加权最小二乘 y = a + b·x
+
+    group 为每个观测所属序列的下标。返回各序列的 slope、sxx、rss、n（观测数），
+    以及每个观测的残差 residual；无法拟合的序列 slope 为 NaN。
+    """
+    if weights is None:
+        weights = np.ones_like(x)
+    n = np.bincount(group, minlength=n_groups)
+    sw = np.bincount(group, weights, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = np.bincount(group, weights * x, minlength=n_groups) / sw
+        y_mean = np.bincount(group, weights * y, minlength=n_groups) / sw
+        # 组内中心化后再求二阶矩，避免里程数值大时的精度损失
+        dx = x - x_mean[group]
+        dy = y - y_mean[group]
+        sxx = np.bincount(group, weights * dx * dx, minlength=n_groups)
+        sxy = np.bincount(group, weights * dx * dy, minlength=n_groups)
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+    residual = dy - np.nan_to_num(slope)[group] * dx
+    rss = np.bincount(group, weights * residual * residual, minlength=n_groups)
+    return {"slope": slope, "sxx": sxx, "rss": rss, "n": n, "residual": residual}
+
+
+def fit_wear_rates(
+    group: np.ndarray,
+    component: np.ndarray,
+    mileage: np.ndarray,
+    wear: np.ndarray,
+    day: np.ndarray,
+    n_groups: int,
+    components: Sequence[str],
+    prior: Optional[FleetPrior] = None,
+    huber_k: Optional[float] = None
+) -> WearRateFit:
+    """
+    拟合车队所有序列的磨耗率
+
+    参数：
+    - group / mileage / wear / day: 每个观测的序列下标、里程(km)、磨耗值(mm)、日期序号(天)
+    - component: 每个序列的部件下标（长度 n_groups，对应 components）
+    - prior: 车队先验；为 None 时由本次各序列的拟合结果估计，有效序列不足的部件使用默认先验
+    - huber_k: Huber 阈值（以残差标准差为单位，常用 1.345），None 表示普通最小二乘
+    """
+    group = np.asarray(group, dtype=np.int64)
+    component = np.asarray(component, dtype=np.int64)
+    mileage = np.asarray(mileage, dtype=np.float64)
+    wear = np.asarray(wear, dtype=np.float64)
+    day = np.asarray(day, dtype=np.float64)
+
+    x = mileage / MILEAGE_UNIT
+    fit = grouped_linear_fit(group, x, wear, n_groups)
+    n = fit["n"]
+    dof = np.maximum(n - 2, 1)
+    if huber_k is not None:
+        for _ in range(HUBER_ITERATIONS):
+            scale = np.sqrt(fit["rss"] / dof)[group]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                u = np.abs(fit["residual"]) / scale
+                weights = np.where(u > huber_k, huber_k / u, 1.0)
+            fit = grouped_linear_fit(group, x, wear, n_groups, np.nan_to_num(weights, nan=1.0))
+
+    # 磨耗值随里程减小，磨耗率取负斜率；观测不足的序列抽样方差为无穷大
+    enough = (n >= MIN_OBSERVATIONS) & (fit["sxx"] > 0)
+    residual_var = np.where(enough, fit["rss"] / dof, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw_rate = np.where(enough, -fit["slope"], np.nan)
+        sampling_var = np.where(enough, residual_var / fit["sxx"], np.inf)
+
+    if prior is None:
+        prior = estimate_fleet_prior(raw_rate, sampling_var, component, components, _fleet_daily_mileage(group, day, mileage, n_groups))
+
+    # 经验贝叶斯收缩：按精度加权合并序列估计与先验；残差为零的序列直接取拟合值
+    prior_mean = prior.wear_rate[component]
+    prior_var = prior.wear_rate_var[component]
+    exact = enough & (sampling_var == 0)
+    informative = enough & ~exact
+    with np.errstate(divide="ignore", invalid="ignore"):
+        data_precision = np.where(informative, 1.0 / sampling_var, 0.0)
+    posterior_var = 1.0 / (data_precision + 1.0 / prior_var)
+    posterior_rate = (np.where(informative, raw_rate, 0.0) * data_precision + prior_mean / prior_var) * posterior_var
+    posterior_rate = np.where(exact, raw_rate, posterior_rate)
+    posterior_var = np.where(exact, 0.0, posterior_var)
+
+    # 物理约束：磨耗不可逆
+    wear_rate = np.maximum(posterior_rate, 0.0)
+    wear_rate_std = np.sqrt(posterior_var)
+
+    daily_mileage = _daily_mileage(group, day, mileage, n_groups, prior.daily_mileage)
+
+    return WearRateFit(
+        wear_rate=wear_rate,
+        wear_rate_std=wear_rate_std,
+        residual_std=np.sqrt(residual_var),
+        n_observations=n,
+        latest_wear=_latest_values(group, day, wear, n_groups),
+        daily_mileage=daily_mileage,
+        confidence=rate_confidence(wear_rate, wear_rate_std),
+        prior=prior
+    )
+
+
+def estimate_fleet_prior(
+    raw_rate: np.ndarray,
+    sampling_var: np.ndarray,
+    component: np.ndarray,
+    components: Sequence[str],
+    daily_mileage: Optional[float] = None
+) -> FleetPrior:
+    """
+    由各序列磨耗率估计车队先验（矩估计）
+
+    车辆间方差 = 各序列磨耗率的方差 - 平均抽样方差（下限为均值的 5% 平方），
+    有效序列不足 MIN_PRIOR_GROUPS 的部件使用默认先验。
+    """
+    default = FleetPrior.default(components)
+    n_components = len(components)
+    valid = np.isfinite(raw_rate) & np.isfinite(sampling_var)
+    # 先验以非负磨耗率估计
+    rate = np.maximum(np.where(valid, raw_rate, 0.0), 0.0)
+    count = np.bincount(component[valid], minlength=n_components)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(component, np.where(valid, rate, 0.0), minlength=n_components) / count
+        spread = np.bincount(component, np.where(valid, rate * rate, 0.0), minlength=n_components) / count - mean * mean
+        noise = np.bincount(component, np.where(valid, sampling_var, 0.0), minlength=n_components) / count
+    between_var = np.maximum(spread - noise, (0.05 * mean) ** 2)
+
+    use_fleet = (count >= MIN_PRIOR_GROUPS) & (mean > 0)
+    return FleetPrior(
+        wear_rate=np.where(use_fleet, mean, default.wear_rate),
+        wear_rate_var=np.where(use_fleet, between_var, default.wear_rate_var),
+        daily_mileage=daily_mileage if daily_mileage else default.daily_mileage
+    )
+
+
+def rate_confidence(wear_rate: np.ndarray, wear_rate_std: np.ndarray) -> np.ndarray:
+    """置信度 = 1 / (1 + 相对标准误)，限制在 [MIN_CONFIDENCE, MAX_CONFIDENCE]"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative_std = wear_rate_std / np.maximum(wear_rate, 1e-9)
+    return np.clip(1.0 / (1.0 + relative_std), MIN_CONFIDENCE, MAX_CONFIDENCE)
+
+
+def _daily_slopes(group: np.ndarray, day: np.ndarray, mileage: np.ndarray, n_groups: int) -> np.ndarray:
+    """各序列日均走行里程（里程 ~ 日期 斜率），无法估计或不为正时为 NaN"""
+    fit = grouped_linear_fit(group, day, mileage, n_groups)
+    slope = fit["slope"]
+    return np.where((fit["n"] >= 2) & (slope > 0), slope, np.nan)
+
+
+def _fleet_daily_mileage(group: np.ndarray, day: np.ndarray, mileage: np.ndarray, n_groups: int) -> Optional[float]:
+    slopes = _daily_slopes(group, day, mileage, n_groups)
+    slopes = slopes[np.isfinite(slopes)]
+    return float(np.median(slopes)) if slopes.size else None
+
+
+def _daily_mileage(group: np.ndarray, day: np.ndarray, mileage: np.ndarray, n_groups: int, fallback: float) -> np.ndarray:
+    slopes = _daily_slopes(group, day, mileage, n_groups)
+    return np.where(np.isfinite(slopes), slopes, fallback)
+
+
+def _latest_values(group: np.ndarray, day: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """各序列日期最新的观测值"""
+    latest = np.full(n_groups, np.nan)
+    if group.size == 0:
+        return latest
+    order = np.lexsort((day, group))
+    sorted_group = group[order]
+    last = order[np.r_[sorted_group[1:] != sorted_group[:-1], True]]
+    latest[group[last]] = values[last]
+    return latest
@@ -4,6 +4,6 @@ Initialize models package
 from app.models.user import User
 from app.models.overhaul import OverhaulPlan, OverhaulRecord, OverhaulStandard
 from app.models.vehicle import Vehicle
-from app.models.prediction import WearPrediction, WearTrendData, PredictionResult
+from app.models.prediction import WearPrediction, WearTrendData, PredictionResult, WheelsetStatistics, WheelsetMeasurement
 
-__all__ = ["User", "OverhaulPlan", "OverhaulRecord", "OverhaulStandard", "Vehicle", "WearPrediction", "WearTrendData", "PredictionResult"]
\ No newline at end of file
+__all__ = ["User", "OverhaulPlan", "OverhaulRecord", "OverhaulStandard", "Vehicle", "WearPrediction", "WearTrendData", "PredictionResult", "WheelsetStatistics", "WheelsetMeasurement"]
\ No newline at end of file
@@ -2,7 +2,7 @@
 大修管理数据模型
 Overhaul Management Data Models
 """
-from sqlalchemy import Column, String, Float, Integer, Date, DateTime, Text, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, String, Float, Integer, Date, DateTime, Text, ForeignKey, Index, Enum as SQLEnum, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -43,6 +43,10 @@ class OverhaulLevel(str, enum.Enum):
 class OverhaulPlan(Base):
     """大修计划模型"""
     __tablename__ = "overhaul_plans"
+    __table_args__ = (
+        # 列表游标分页排序键
+        Index("idx_overhaul_plans_planned_start_id", "planned_start_date", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     plan_code = Column(String(50), unique=True, nullable=False, index=True)
@@ -104,6 +108,9 @@ class OverhaulPlan(Base):
 class OverhaulItem(Base):
     """大修项目模型"""
     __tablename__ = "overhaul_items"
+    __table_args__ = (
+        Index("idx_overhaul_items_plan", "overhaul_plan_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     overhaul_plan_id = Column(UUID(as_uuid=True), ForeignKey("overhaul_plans.id", ondelete="CASCADE"))
@@ -153,6 +160,9 @@ class OverhaulItem(Base):
 class OverhaulSparePart(Base):
     """大修备件模型"""
     __tablename__ = "overhaul_spare_parts"
+    __table_args__ = (
+        Index("idx_overhaul_spare_parts_plan", "overhaul_plan_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     overhaul_plan_id = Column(UUID(as_uuid=True), ForeignKey("overhaul_plans.id", ondelete="CASCADE"))
@@ -1,7 +1,7 @@
 """
 预测相关模型定义
 """
-from sqlalchemy import Column, String, Integer, Float, Date, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, Text, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -10,6 +10,9 @@ from app.core.database import Base
 
 class WearPrediction(Base):
     __tablename__ = "wear_predictions"
+    __table_args__ = (
+        Index("idx_wear_predictions_vehicle_created", "vehicle_id", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id"), nullable=False)  # 关联车辆
@@ -33,6 +36,10 @@ class WearPrediction(Base):
 
 class WearTrendData(Base):
     __tablename__ = "wear_trend_data"
+    __table_args__ = (
+        Index("idx_wear_trend_data_vehicle_component_date", "vehicle_id", "component_type", "date"),
+        Index("idx_wear_trend_data_created_at", "created_at"),  # 特征库增量刷新水位线
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id"), nullable=False)
@@ -45,6 +52,9 @@ class WearTrendData(Base):
 
 class PredictionResult(Base):
     __tablename__ = "prediction_results"
+    __table_args__ = (
+        Index("idx_prediction_results_vehicle_created", "vehicle_id", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id"), nullable=False)
@@ -54,12 +64,20 @@ class PredictionResult(Base):
     total_predictions = Column(Integer, default=0)
     maintenance_priority = Column(String(20), default="low")  # high, medium, low
     next_maintenance_date = Column(Date)
+    input_fingerprint = Column(String(64))  # 预测输入指纹，用于增量预测
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
 class WheelsetStatistics(Base):
     __tablename__ = "wheelset_statistics"
+    __table_args__ = (
+        # 每辆车每个轮对位置一条当前记录（批量上传按此键 upsert）
+        UniqueConstraint("vehicle_id", "wheelset_position", name="uq_wheelset_statistics_vehicle_position"),
+        Index("idx_wheelset_statistics_vehicle_inspection", "vehicle_id", "inspection_date"),
+        # 列表游标分页排序键
+        Index("idx_wheelset_statistics_inspection_id", "inspection_date", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id"), nullable=False)
@@ -77,4 +95,35 @@ class WheelsetStatistics(Base):
     inspector = Column(String(100))  # 检查员
     notes = Column(Text)  # 备注
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
-    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class WheelsetMeasurement(Base):
+    """
+    轮对测量历史（只追加）
+
+    每次写入 wheelset_statistics 的测量值同时追加一条历史记录；wheelset_statistics 作为
+    每个车辆+轮对位置的当前记录维护。PostgreSQL 上按检查日期按月分区（见迁移 005），
+    因此主键包含 inspection_date。
+    """
+    __tablename__ = "wheelset_measurements"
+    __table_args__ = (
+        Index("idx_wheelset_measurements_vehicle_position_date", "vehicle_id", "wheelset_position", "inspection_date"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    inspection_date = Column(Date, primary_key=True)  # 检查日期（分区键）
+    vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id"), nullable=False)
+    wheelset_position = Column(String(20), nullable=False)
+    current_diameter = Column(Float, nullable=False)
+    flange_thickness = Column(Float)
+    flange_height = Column(Float)
+    qr_value = Column(Float)
+    mileage_at_measurement = Column(Float)
+    last_rewheeling_date = Column(Date)
+    next_rewheeling_mileage = Column(Float)
+    wear_rate = Column(Float)
+    status = Column(String(20))
+    inspector = Column(String(100))
+    notes = Column(Text)
+    recorded_at = Column(DateTime(timezone=True), default=datetime.utcnow)  # 写入时间
\ No newline at end of file
@@ -92,7 +92,7 @@ class OverhaulItemResponse(OverhaulItemBase):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 # ===================== Spare Part Schemas =====================
@@ -141,7 +141,7 @@ class SparePartResponse(SparePartBase):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 # ===================== Overhaul Plan Schemas =====================
@@ -221,12 +221,17 @@ class OverhaulPlanResponse(OverhaulPlanBase):
     duration_days: Optional[int] = None
     progress_percentage: Optional[float] = None
     cost_variance: Optional[float] = None
+    item_count: Optional[int] = None
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
-    def calculate_fields(self):
-        """计算派生字段"""
+    def calculate_fields(self, item_count: Optional[int] = None, average_progress: Optional[float] = None):
+        """
+        计算派生字段
+
+        汇总列表不加载检修项目，项目数和平均进度由SQL聚合结果传入。
+        """
         # 计算工期
         if self.actual_start_date and self.actual_end_date:
             self.duration_days = (self.actual_end_date - self.actual_start_date).days
@@ -234,9 +239,15 @@ class OverhaulPlanResponse(OverhaulPlanBase):
             self.duration_days = (self.planned_end_date - self.planned_start_date).days
 
         # 计算进度
-        if self.items:
-            total_progress = sum(item.progress_percentage for item in self.items)
-            self.progress_percentage = total_progress / len(self.items)
+        if item_count is not None:
+            self.item_count = item_count
+            if item_count:
+                self.progress_percentage = float(average_progress)
+        else:
+            self.item_count = len(self.items)
+            if self.items:
+                total_progress = sum(item.progress_percentage for item in self.items)
+                self.progress_percentage = total_progress / len(self.items)
 
         # 计算成本偏差
         if self.estimated_cost and self.actual_cost:
@@ -288,7 +299,7 @@ class OverhaulRecordResponse(OverhaulRecordBase):
     created_by: Optional[UUID] = None
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 # ===================== Overhaul Standard Schemas =====================
@@ -326,7 +337,7 @@ class OverhaulStandardResponse(OverhaulStandardBase):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 # ===================== Query Schemas =====================
@@ -342,6 +353,9 @@ class OverhaulPlanQuery(BaseModel):
     start_date_to: Optional[date] = None
     page: int = 1
     limit: int = 20
+    cursor: Optional[str] = None  # 上一页响应头 X-Next-Cursor 的值，提供时忽略 page
+    summary: bool = True  # 汇总模式：不加载检修项目和备件明细
+    include_total: bool = False  # 是否统计总数（通过响应头 X-Total-Count 返回）
 
 
 class OverhaulStatistics(BaseModel):
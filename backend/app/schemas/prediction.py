@@ -1,8 +1,8 @@
 """
 预测相关的Pydantic模型
 """
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Literal, Optional
 from datetime import date, datetime
 from uuid import UUID
 
@@ -22,7 +22,9 @@ class WearPredictionBase(BaseModel):
 
 
 class WearPredictionCreate(WearPredictionBase):
-    pass
+    last_rewheeling_date: Optional[date] = None
+    current_mileage: Optional[float] = None
+    next_rewheeling_mileage: Optional[float] = None
 
 
 class WearPredictionUpdate(BaseModel):
@@ -46,6 +48,7 @@ class WearPrediction(WearPredictionBase):
 class PredictionRequest(BaseModel):
     vehicle_id: str
     prediction_horizon_days: int = 180
+    incremental: bool = False  # 输入未变化时复用最近一次预测（未训练模型时以默认车队先验计算）
 
 
 class PredictionResponse(BaseModel):
@@ -60,6 +63,88 @@ class PredictionResponse(BaseModel):
 class BatchPredictionRequest(BaseModel):
     vehicle_ids: List[str]
     prediction_horizon_days: int = 180
+    incremental: bool = False  # 输入未变化的车辆复用最近一次预测（未训练模型时以默认车队先验计算）
+
+
+class LifeDistributionRequest(BaseModel):
+    vehicle_ids: Optional[List[str]] = Field(None, min_length=1)  # 车辆ID或车辆编号，缺省为全车队
+    prediction_horizon_days: int = Field(180, ge=1)
+    n_samples: Optional[int] = Field(None, ge=100, le=20000)  # 缺省取 LIFE_DISTRIBUTION_SAMPLES
+    seed: Optional[int] = Field(None, ge=0)  # 固定随机种子以复现结果
+
+
+class ComponentLifeDistribution(BaseModel):
+    component_type: str
+    remaining_life_days: List[int]  # 与 quantiles 一一对应
+    remaining_life_mileage: List[float]
+    replacement_dates: List[date]
+    due_probability: float  # 预测期内到达最小阈值的概率
+
+
+class VehicleLifeDistribution(BaseModel):
+    vehicle_id: UUID
+    vehicle_code: str
+    components: List[ComponentLifeDistribution]
+
+
+class LifeDistributionResponse(BaseModel):
+    quantiles: List[float]
+    n_samples: int
+    prediction_horizon_days: int
+    distributions: List[VehicleLifeDistribution]
+    not_found: List[str] = []
+
+
+class PredictionJobRequest(BaseModel):
+    scope: Literal["fleet", "line"] = "fleet"
+    line_number: Optional[str] = None
+    prediction_horizon_days: int = 180
+    incremental: bool = True  # 夜间全量任务默认只重算输入变化的车辆
+
+    @model_validator(mode="after")
+    def check_line_number(self):
+        if self.scope == "line" and not self.line_number:
+            raise ValueError("line_number is required when scope is 'line'")
+        return self
+
+
+class PredictionJobStatus(BaseModel):
+    id: str
+    status: str  # queued, running, completed, failed
+    payload: dict
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    progress: float = 0.0
+    throughput: float = 0.0  # 辆/秒
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class BulkTrendRequest(BaseModel):
+    vehicle_ids: List[str] = Field(..., min_length=1, max_length=500)  # 车辆ID或车辆编号
+    component_types: List[str] = Field(["wheelset", "brake_pad", "pantograph"], min_length=1)
+    days: int = 90
+    bucket: Optional[Literal["day", "week", "month"]] = None
+
+
+class TrendSeries(BaseModel):
+    vehicle_id: UUID
+    vehicle_code: str
+    component_type: str
+    dates: List[date]
+    wear_values: List[float]
+    mileages: List[float]
+    wear_min: Optional[List[float]] = None
+    wear_max: Optional[List[float]] = None
+
+
+class BulkTrendResponse(BaseModel):
+    series: List[TrendSeries]
+    not_found: List[str] = []
 
 
 class WearTrendDataBase(BaseModel):
@@ -81,6 +166,50 @@ class WearTrendData(WearTrendDataBase):
         from_attributes = True
 
 
+class WearTrendImportError(BaseModel):
+    row: int
+    error: str
+
+
+class WearTrendImportReport(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[WearTrendImportError] = []
+    errors_truncated: bool = False
+
+
+class WearModelInfo(BaseModel):
+    version: str
+    trained_at: datetime
+    history_days: int
+    huber_k: Optional[float] = None
+    n_series: int
+    n_observations: int
+    prior_wear_rates: Dict[str, float]  # mm/万km
+    daily_mileage: float
+
+
+class WearModelTrainRequest(BaseModel):
+    version: Optional[str] = Field(None, pattern=r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")  # 缺省按训练时间生成
+    activate: bool = True
+
+
+class WearModelRegistryStatus(BaseModel):
+    active_version: str
+    loaded: Optional[WearModelInfo] = None  # 当前进程已加载的模型
+    versions: List[str]
+
+
+class FeatureStoreStatus(BaseModel):
+    enabled: bool
+    generation: Optional[str] = None
+    watermark: Optional[datetime] = None  # 已物化到该时间（created_at）为止写入的趋势数据
+    built_at: Optional[datetime] = None
+    n_vehicles: int = 0
+    n_observations: int = 0
+
+
 class PredictionResultBase(BaseModel):
     vehicle_id: UUID
     risk_level: str
@@ -91,7 +220,7 @@ class PredictionResultBase(BaseModel):
 
 
 class PredictionResultCreate(PredictionResultBase):
-    pass
+    input_fingerprint: Optional[str] = None
 
 
 class PredictionResultUpdate(BaseModel):
@@ -110,6 +239,12 @@ class PredictionResult(PredictionResultBase):
         from_attributes = True
 
 
+class LatestPredictionView(BaseModel):
+    vehicle_id: UUID
+    result: PredictionResult
+    predictions: List[WearPrediction]
+
+
 class WheelsetStatisticsBase(BaseModel):
     vehicle_id: UUID
     wheelset_position: str
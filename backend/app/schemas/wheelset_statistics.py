@@ -1,8 +1,8 @@
 """
 轮对统计相关的Pydantic模型
 """
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
 from datetime import date, datetime
 from uuid import UUID
 
@@ -49,4 +49,48 @@ class WheelsetStatistics(WheelsetStatisticsBase):
     updated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class WheelsetStatisticsBulkUpsert(BaseModel):
+    # 逐条校验，单条不合格不影响其余记录；vehicle_id 也可填写车辆编号
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=1000)
+
+
+class WheelsetStatisticsUpsertResult(BaseModel):
+    index: int
+    status: Literal["created", "updated", "history_only", "error"]
+    id: Optional[UUID] = None
+    vehicle_id: Optional[UUID] = None
+    wheelset_position: Optional[str] = None
+    error: Optional[str] = None
+
+
+class WheelsetStatisticsBulkUpsertResponse(BaseModel):
+    created: int
+    updated: int
+    history_only: int  # 检测日期早于当前记录，只写入测量历史
+    failed: int
+    results: List[WheelsetStatisticsUpsertResult]
+
+
+class WheelsetMeasurement(BaseModel):
+    id: UUID
+    vehicle_id: UUID
+    wheelset_position: str
+    inspection_date: date
+    current_diameter: float
+    flange_thickness: Optional[float] = None
+    flange_height: Optional[float] = None
+    qr_value: Optional[float] = None
+    mileage_at_measurement: Optional[float] = None
+    last_rewheeling_date: Optional[date] = None
+    next_rewheeling_mileage: Optional[float] = None
+    wear_rate: Optional[float] = None
+    status: Optional[str] = None
+    inspector: Optional[str] = None
+    notes: Optional[str] = None
+    recorded_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,169 @@
+"""
+仪表板聚合服务
+
+用少量分组查询从 vehicles、prediction_results、overhaul_plans 计算仪表板指标，
+结果保存为进程内快照，在有效期内所有访问直接返回快照。
+"""
+from typing import Any, Dict, Optional
+from datetime import date, datetime
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.overhaul import OverhaulPlan, OverhaulStatus
+from app.models.prediction import PredictionResult
+from app.models.vehicle import Vehicle
+
+logger = logging.getLogger(__name__)
+
+# 仪表板列表项数量
+UPCOMING_MAINTENANCE_LIMIT = 5
+RECENT_ALERTS_LIMIT = 5
+
+
+class DashboardService:
+    """仪表板聚合服务类"""
+
+    _snapshot: Optional[Dict[str, Any]] = None
+    _snapshot_at: float = 0.0
+    # 每次失效递增；计算期间发生写入时丢弃本次结果，避免旧数据被当作新快照缓存
+    _generation: int = 0
+    _lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    async def get_dashboard(cls, db: AsyncSession, force_refresh: bool = False) -> Dict[str, Any]:
+        """获取仪表板数据；快照过期时由一个请求重新计算，其余请求等待同一结果"""
+        if not force_refresh and cls._is_fresh():
+            return cls._snapshot
+
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        async with cls._lock:
+            if not force_refresh and cls._is_fresh():
+                return cls._snapshot
+            generation = cls._generation
+            snapshot = await DashboardService.compute_dashboard(db)
+            if generation == cls._generation:
+                cls._snapshot = snapshot
+                cls._snapshot_at = time.monotonic()
+        return snapshot
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """使本进程的快照失效（写入车辆、大修计划或预测结果后调用；其他进程的快照在有效期后自然刷新）"""
+        cls._snapshot = None
+        cls._generation += 1
+
+    @classmethod
+    def _is_fresh(cls) -> bool:
+        return (
+            cls._snapshot is not None
+            and time.monotonic() - cls._snapshot_at < settings.DASHBOARD_SNAPSHOT_TTL
+        )
+
+    @staticmethod
+    async def compute_dashboard(db: AsyncSession) -> Dict[str, Any]:
+        """计算仪表板指标"""
+        today = date.today()
+
+        # 车辆统计：一次聚合查询
+        vehicle_row = (await db.execute(
+            select(
+                func.count(),
+                func.count().filter(Vehicle.status == "active"),
+                func.count().filter(Vehicle.status == "maintenance"),
+                func.avg(Vehicle.total_mileage)
+            )
+        )).one()
+        total_vehicles, active_vehicles, vehicles_in_maintenance, average_mileage = vehicle_row
+
+        # 每辆车最新的预测结果
+        latest_results = (
+            select(
+                PredictionResult.vehicle_id,
+                PredictionResult.risk_level,
+                PredictionResult.maintenance_priority,
+                PredictionResult.next_maintenance_date,
+                PredictionResult.created_at,
+                func.row_number().over(
+                    partition_by=PredictionResult.vehicle_id,
+                    order_by=PredictionResult.created_at.desc()
+                ).label("rank")
+            )
+            .subquery()
+        )
+        latest_filter = latest_results.c.rank == 1
+
+        # 风险分布
+        risk_distribution = {level: 0 for level in settings.RISK_LEVELS}
+        risk_rows = await db.execute(
+            select(latest_results.c.risk_level, func.count())
+            .where(latest_filter)
+            .group_by(latest_results.c.risk_level)
+        )
+        for risk_level, count in risk_rows.all():
+            risk_distribution[risk_level or "low"] = risk_distribution.get(risk_level or "low", 0) + count
+
+        total_predictions = (await db.execute(select(func.count()).select_from(PredictionResult))).scalar_one()
+
+        # 即将到来的维护：预测的下次维护日期 + 已规划的大修计划，按日期合并
+        predicted_rows = await db.execute(
+            select(Vehicle.vehicle_code, latest_results.c.next_maintenance_date, latest_results.c.maintenance_priority)
+            .join(Vehicle, Vehicle.id == latest_results.c.vehicle_id)
+            .where(latest_filter, latest_results.c.next_maintenance_date >= today)
+            .order_by(latest_results.c.next_maintenance_date)
+            .limit(UPCOMING_MAINTENANCE_LIMIT)
+        )
+        upcoming = [
+            {"vehicle_id": vehicle_code, "date": next_date.isoformat(), "type": "预测性维护", "priority": priority or "low"}
+            for vehicle_code, next_date, priority in predicted_rows.all()
+        ]
+        plan_rows = await db.execute(
+            select(OverhaulPlan.train_number, OverhaulPlan.planned_start_date, OverhaulPlan.overhaul_level)
+            .where(
+                OverhaulPlan.status.in_([OverhaulStatus.PLANNING, OverhaulStatus.APPROVED]),
+                OverhaulPlan.planned_start_date >= today
+            )
+            .order_by(OverhaulPlan.planned_start_date)
+            .limit(UPCOMING_MAINTENANCE_LIMIT)
+        )
+        upcoming.extend(
+            {"vehicle_id": train_number, "date": start_date.isoformat(), "type": f"{level.value}级检修", "priority": "medium"}
+            for train_number, start_date, level in plan_rows.all()
+        )
+        upcoming.sort(key=lambda item: item["date"])
+
+        # 最近告警：最新预测为高风险的车辆
+        alert_rows = await db.execute(
+            select(Vehicle.vehicle_code, latest_results.c.created_at, latest_results.c.next_maintenance_date)
+            .join(Vehicle, Vehicle.id == latest_results.c.vehicle_id)
+            .where(latest_filter, latest_results.c.risk_level == "high")
+            .order_by(latest_results.c.created_at.desc())
+            .limit(RECENT_ALERTS_LIMIT)
+        )
+        recent_alerts = [
+            {
+                "time": created_at.isoformat() if created_at else None,
+                "level": "warning",
+                "message": f"车辆{vehicle_code}预测为高风险，建议于{next_date.isoformat() if next_date else '近期'}前维护",
+                "vehicle_id": vehicle_code
+            }
+            for vehicle_code, created_at, next_date in alert_rows.all()
+        ]
+
+        return {
+            "total_vehicles": total_vehicles,
+            "active_vehicles": active_vehicles,
+            "vehicles_in_maintenance": vehicles_in_maintenance,
+            "high_risk_vehicles": risk_distribution.get("critical", 0) + risk_distribution.get("high", 0),
+            "total_predictions": total_predictions,
+            "average_mileage": round(float(average_mileage or 0.0), 2),
+            "upcoming_maintenance": upcoming[:UPCOMING_MAINTENANCE_LIMIT],
+            "risk_distribution": risk_distribution,
+            "recent_alerts": recent_alerts,
+            "generated_at": datetime.utcnow()
+        }
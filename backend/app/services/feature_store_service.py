@@ -0,0 +1,153 @@
+"""
+磨耗特征库刷新服务
+
+按 created_at 水位线从 wear_trend_data 增量读取新写入的行并合并进特征库，
+轮对特征（最近检查轮径、最近镟修日期）每次整体刷新。
+"""
+from typing import Dict, List, Optional
+from uuid import UUID
+import asyncio
+import logging
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, or_
+from datetime import datetime, timedelta, timezone
+from app.config import settings
+from app.ml.feature_store import FeatureSnapshot, wear_feature_store
+from app.models.prediction import WearTrendData as WearTrendDataModel, WheelsetStatistics as WheelsetStatisticsModel
+from app.services.prediction_engine import COMPONENTS
+
+logger = logging.getLogger(__name__)
+
+# 流式读取趋势数据时每批的行数
+FETCH_PARTITION_SIZE = 50000
+
+# 同一进程内的刷新串行执行
+_refresh_lock = asyncio.Lock()
+
+
+class FeatureStoreService:
+    """特征库服务类"""
+
+    @staticmethod
+    def get_snapshot() -> Optional[FeatureSnapshot]:
+        """当前可用的特征库快照；未启用、未构建或部件顺序不一致时返回 None"""
+        if not settings.FEATURE_STORE_ENABLED:
+            return None
+        snapshot = wear_feature_store.snapshot()
+        if snapshot is None or snapshot.components != COMPONENTS:
+            return None
+        return snapshot
+
+    @staticmethod
+    def get_status() -> Dict:
+        """特征库状态"""
+        snapshot = wear_feature_store.snapshot()
+        return {
+            "enabled": settings.FEATURE_STORE_ENABLED,
+            "generation": snapshot.generation if snapshot else None,
+            "watermark": snapshot.watermark if snapshot else None,
+            "built_at": snapshot.built_at if snapshot else None,
+            "n_vehicles": snapshot.n_vehicles if snapshot else 0,
+            "n_observations": snapshot.n_observations if snapshot else 0,
+        }
+
+    @staticmethod
+    async def refresh(db: AsyncSession, full: bool = False) -> FeatureSnapshot:
+        """
+        刷新特征库
+
+        增量刷新只读取 created_at 在上次水位线之后、且早于 当前时间-FEATURE_STORE_WATERMARK_LAG 的行，
+        与当前版本合并后写入新版本；full=True 或尚未构建时全量重建。
+        新水位线取本次截止时间，之后写入的行由下一次刷新读取。
+        """
+        async with _refresh_lock:
+            base = None if full else wear_feature_store.snapshot()
+            if base is not None and (base.components != COMPONENTS or base.watermark is None):
+                base = None
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.FEATURE_STORE_WATERMARK_LAG)
+            if base is not None and cutoff <= base.watermark:
+                return base
+
+            created_at = WearTrendDataModel.created_at
+            if base is not None:
+                window = and_(created_at > base.watermark, created_at <= cutoff)
+            else:
+                window = or_(created_at.is_(None), created_at <= cutoff)
+            rows = await FeatureStoreService._fetch_trend_rows(db, window)
+            vehicle_features = await FeatureStoreService._get_vehicle_features(db)
+
+            snapshot = await asyncio.to_thread(
+                wear_feature_store.write,
+                COMPONENTS,
+                rows["vehicle_ids"],
+                rows["component_col"],
+                rows["day"],
+                rows["mileage"],
+                rows["wear"],
+                vehicle_features,
+                cutoff,
+                base
+            )
+            logger.info(
+                f"Feature store {'incremental' if base is not None else 'full'} refresh: "
+                f"{len(rows['vehicle_ids'])} new rows, watermark {cutoff.isoformat()}"
+            )
+            return snapshot
+
+    @staticmethod
+    async def _fetch_trend_rows(db: AsyncSession, window) -> Dict:
+        """按批流式读取窗口内的趋势数据，转换为列数组"""
+        component_cols = {component: col for col, component in enumerate(COMPONENTS)}
+        vehicle_ids: List[UUID] = []
+        columns = {"component_col": [], "day": [], "mileage": [], "wear": []}
+        result = await db.stream(
+            select(
+                WearTrendDataModel.vehicle_id,
+                WearTrendDataModel.component_type,
+                WearTrendDataModel.date,
+                WearTrendDataModel.mileage,
+                WearTrendDataModel.wear_value
+            )
+            .where(and_(WearTrendDataModel.component_type.in_(COMPONENTS), window))
+            .execution_options(yield_per=FETCH_PARTITION_SIZE)
+        )
+        async for partition in result.partitions(FETCH_PARTITION_SIZE):
+            vehicle_ids.extend(row[0] for row in partition)
+            columns["component_col"].append(np.array([component_cols[row[1]] for row in partition], dtype=np.int64))
+            columns["day"].append(np.array([row[2].toordinal() for row in partition], dtype=np.int32))
+            columns["mileage"].append(np.array([row[3] for row in partition], dtype=np.float64))
+            columns["wear"].append(np.array([row[4] for row in partition], dtype=np.float64))
+        arrays = {
+            name: np.concatenate(parts) if parts else np.empty(0)
+            for name, parts in columns.items()
+        }
+        arrays["vehicle_ids"] = vehicle_ids
+        return arrays
+
+    @staticmethod
+    async def _get_vehicle_features(db: AsyncSession) -> Dict[UUID, Dict[str, float]]:
+        """每辆车最近一次检查的轮径和最近镟修日期序号"""
+        ranked = (
+            select(
+                WheelsetStatisticsModel.vehicle_id,
+                WheelsetStatisticsModel.current_diameter,
+                WheelsetStatisticsModel.last_rewheeling_date,
+                func.row_number().over(
+                    partition_by=WheelsetStatisticsModel.vehicle_id,
+                    order_by=WheelsetStatisticsModel.inspection_date.desc()
+                ).label("rank")
+            )
+            .subquery()
+        )
+        result = await db.execute(
+            select(ranked.c.vehicle_id, ranked.c.current_diameter, ranked.c.last_rewheeling_date)
+            .where(ranked.c.rank == 1)
+        )
+        return {
+            vehicle_id: {
+                "diameter": current_diameter or None,
+                "rewheeling_day": last_rewheeling_date.toordinal() if last_rewheeling_date else None,
+            }
+            for vehicle_id, current_diameter, last_rewheeling_date in result.all()
+        }
@@ -0,0 +1,240 @@
+"""
+批量预测计算引擎
+
+将 N 辆车 × 3 个部件的磨耗预测计算展开为 NumPy 数组运算，
+不依赖数据库，输入输出均为按车辆排列的数组。磨耗率由 app.ml.wear_rate_model
+按趋势历史拟合（车队先验收缩），置信度来自拟合残差。
+sample_life_distribution 按拟合不确定性蒙特卡洛抽样，给出剩余寿命分位数。
+"""
+from typing import Dict, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from app.ml.wear_rate_model import MILEAGE_UNIT, FleetPrior, WearRateFit, fit_wear_rates
+
+
+# 算法版本，参与预测输入指纹计算；算法变化时递增以使增量缓存失效
+ENGINE_VERSION = "2"
+
+# 部件顺序与 calculate_prediction 原有循环顺序保持一致
+COMPONENTS = ("wheelset", "brake_pad", "pantograph")
+
+# 基础磨耗值（轮对为直径mm，其余为厚度mm），无检测和趋势数据时使用
+BASE_WEAR_VALUES = np.array([3.5, 30.0, 10.0])
+
+# 最小安全阈值：轮径840mm、制动片5mm、受电弓3mm
+MIN_THRESHOLDS = np.array([840.0, 5.0, 3.0])
+
+# 轮对列索引（检测直径优先作为当前值）
+WHEELSET_INDEX = 0
+
+# 剩余寿命上限（天），磨耗率为0时使用
+MAX_REMAINING_LIFE_DAYS = 3650
+
+# 剩余寿命分布默认分位点（P10/P50/P90）
+LIFE_QUANTILES = (0.1, 0.5, 0.9)
+
+# 单个抽样数组的最大元素数（序列数×样本数），超过时按序列分块抽样以限制内存
+MAX_SAMPLE_ELEMENTS = 1 << 22
+
+# 部件位置标签
+COMPONENT_POSITIONS = tuple(
+    f"{'前' if i % 2 == 0 else '后'}{'左' if i // 2 == 0 else '右'}"
+    for i in range(len(COMPONENTS))
+)
+
+
+def fit_component_wear_rates(
+    vehicle_row: np.ndarray,
+    component_col: np.ndarray,
+    day: np.ndarray,
+    mileage: np.ndarray,
+    wear: np.ndarray,
+    n_vehicles: int,
+    rewheeling_day: Optional[np.ndarray] = None,
+    prior: Optional[FleetPrior] = None,
+    huber_k: Optional[float] = None
+) -> WearRateFit:
+    """
+    拟合 N 辆车 × 3 个部件的磨耗率
+
+    观测以扁平数组给出：所属车辆行号、部件列号（同 COMPONENTS）、日期序号、里程、磨耗值。
+    rewheeling_day 为各车最近一次镟修的日期序号（NaN 表示无记录），镟修前的轮对观测
+    不属于当前轮廓，拟合时剔除。结果各数组长度为 N×3，按 (车辆, 部件) 行优先排列。
+    """
+    vehicle_row = np.asarray(vehicle_row, dtype=np.int64)
+    component_col = np.asarray(component_col, dtype=np.int64)
+    day = np.asarray(day, dtype=np.float64)
+    mileage = np.asarray(mileage, dtype=np.float64)
+    wear = np.asarray(wear, dtype=np.float64)
+
+    if rewheeling_day is not None:
+        cutoff = np.nan_to_num(np.asarray(rewheeling_day, dtype=np.float64), nan=-np.inf)
+        keep = (component_col != WHEELSET_INDEX) | (day >= cutoff[vehicle_row])
+        vehicle_row, component_col = vehicle_row[keep], component_col[keep]
+        day, mileage, wear = day[keep], mileage[keep], wear[keep]
+
+    n_components = len(COMPONENTS)
+    return fit_wear_rates(
+        group=vehicle_row * n_components + component_col,
+        component=np.tile(np.arange(n_components), n_vehicles),
+        mileage=mileage,
+        wear=wear,
+        day=day,
+        n_groups=n_vehicles * n_components,
+        components=COMPONENTS,
+        prior=prior,
+        huber_k=huber_k
+    )
+
+
+def compute_wear_arrays(
+    current_mileage: np.ndarray,
+    wheelset_diameter: np.ndarray,
+    prediction_horizon_days: int = 180,
+    wear_fit: Optional[WearRateFit] = None
+) -> Dict[str, np.ndarray]:
+    """
+    计算所有车辆×部件的磨耗预测
+
+    参数均为长度 N 的一维数组，缺失值用 NaN 表示：
+    - current_mileage: 车辆当前总里程
+    - wheelset_diameter: 最新轮对直径（无检测记录为 NaN）
+    - wear_fit: fit_component_wear_rates 的拟合结果；为 None 时全部使用默认先验
+
+    当前磨耗值依次取：轮对检测直径、最近一次趋势观测值、基础值。
+    剩余寿命 = (当前值 - 最小阈值) / 磨耗率，按各车日均走行里程折算为天数。
+    返回字典中各数组形状为 (N, 3)，列顺序同 COMPONENTS。
+    """
+    current_mileage = np.asarray(current_mileage, dtype=np.float64)
+    wheelset_diameter = np.asarray(wheelset_diameter, dtype=np.float64)
+    n = current_mileage.shape[0]
+    shape = (n, len(COMPONENTS))
+
+    if wear_fit is None:
+        wear_fit = fit_component_wear_rates([], [], [], [], [], n)
+
+    wear_rate = wear_fit.wear_rate.reshape(shape)
+    daily_mileage = wear_fit.daily_mileage.reshape(shape)
+    current_wear, _ = _current_wear(wheelset_diameter, wear_fit, shape)
+
+    # 剩余磨耗量（直径/厚度距最小阈值）
+    remaining_wear = np.maximum(current_wear - MIN_THRESHOLDS, 0.0)
+    daily_wear = wear_rate * daily_mileage / MILEAGE_UNIT
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        remaining_life_days = np.where(
+            daily_wear > 0, np.trunc(remaining_wear / daily_wear), MAX_REMAINING_LIFE_DAYS
+        )
+        remaining_life_mileage = np.where(
+            wear_rate > 0, remaining_wear / wear_rate * MILEAGE_UNIT, MAX_REMAINING_LIFE_DAYS * daily_mileage
+        )
+
+    # 剩余天数不为负且不超过上限
+    remaining_life_days = np.clip(remaining_life_days, 1, MAX_REMAINING_LIFE_DAYS).astype(np.int64)
+
+    predicted_wear = current_wear - daily_wear * prediction_horizon_days
+
+    return {
+        "current_wear": current_wear,
+        "predicted_wear": predicted_wear,
+        "wear_rate": wear_rate,
+        "remaining_life_days": remaining_life_days,
+        "remaining_life_mileage": remaining_life_mileage,
+        "confidence_score": np.round(wear_fit.confidence.reshape(shape), 2),
+    }
+
+
+def sample_life_distribution(
+    current_mileage: np.ndarray,
+    wheelset_diameter: np.ndarray,
+    wear_fit: WearRateFit,
+    n_samples: int = 1000,
+    prediction_horizon_days: int = 180,
+    quantiles: Sequence[float] = LIFE_QUANTILES,
+    seed: Optional[Union[int, np.random.SeedSequence]] = None,
+    vehicle_offset: int = 0
+) -> Dict[str, np.ndarray]:
+    """
+    蒙特卡洛抽样所有车辆×部件的剩余寿命分布
+
+    每个序列独立抽取 n_samples 组：
+    - 磨耗率 ~ N(wear_rate, wear_rate_std²)，截断于0（磨耗不可逆，非正磨耗率按剩余寿命上限计）；
+    - 当前磨耗值 ~ N(current_wear, residual_std²)，轮对检测直径视为准确值。
+    每辆车使用由 seed 和车辆序号（vehicle_offset + 行号）派生的独立随机流，同一 seed 下各车的
+    样本与调用方如何分批无关。所有序列的样本在同一个 (序列数, n_samples) 数组上计算，
+    序列多时按 MAX_SAMPLE_ELEMENTS 分块。
+    剩余天数按各车日均走行里程由剩余里程折算，上限与 compute_wear_arrays 一致。
+
+    返回：
+    - remaining_life_days / remaining_life_mileage: 形状 (N, 3, 分位点数)，依次对应 quantiles
+    - due_probability: 形状 (N, 3)，prediction_horizon_days 内到达最小阈值的概率
+    """
+    current_mileage = np.asarray(current_mileage, dtype=np.float64)
+    wheelset_diameter = np.asarray(wheelset_diameter, dtype=np.float64)
+    shape = (current_mileage.shape[0], len(COMPONENTS))
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+
+    current_wear, has_diameter = _current_wear(wheelset_diameter, wear_fit, shape)
+    wear_std = np.nan_to_num(wear_fit.residual_std.reshape(shape), nan=0.0)
+    wear_std[has_diameter, WHEELSET_INDEX] = 0.0
+
+    # 展平为序列，抽样数组为 (序列, 样本)，分位数沿连续的最后一维计算
+    current_wear = current_wear.ravel()
+    wear_std = wear_std.ravel()
+    threshold = np.broadcast_to(MIN_THRESHOLDS, shape).ravel()
+    wear_rate = wear_fit.wear_rate
+    wear_rate_std = wear_fit.wear_rate_std
+    daily_mileage = wear_fit.daily_mileage
+    max_mileage = MAX_REMAINING_LIFE_DAYS * daily_mileage
+
+    n_series = current_wear.shape[0]
+    life_mileage = np.empty((n_series, quantiles.shape[0]))
+    due_probability = np.empty(n_series)
+    horizon_mileage = prediction_horizon_days * daily_mileage
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    n_components = len(COMPONENTS)
+    block = max(1, MAX_SAMPLE_ELEMENTS // (n_samples * n_components))
+    for first in range(0, shape[0], block):
+        rate_noise, wear_noise = _vehicle_normals(
+            seed_sequence, vehicle_offset + first, min(block, shape[0] - first), n_samples
+        )
+        s = slice(first * n_components, first * n_components + rate_noise.shape[0])
+        rate = np.maximum(wear_rate[s, None] + wear_rate_std[s, None] * rate_noise, 0.0)
+        remaining = np.maximum(current_wear[s, None] + wear_std[s, None] * wear_noise - threshold[s, None], 0.0)
+        positive = rate > 0
+        mileage = np.where(positive, remaining / np.where(positive, rate, 1.0) * MILEAGE_UNIT, max_mileage[s, None])
+        life_mileage[s] = np.quantile(mileage, quantiles, axis=1).T
+        due_probability[s] = np.mean(mileage <= horizon_mileage[s, None], axis=1)
+
+    # 剩余天数与剩余里程单调对应，分位数可直接折算
+    life_days = np.clip(np.trunc(life_mileage / daily_mileage[:, None]), 1, MAX_REMAINING_LIFE_DAYS).astype(np.int64)
+    return {
+        "remaining_life_days": life_days.reshape(shape + (-1,)),
+        "remaining_life_mileage": life_mileage.reshape(shape + (-1,)),
+        "due_probability": due_probability.reshape(shape),
+    }
+
+
+def _vehicle_normals(
+    seed_sequence: np.random.SeedSequence, first_vehicle: int, n_vehicles: int, n_samples: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """从各车辆自己的随机流抽取磨耗率和当前磨耗值的标准正态噪声，形状 (车辆数×部件数, n_samples)"""
+    size = (n_vehicles, len(COMPONENTS), n_samples)
+    rate_noise = np.empty(size)
+    wear_noise = np.empty(size)
+    for i in range(n_vehicles):
+        rng = np.random.default_rng(np.random.SeedSequence(
+            seed_sequence.entropy, spawn_key=seed_sequence.spawn_key + (first_vehicle + i,)
+        ))
+        rng.standard_normal(out=rate_noise[i])
+        rng.standard_normal(out=wear_noise[i])
+    return rate_noise.reshape(-1, n_samples), wear_noise.reshape(-1, n_samples)
+
+
+def _current_wear(wheelset_diameter: np.ndarray, wear_fit: WearRateFit, shape: tuple):
+    """当前磨耗值：轮对检测直径、最近一次趋势观测值、基础值依次取用；同时返回有检测直径的车辆掩码"""
+    latest_wear = wear_fit.latest_wear.reshape(shape)
+    current_wear = np.where(np.isfinite(latest_wear), latest_wear, BASE_WEAR_VALUES)
+    has_diameter = np.nan_to_num(wheelset_diameter, nan=0.0) != 0
+    current_wear[has_diameter, WHEELSET_INDEX] = wheelset_diameter[has_diameter]
+    return current_wear, has_diameter
@@ -1,14 +1,48 @@
 """
 预测服务层
 """
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from uuid import UUID
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from datetime import date, datetime, timedelta
+from sqlalchemy import select, insert, func, and_, cast, Date
+from datetime import date, datetime, timedelta, timezone
+from app.config import settings
+from app.core.cache import TieredCache
+from app.core.database import AsyncSessionLocal
+from app.ml.model_registry import WearModel, new_version, wear_model_registry
+from app.ml.wear_rate_model import FleetPrior
 from app.models.prediction import WearPrediction as WearPredictionModel, WearTrendData as WearTrendDataModel, PredictionResult as PredictionResultModel, WheelsetStatistics as WheelsetStatisticsModel
 from app.models.vehicle import Vehicle
-from app.schemas.prediction import WearPredictionCreate, WearPredictionUpdate, WearTrendDataCreate, PredictionResultCreate, PredictionResultUpdate
+from app.schemas.prediction import WearPredictionCreate, WearPredictionUpdate, WearTrendDataCreate, PredictionResultCreate, PredictionResultUpdate, WearPrediction as WearPredictionSchema, PredictionResult as PredictionResultSchema
+from app.services.dashboard_service import DashboardService
+from app.services.feature_store_service import FeatureStoreService
+from app.services.vehicle_resolver import vehicle_resolver
+from app.services.prediction_engine import COMPONENTS, COMPONENT_POSITIONS, ENGINE_VERSION, LIFE_QUANTILES, WHEELSET_INDEX
+from app.services.scoring_pool import ScoringInputs, scoring_pool
+
+logger = logging.getLogger(__name__)
+
+# 单次 IN 查询的最大参数数量
+IN_CLAUSE_CHUNK_SIZE = 500
+
+# 未训练模型时增量预测使用默认车队先验，输入指纹中以此代替模型版本
+DEFAULT_PRIOR_VERSION = "default-prior"
+
+# 每辆车最新预测（结果+各部件预测）的读穿缓存，写入新预测时失效
+latest_prediction_cache = TieredCache(
+    "latest_prediction",
+    max_size=settings.PREDICTION_CACHE_MAX_SIZE,
+    local_ttl=settings.PREDICTION_CACHE_LOCAL_TTL,
+    redis_url=settings.REDIS_URL if settings.PREDICTION_CACHE_REDIS_ENABLED else None,
+    redis_ttl=settings.REDIS_CACHE_TTL,
+    redis_password=settings.REDIS_PASSWORD
+)
 
 
 class PredictionService:
@@ -68,6 +102,119 @@ class PredictionService:
         )
         return result.scalars().all()
 
+    @staticmethod
+    async def get_wear_trend_buckets(
+        db: AsyncSession, vehicle_id: UUID, component_type: str, days: int = 90, bucket: str = "day"
+    ) -> List[dict]:
+        """按日/周/月在数据库中聚合磨耗趋势数据（各桶的最小/最大/平均磨耗值和里程）"""
+        from_date = date.today() - timedelta(days=days)
+        bucket_start = _trend_bucket_expression(db.bind.dialect.name, bucket).label("bucket_start")
+        result = await db.execute(
+            select(
+                bucket_start,
+                func.min(WearTrendDataModel.wear_value),
+                func.max(WearTrendDataModel.wear_value),
+                func.avg(WearTrendDataModel.wear_value),
+                func.min(WearTrendDataModel.mileage),
+                func.max(WearTrendDataModel.mileage),
+                func.avg(WearTrendDataModel.mileage),
+                func.count()
+            )
+            .where(
+                and_(
+                    WearTrendDataModel.vehicle_id == vehicle_id,
+                    WearTrendDataModel.component_type == component_type,
+                    WearTrendDataModel.date >= from_date
+                )
+            )
+            .group_by(bucket_start)
+            .order_by(bucket_start)
+        )
+        return [
+            {
+                "date": start.isoformat() if isinstance(start, date) else str(start)[:10],
+                "wear_value": avg_wear,
+                "wear_min": min_wear,
+                "wear_max": max_wear,
+                "mileage": avg_mileage,
+                "mileage_min": min_mileage,
+                "mileage_max": max_mileage,
+                "count": row_count
+            }
+            for start, min_wear, max_wear, avg_wear, min_mileage, max_mileage, avg_mileage, row_count in result.all()
+        ]
+
+    @staticmethod
+    async def get_wear_trend_series_bulk(
+        db: AsyncSession,
+        vehicle_ids: List[UUID],
+        component_types: List[str],
+        days: int = 90,
+        bucket: Optional[str] = None
+    ) -> Dict[Tuple[UUID, str], Dict[str, list]]:
+        """
+        批量获取多车多部件的磨耗趋势序列
+
+        一次查询取回所有序列，按 (车辆ID, 部件类型) 分组为列式数组
+        {"dates": [...], "wear_values": [...], "mileages": [...]}；
+        指定 bucket 时在数据库中聚合，数组取各桶平均值并附带最小/最大磨耗值。
+        """
+        from_date = date.today() - timedelta(days=days)
+        series = {}
+        for chunk in _chunked(vehicle_ids, IN_CLAUSE_CHUNK_SIZE):
+            filters = and_(
+                WearTrendDataModel.vehicle_id.in_(chunk),
+                WearTrendDataModel.component_type.in_(component_types),
+                WearTrendDataModel.date >= from_date
+            )
+            if bucket:
+                bucket_start = _trend_bucket_expression(db.bind.dialect.name, bucket).label("bucket_start")
+                query = (
+                    select(
+                        WearTrendDataModel.vehicle_id,
+                        WearTrendDataModel.component_type,
+                        bucket_start,
+                        func.avg(WearTrendDataModel.wear_value),
+                        func.avg(WearTrendDataModel.mileage),
+                        func.min(WearTrendDataModel.wear_value),
+                        func.max(WearTrendDataModel.wear_value)
+                    )
+                    .where(filters)
+                    .group_by(WearTrendDataModel.vehicle_id, WearTrendDataModel.component_type, bucket_start)
+                    .order_by(WearTrendDataModel.vehicle_id, WearTrendDataModel.component_type, bucket_start)
+                )
+            else:
+                query = (
+                    select(
+                        WearTrendDataModel.vehicle_id,
+                        WearTrendDataModel.component_type,
+                        WearTrendDataModel.date,
+                        WearTrendDataModel.wear_value,
+                        WearTrendDataModel.mileage
+                    )
+                    .where(filters)
+                    .order_by(WearTrendDataModel.vehicle_id, WearTrendDataModel.component_type, WearTrendDataModel.date)
+                )
+
+            result = await db.execute(query)
+            for row in result.all():
+                vehicle_id, component_type, point_date, wear_value, mileage = row[:5]
+                columns = series.get((vehicle_id, component_type))
+                if columns is None:
+                    columns = {"dates": [], "wear_values": [], "mileages": []}
+                    if bucket:
+                        columns.update({"wear_min": [], "wear_max": []})
+                    series[(vehicle_id, component_type)] = columns
+                columns["dates"].append(
+                    point_date.isoformat() if isinstance(point_date, date) else str(point_date)[:10]
+                )
+                columns["wear_values"].append(wear_value)
+                columns["mileages"].append(mileage)
+                if bucket:
+                    columns["wear_min"].append(row[5])
+                    columns["wear_max"].append(row[6])
+        return series
+
     @staticmethod
     async def create_prediction_result(db: AsyncSession, result_data: PredictionResultCreate) -> PredictionResultModel:
         """创建预测结果"""
@@ -75,8 +222,45 @@ class PredictionService:
         db.add(result)
         await db.commit()
         await db.refresh(result)
+        DashboardService.invalidate()
         return result
 
+    @staticmethod
+    async def bulk_create_wear_predictions(
+        db: AsyncSession,
+        predictions_data: List[WearPredictionCreate],
+        commit: bool = True
+    ) -> List[WearPredictionModel]:
+        """批量创建磨耗预测（单条多行 INSERT ... RETURNING，按输入顺序返回）"""
+        if not predictions_data:
+            return []
+        result = await db.scalars(
+            insert(WearPredictionModel).returning(WearPredictionModel, sort_by_parameter_order=True),
+            [prediction_data.dict() for prediction_data in predictions_data]
+        )
+        predictions = result.all()
+        if commit:
+            await db.commit()
+        return predictions
+
+    @staticmethod
+    async def bulk_create_prediction_results(
+        db: AsyncSession,
+        results_data: List[PredictionResultCreate],
+        commit: bool = True
+    ) -> List[PredictionResultModel]:
+        """批量创建预测结果（单条多行 INSERT ... RETURNING，按输入顺序返回）"""
+        if not results_data:
+            return []
+        result = await db.scalars(
+            insert(PredictionResultModel).returning(PredictionResultModel, sort_by_parameter_order=True),
+            [result_data.dict() for result_data in results_data]
+        )
+        prediction_results = result.all()
+        if commit:
+            await db.commit()
+        return prediction_results
+
     @staticmethod
     async def get_prediction_result_by_vehicle(db: AsyncSession, vehicle_id: UUID) -> Optional[PredictionResultModel]:
         """根据车辆ID获取最新的预测结果"""
@@ -84,152 +268,650 @@ class PredictionService:
             select(PredictionResultModel)
             .where(PredictionResultModel.vehicle_id == vehicle_id)
             .order_by(PredictionResultModel.created_at.desc())
+            .limit(1)
         )
-        return result.scalar_one_or_none()
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_latest_prediction_view(db: AsyncSession, vehicle_id: UUID) -> Optional[dict]:
+        """
+        获取车辆最新预测视图（最新预测结果 + 各部件最新磨耗预测）
+
+        优先读取缓存，未命中时查询数据库并回填；车辆没有预测时返回 None。
+        """
+        cache_key = str(vehicle_id)
+        view = await latest_prediction_cache.get(cache_key)
+        if view is not None:
+            return view
+
+        prediction_result = await PredictionService.get_prediction_result_by_vehicle(db, vehicle_id)
+        if prediction_result is None:
+            return None
+        latest_predictions = await PredictionService.get_latest_wear_predictions_bulk(db, [vehicle_id])
+
+        view = {
+            "vehicle_id": cache_key,
+            "result": PredictionResultSchema.model_validate(prediction_result).model_dump(mode="json"),
+            "predictions": [
+                WearPredictionSchema.model_validate(prediction).model_dump(mode="json")
+                for prediction in latest_predictions[vehicle_id]
+            ]
+        }
+        await latest_prediction_cache.set(cache_key, view)
+        return view
 
     @staticmethod
     async def calculate_prediction(
         db: AsyncSession, 
         vehicle_id: str, 
-        prediction_horizon_days: int = 180
+        prediction_horizon_days: int = 180,
+        incremental: bool = False
     ) -> Tuple[List[WearPredictionModel], str, float, List[dict]]:
         """
         计算磨耗预测
         返回: (预测列表, 风险等级, 整体置信度, 维护建议)
         """
-        from uuid import UUID as uuid_lib
-        
-        # 首先尝试将vehicle_id转换为UUID
-        try:
-            uuid_vehicle_id = uuid_lib(vehicle_id)
-        except ValueError:
-            # 如果不是UUID格式，尝试通过vehicle_code查找
-            vehicle_result = await db.execute(
-                select(Vehicle).where(Vehicle.vehicle_code == vehicle_id)
+        results = await PredictionService.calculate_batch_prediction(
+            db, [vehicle_id], prediction_horizon_days, incremental
+        )
+        if vehicle_id not in results:
+            raise ValueError(f"Vehicle with ID or code {vehicle_id} not found")
+        return results[vehicle_id]
+
+    @staticmethod
+    async def resolve_vehicles(db: AsyncSession, vehicle_ids: List[str]) -> Dict[str, Vehicle]:
+        """批量将车辆ID或车辆编号解析为车辆对象，未找到的ID不出现在结果中"""
+        resolved_ids = await vehicle_resolver.resolve_many(db, vehicle_ids)
+        by_id = {}
+        for chunk in _chunked(list(set(resolved_ids.values())), IN_CLAUSE_CHUNK_SIZE):
+            result = await db.execute(select(Vehicle).where(Vehicle.id.in_(chunk)))
+            for vehicle in result.scalars():
+                by_id[vehicle.id] = vehicle
+        return {
+            identifier: by_id[vehicle_id]
+            for identifier, vehicle_id in resolved_ids.items()
+            if vehicle_id in by_id
+        }
+
+    @staticmethod
+    async def get_latest_wheelset_statistics_bulk(
+        db: AsyncSession, vehicle_ids: List[UUID]
+    ) -> Dict[UUID, WheelsetStatisticsModel]:
+        """批量获取每辆车最近一次检查的轮对统计数据"""
+        latest = {}
+        for chunk in _chunked(vehicle_ids, IN_CLAUSE_CHUNK_SIZE):
+            ranked = (
+                select(
+                    WheelsetStatisticsModel.id,
+                    func.row_number().over(
+                        partition_by=WheelsetStatisticsModel.vehicle_id,
+                        order_by=WheelsetStatisticsModel.inspection_date.desc()
+                    ).label("rank")
+                )
+                .where(WheelsetStatisticsModel.vehicle_id.in_(chunk))
+                .subquery()
+            )
+            result = await db.execute(
+                select(WheelsetStatisticsModel)
+                .join(ranked, ranked.c.id == WheelsetStatisticsModel.id)
+                .where(ranked.c.rank == 1)
             )
-            vehicle = vehicle_result.scalar_one_or_none()
-            if not vehicle:
-                raise ValueError(f"Vehicle with ID or code {vehicle_id} not found")
-            uuid_vehicle_id = vehicle.id
+            for stats in result.scalars():
+                latest[stats.vehicle_id] = stats
+        return latest
+
+    @staticmethod
+    async def get_wear_history_arrays(
+        db: AsyncSession, vehicle_ids: List[UUID], days: int
+    ) -> Dict[str, np.ndarray]:
+        """
+        批量获取多辆车各部件的磨耗趋势历史，按列返回数组
+
+        返回 vehicle_row（vehicle_ids 中的下标）、component_col（COMPONENTS 下标）、day（日期序号）、
+        mileage、wear 五列，不构造 ORM 对象。启用特征库时，水位线之前的数据从内存映射文件读取，
+        只向数据库查询水位线之后写入的行。
+        """
+        from_date = date.today() - timedelta(days=days)
+        snapshot = FeatureStoreService.get_snapshot()
+        parts = []
+        conditions = [
+            WearTrendDataModel.component_type.in_(COMPONENTS),
+            WearTrendDataModel.date >= from_date
+        ]
+        if snapshot is not None:
+            parts.append(snapshot.select(vehicle_ids, since_day=from_date.toordinal()))
+            conditions.append(WearTrendDataModel.created_at > snapshot.watermark)
+
+        rows = []
+        for chunk in _chunked(vehicle_ids, IN_CLAUSE_CHUNK_SIZE):
+            result = await db.execute(
+                select(
+                    WearTrendDataModel.vehicle_id,
+                    WearTrendDataModel.component_type,
+                    WearTrendDataModel.date,
+                    WearTrendDataModel.mileage,
+                    WearTrendDataModel.wear_value
+                )
+                .where(and_(WearTrendDataModel.vehicle_id.in_(chunk), *conditions))
+            )
+            rows.extend(result.all())
+        vehicle_rows = {vehicle_id: row for row, vehicle_id in enumerate(vehicle_ids)}
+        component_cols = {component: col for col, component in enumerate(COMPONENTS)}
+        parts.append({
+            "vehicle_row": np.array([vehicle_rows[row[0]] for row in rows], dtype=np.int64),
+            "component_col": np.array([component_cols[row[1]] for row in rows], dtype=np.int64),
+            "day": np.array([row[2].toordinal() for row in rows], dtype=np.float64),
+            "mileage": np.array([row[3] for row in rows], dtype=np.float64),
+            "wear": np.array([row[4] for row in rows], dtype=np.float64),
+        })
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[-1]}
+
+    @staticmethod
+    async def calculate_batch_prediction(
+        db: AsyncSession,
+        vehicle_ids: List[str],
+        prediction_horizon_days: int = 180,
+        incremental: bool = False
+    ) -> Dict[str, Tuple[List[WearPredictionModel], str, float, List[dict]]]:
+        """
+        批量计算磨耗预测
+
+        车辆、轮对统计和趋势数据均以集合查询一次性加载，所有车辆×部件的
+        磨耗率、剩余寿命和更换日期在 NumPy 数组上统一计算，结果一次提交。
+        incremental=True 时，输入指纹与最近一次预测结果一致的车辆直接返回已存储的预测
+        （剩余寿命和风险等级按今天重新推算），不重新计算也不写入新记录。
+        未训练模型时，非增量模式由本批数据估计先验；增量模式改用固定的默认先验，
+        使每辆车的结果只取决于自身输入，可跨批次复用。
+        返回: {输入的车辆ID或编号: (预测列表, 风险等级, 整体置信度, 维护建议)}，
+        未找到的车辆不出现在结果中。
+        """
+        vehicles = await PredictionService.resolve_vehicles(db, vehicle_ids)
+        if not vehicles:
+            return {}
+
+        keys = [key for key in dict.fromkeys(vehicle_ids) if key in vehicles]
+        uuid_vehicle_ids = list({vehicles[key].id: None for key in keys})
 
         # 查询车辆的轮对统计信息（上次镟修时间等）
-        wheelset_stats_result = await db.execute(
-            select(WheelsetStatisticsModel)
-            .where(WheelsetStatisticsModel.vehicle_id == uuid_vehicle_id)
-            .order_by(WheelsetStatisticsModel.inspection_date.desc())
+        wheelset_stats = await PredictionService.get_latest_wheelset_statistics_bulk(db, uuid_vehicle_ids)
+
+        # 当前生效的车队模型；未训练时由本批数据估计先验，结果随批次组成变化无法复用，
+        # 增量模式改用默认先验（指纹中以 DEFAULT_PRIOR_VERSION 区分）
+        wear_model = wear_model_registry.get()
+        if wear_model is not None:
+            prior, model_version = wear_model.prior_for(COMPONENTS), wear_model.version
+        elif incremental:
+            prior, model_version = FleetPrior.default(COMPONENTS), DEFAULT_PRIOR_VERSION
+        else:
+            prior, model_version = None, None
+
+        # 计算输入指纹
+        trend_watermarks = await PredictionService.get_wear_trend_watermarks_bulk(db, uuid_vehicle_ids)
+        fingerprints = {
+            vehicle.id: _input_fingerprint(
+                vehicle, wheelset_stats.get(vehicle.id), trend_watermarks.get(vehicle.id), prediction_horizon_days,
+                model_version
+            )
+            for vehicle in vehicles.values()
+        }
+
+        cached = {}
+        if incremental:
+            cached = await PredictionService._get_cached_predictions(db, uuid_vehicle_ids, fingerprints)
+        results = {key: cached[vehicles[key].id] for key in keys if vehicles[key].id in cached}
+        keys = [key for key in keys if key not in results]
+        if not keys:
+            return results
+        uuid_vehicle_ids = list({vehicles[key].id: None for key in keys})
+
+        # 按去重后的车辆计算和写入（同一车辆可能以ID和编号重复出现在 keys 中），再映射回各输入
+        today = date.today()
+        vehicle_objects = {vehicles[key].id: vehicles[key] for key in keys}
+        inputs = await PredictionService._load_scoring_inputs(
+            db, [vehicle_objects[vehicle_id] for vehicle_id in uuid_vehicle_ids], wheelset_stats, prior
+        )
+        # 拟合与计算交给评分池，不阻塞事件循环
+        arrays = await scoring_pool.predict(inputs, prediction_horizon_days)
+        current_mileage = inputs.current_mileage
+
+        predictions_data = []
+        for row, vehicle_id in enumerate(uuid_vehicle_ids):
+            vehicle = vehicle_objects[vehicle_id]
+            stats = wheelset_stats.get(vehicle.id)
+            for col, component in enumerate(COMPONENTS):
+                remaining_life_days = int(arrays["remaining_life_days"][row, col])
+                is_wheelset_with_stats = col == WHEELSET_INDEX and stats is not None
+                predictions_data.append(WearPredictionCreate(
+                    vehicle_id=vehicle.id,
+                    component_type=component,
+                    component_position=COMPONENT_POSITIONS[col],
+                    current_wear=round(float(arrays["current_wear"][row, col]), 2),
+                    predicted_wear=round(float(arrays["predicted_wear"][row, col]), 2),
+                    wear_rate=round(float(arrays["wear_rate"][row, col]), 4),
+                    remaining_life_days=remaining_life_days,
+                    remaining_life_mileage=round(float(arrays["remaining_life_mileage"][row, col]), 2),
+                    replacement_date=today + timedelta(days=remaining_life_days),
+                    confidence_score=float(arrays["confidence_score"][row, col]),
+                    prediction_horizon_days=prediction_horizon_days,
+                    last_rewheeling_date=stats.last_rewheeling_date if is_wheelset_with_stats else None,
+                    current_mileage=float(current_mileage[row]),
+                    next_rewheeling_mileage=stats.next_rewheeling_mileage if is_wheelset_with_stats else None
+                ))
+
+        # 预测记录与结果记录各一次多行插入，整批只提交一次
+        all_predictions = await PredictionService.bulk_create_wear_predictions(
+            db, predictions_data, commit=False
+        )
+
+        results_data = []
+        computed = {}
+        for row, vehicle_id in enumerate(uuid_vehicle_ids):
+            predictions = all_predictions[row * len(COMPONENTS):(row + 1) * len(COMPONENTS)]
+            risk_level = PredictionService._risk_level(predictions)
+            recommendations = PredictionService._build_recommendations(predictions)
+
+            # 计算整体置信度
+            overall_confidence = round(sum(p.confidence_score for p in predictions) / len(predictions), 2)
+
+            results_data.append(PredictionResultCreate(
+                vehicle_id=vehicle_id,
+                risk_level=risk_level,
+                overall_confidence=overall_confidence,
+                total_predictions=len(predictions),
+                maintenance_priority=risk_level,
+                next_maintenance_date=min(p.replacement_date for p in predictions),
+                input_fingerprint=fingerprints[vehicle_id]
+            ))
+            computed[vehicle_id] = (predictions, risk_level, overall_confidence, recommendations)
+        for key in keys:
+            results[key] = computed[vehicles[key].id]
+
+        await PredictionService.bulk_create_prediction_results(db, results_data, commit=False)
+        await db.commit()
+        await latest_prediction_cache.delete_many(str(vehicle_id) for vehicle_id in uuid_vehicle_ids)
+        DashboardService.invalidate()
+
+        # 按输入顺序返回（含直接复用的缓存结果）
+        return {key: results[key] for key in dict.fromkeys(vehicle_ids) if key in results}
+
+    @staticmethod
+    async def _load_scoring_inputs(
+        db: AsyncSession,
+        vehicles: List[Vehicle],
+        wheelset_stats: Dict[UUID, WheelsetStatisticsModel],
+        prior: Optional[FleetPrior]
+    ) -> ScoringInputs:
+        """
+        加载一批车辆的评分输入，数组按 vehicles 顺序排列
+
+        以给定的车队先验收缩；prior 为 None 时由本批数据估计先验。
+        """
+        vehicle_ids = [vehicle.id for vehicle in vehicles]
+        history = await PredictionService.get_wear_history_arrays(
+            db, vehicle_ids, settings.WEAR_MODEL_HISTORY_DAYS
+        )
+        wheelset_diameter = np.full(len(vehicles), np.nan)
+        rewheeling_day = np.full(len(vehicles), np.nan)
+        for row, vehicle_id in enumerate(vehicle_ids):
+            stats = wheelset_stats.get(vehicle_id)
+            if stats is None:
+                continue
+            if stats.current_diameter:
+                wheelset_diameter[row] = stats.current_diameter
+            if stats.last_rewheeling_date:
+                rewheeling_day[row] = stats.last_rewheeling_date.toordinal()
+
+        return ScoringInputs(
+            **history,
+            current_mileage=np.array([vehicle.total_mileage or 0.0 for vehicle in vehicles], dtype=np.float64),
+            wheelset_diameter=wheelset_diameter,
+            rewheeling_day=rewheeling_day,
+            prior=prior,
+            huber_k=settings.WEAR_MODEL_HUBER_K
         )
-        wheelset_stats = wheelset_stats_result.scalars().first()
-        
-        # 查询车辆的历史磨耗数据
-        trend_data = await PredictionService.get_wear_trend_data(
-            db, uuid_vehicle_id, "wheelset"
+
+    @staticmethod
+    async def calculate_life_distribution(
+        db: AsyncSession,
+        vehicle_ids: Optional[List[str]] = None,
+        prediction_horizon_days: int = 180,
+        n_samples: Optional[int] = None,
+        seed: Optional[int] = None
+    ) -> Tuple[List[dict], List[str]]:
+        """
+        概率预测：蒙特卡洛抽样各车辆×部件的剩余寿命分布
+
+        输入加载和磨耗率拟合与 calculate_batch_prediction 相同，按拟合不确定性抽样后返回
+        P10/P50/P90 剩余天数、剩余里程、更换日期及预测期内到限概率。结果不写入数据库。
+        每辆车的随机流由 seed 和车辆在本次请求中的序号派生，同一 seed 和车辆列表的结果可复现，
+        与评分池是否启用及分批大小无关。
+        vehicle_ids 为 None 时计算全车队。
+        返回: (按输入顺序的各车分布列表, 未找到的车辆ID或编号)
+        """
+        if vehicle_ids is None:
+            result = await db.execute(select(Vehicle).order_by(Vehicle.vehicle_code))
+            vehicles = {str(vehicle.id): vehicle for vehicle in result.scalars()}
+            keys = list(vehicles)
+        else:
+            vehicles = await PredictionService.resolve_vehicles(db, vehicle_ids)
+            keys = [key for key in dict.fromkeys(vehicle_ids) if key in vehicles]
+        not_found = [key for key in dict.fromkeys(vehicle_ids or []) if key not in vehicles]
+        if not keys:
+            return [], not_found
+
+        vehicle_objects = list({vehicles[key].id: vehicles[key] for key in keys}.values())
+        vehicle_rows = {vehicle.id: row for row, vehicle in enumerate(vehicle_objects)}
+        wheelset_stats = await PredictionService.get_latest_wheelset_statistics_bulk(db, list(vehicle_rows))
+        wear_model = wear_model_registry.get()
+        inputs = await PredictionService._load_scoring_inputs(
+            db, vehicle_objects, wheelset_stats, wear_model.prior_for(COMPONENTS) if wear_model else None
         )
-        
-        # 基于里程和上次镟修时间的增强预测算法
-        from random import uniform
-        
-        # 获取车辆当前里程
-        current_mileage = vehicle.total_mileage if vehicle else 100000.0
-        
-        # 基础磨耗值
-        base_wear_values = {
-            "wheelset": 3.5,
-            "brake_pad": 30.0,
-            "pantograph": 10.0
+        distribution = await scoring_pool.sample_distribution(
+            inputs, n_samples or settings.LIFE_DISTRIBUTION_SAMPLES, prediction_horizon_days, LIFE_QUANTILES, seed
+        )
+
+        today = date.today()
+        life_days = distribution["remaining_life_days"]
+        life_mileage = distribution["remaining_life_mileage"]
+        results = []
+        for key in keys:
+            vehicle = vehicles[key]
+            row = vehicle_rows[vehicle.id]
+            components = []
+            for col, component in enumerate(COMPONENTS):
+                days = [int(value) for value in life_days[row, col]]
+                components.append({
+                    "component_type": component,
+                    "remaining_life_days": days,
+                    "remaining_life_mileage": [round(float(value), 2) for value in life_mileage[row, col]],
+                    "replacement_dates": [today + timedelta(days=value) for value in days],
+                    "due_probability": round(float(distribution["due_probability"][row, col]), 4),
+                })
+            results.append({
+                "vehicle_id": vehicle.id,
+                "vehicle_code": vehicle.vehicle_code,
+                "components": components,
+            })
+        return results, not_found
+
+    @staticmethod
+    async def train_wear_model(
+        db: AsyncSession, version: Optional[str] = None, activate: bool = True
+    ) -> WearModel:
+        """
+        用全车队趋势历史训练车队级磨耗模型并保存到模型注册表
+
+        各车辆×部件序列不带先验拟合，由拟合结果估计各部件先验磨耗率和车辆间方差，
+        保存为新版本；activate=True 时立即切换为当前版本。
+        """
+        history_days = settings.WEAR_MODEL_HISTORY_DAYS
+        if settings.FEATURE_STORE_ENABLED:
+            history, rewheeling_day, n_vehicles = await PredictionService._get_training_arrays_from_store(db, history_days)
+        else:
+            history, rewheeling_day, n_vehicles = await PredictionService._get_training_arrays(db, history_days)
+
+        wear_fit = await scoring_pool.fit(ScoringInputs(
+            **history,
+            current_mileage=np.zeros(n_vehicles),
+            wheelset_diameter=np.full(n_vehicles, np.nan),
+            rewheeling_day=rewheeling_day,
+            huber_k=settings.WEAR_MODEL_HUBER_K
+        ))
+        model = WearModel(
+            version=version or new_version(),
+            components=COMPONENTS,
+            prior=wear_fit.prior,
+            trained_at=datetime.now(timezone.utc),
+            history_days=history_days,
+            huber_k=settings.WEAR_MODEL_HUBER_K,
+            n_series=int(np.count_nonzero(wear_fit.n_observations)),
+            n_observations=int(history["day"].size)
+        )
+        await asyncio.to_thread(wear_model_registry.save, model, activate)
+        logger.info(f"Trained wear model {model.version} on {model.n_series} series")
+        return model
+
+    @staticmethod
+    async def _get_training_arrays(
+        db: AsyncSession, history_days: int
+    ) -> Tuple[Dict[str, np.ndarray], np.ndarray, int]:
+        """从数据库读取全车队训练数据：(趋势列数组, 各车镟修日期序号, 车辆数)"""
+        result = await db.execute(select(Vehicle.id).order_by(Vehicle.id))
+        vehicle_ids = list(result.scalars())
+        history = await PredictionService.get_wear_history_arrays(db, vehicle_ids, history_days)
+        wheelset_stats = await PredictionService.get_latest_wheelset_statistics_bulk(db, vehicle_ids)
+
+        vehicle_rows = {vehicle_id: row for row, vehicle_id in enumerate(vehicle_ids)}
+        rewheeling_day = np.full(len(vehicle_ids), np.nan)
+        for vehicle_id, stats in wheelset_stats.items():
+            if stats.last_rewheeling_date:
+                rewheeling_day[vehicle_rows[vehicle_id]] = stats.last_rewheeling_date.toordinal()
+        return history, rewheeling_day, len(vehicle_ids)
+
+    @staticmethod
+    async def _get_training_arrays_from_store(
+        db: AsyncSession, history_days: int
+    ) -> Tuple[Dict[str, np.ndarray], np.ndarray, int]:
+        """
+        增量刷新特征库后直接读取整库列数组训练
+
+        特征库按 车辆×部件 序列连续存放，车辆行和部件列由序列偏移量展开，
+        里程和磨耗列为内存映射视图，不经过 ORM 也不逐行转换。
+        """
+        snapshot = await FeatureStoreService.refresh(db)
+        n_components = len(COMPONENTS)
+        groups = snapshot.observation_groups()
+        keep = snapshot.day >= (date.today() - timedelta(days=history_days)).toordinal()
+        history = {
+            "vehicle_row": groups[keep] // n_components,
+            "component_col": groups[keep] % n_components,
+            "day": snapshot.day[keep],
+            "mileage": snapshot.mileage[keep],
+            "wear": snapshot.wear[keep],
         }
-        
-        predictions = []
-        components = ["wheelset", "brake_pad", "pantograph"]
-        
-        for i, component in enumerate(components):
-            # 基于组件类型和车辆历史的预测值
-            current_wear = base_wear_values[component]
-            
-            # 根据上次镟修时间调整预测（仅对轮对有效）
-            rewheeling_factor = 1.0
-            last_rewheeling_date = None
-            next_rewheeling_mileage = None
-            
-            if component == "wheelset" and wheelset_stats:
-                current_wear = wheelset_stats.current_diameter if wheelset_stats.current_diameter else current_wear
-                last_rewheeling_date = wheelset_stats.last_rewheeling_date
-                next_rewheeling_mileage = wheelset_stats.next_rewheeling_mileage
-                
-                # 如果接近上次镟修时间，调整磨耗率
-                if last_rewheeling_date:
-                    days_since_rewheeling = (date.today() - last_rewheeling_date).days
-                    if days_since_rewheeling < 30:  # 镟修后30天内
-                        rewheeling_factor = 0.8  # 磨耗率降低
-
-            # 基础磨耗率计算
-            base_wear_rate = 0.05 + (i * 0.1)  # 基础磨耗率
-            # 根据里程和时间调整磨耗率
-            mileage_factor = current_mileage / 100000.0  # 基于总里程的因子
-            wear_rate = base_wear_rate * rewheeling_factor * (1 + mileage_factor * 0.1)
-            
-            # 计算剩余寿命
-            if component == "brake_pad":
-                min_threshold = 5.0  # 制动片最小厚度
-            elif component == "pantograph":
-                min_threshold = 3.0  # 受电弓最小厚度
-            else:  # wheelset
-                min_threshold = 840.0  # 轮径最小值(mm) - 假设当前值为直径
-            
-            # 计算剩余寿命（基于磨耗值和磨耗率）
-            if component == "wheelset":
-                # 轮对：直径越小风险越高
-                remaining_wear = current_wear - min_threshold
-                remaining_life_days = int(remaining_wear / (wear_rate * 50)) if wear_rate > 0 else 365
-                # 基于里程的计算
-                remaining_life_mileage = remaining_wear / wear_rate * 1000  # 转换为里程
-            else:
-                # 其他组件：磨耗值越大风险越高
-                remaining_wear = min_threshold - current_wear
-                remaining_life_days = int(remaining_wear / wear_rate * 1000) if wear_rate > 0 else 365
-                remaining_life_mileage = remaining_wear / wear_rate * 1000
-
-            # 确保剩余天数不为负
-            remaining_life_days = max(1, remaining_life_days)
-            
-            # 计算更换日期
-            replacement_date = date.today() + timedelta(days=remaining_life_days)
-            
-            # 计算预测磨耗值
-            predicted_wear = current_wear + (wear_rate * prediction_horizon_days / 1000) if component != "wheelset" else current_wear - (wear_rate * prediction_horizon_days / 1000)
-            
-            # 创建预测记录
-            prediction_data = WearPredictionCreate(
-                vehicle_id=uuid_vehicle_id,
-                component_type=component,
-                component_position=f"{'前' if i % 2 == 0 else '后'}{'左' if i // 2 == 0 else '右'}",
-                current_wear=round(current_wear, 2),
-                predicted_wear=round(predicted_wear, 2),
-                wear_rate=round(wear_rate, 4),
-                remaining_life_days=remaining_life_days,
-                remaining_life_mileage=round(remaining_life_mileage, 2),
-                replacement_date=replacement_date,
-                confidence_score=round(0.85 + uniform(-0.05, 0.1), 2),
-                prediction_horizon_days=prediction_horizon_days,
-                last_rewheeling_date=last_rewheeling_date,
-                current_mileage=current_mileage,
-                next_rewheeling_mileage=next_rewheeling_mileage
+        return history, np.asarray(snapshot.rewheeling_day), snapshot.n_vehicles
+
+    @staticmethod
+    async def get_wear_trend_watermarks_bulk(
+        db: AsyncSession, vehicle_ids: List[UUID]
+    ) -> Dict[UUID, Tuple[Optional[datetime], Optional[date], int]]:
+        """批量获取每辆车趋势数据的水位线（最新写入时间、最新数据日期、行数）"""
+        watermarks = {}
+        for chunk in _chunked(vehicle_ids, IN_CLAUSE_CHUNK_SIZE):
+            result = await db.execute(
+                select(
+                    WearTrendDataModel.vehicle_id,
+                    func.max(WearTrendDataModel.created_at),
+                    func.max(WearTrendDataModel.date),
+                    func.count()
+                )
+                .where(WearTrendDataModel.vehicle_id.in_(chunk))
+                .group_by(WearTrendDataModel.vehicle_id)
+            )
+            for vehicle_id, last_created_at, last_date, row_count in result.all():
+                watermarks[vehicle_id] = (last_created_at, last_date, row_count)
+        return watermarks
+
+    @staticmethod
+    async def get_latest_prediction_results_bulk(
+        db: AsyncSession, vehicle_ids: List[UUID]
+    ) -> Dict[UUID, PredictionResultModel]:
+        """批量获取每辆车最新的预测结果"""
+        latest = {}
+        for chunk in _chunked(vehicle_ids, IN_CLAUSE_CHUNK_SIZE):
+            ranked = (
+                select(
+                    PredictionResultModel.id,
+                    func.row_number().over(
+                        partition_by=PredictionResultModel.vehicle_id,
+                        order_by=PredictionResultModel.created_at.desc()
+                    ).label("rank")
+                )
+                .where(PredictionResultModel.vehicle_id.in_(chunk))
+                .subquery()
+            )
+            result = await db.execute(
+                select(PredictionResultModel)
+                .join(ranked, ranked.c.id == PredictionResultModel.id)
+                .where(ranked.c.rank == 1)
+            )
+            for prediction_result in result.scalars():
+                latest[prediction_result.vehicle_id] = prediction_result
+        return latest
+
+    @staticmethod
+    async def get_latest_wear_predictions_bulk(
+        db: AsyncSession, vehicle_ids: List[UUID]
+    ) -> Dict[UUID, List[WearPredictionModel]]:
+        """批量获取每辆车各部件最新的磨耗预测，按 COMPONENTS 顺序排列"""
+        grouped = {vehicle_id: [] for vehicle_id in vehicle_ids}
+        for chunk in _chunked(vehicle_ids, IN_CLAUSE_CHUNK_SIZE):
+            ranked = (
+                select(
+                    WearPredictionModel.id,
+                    func.row_number().over(
+                        partition_by=(WearPredictionModel.vehicle_id, WearPredictionModel.component_type),
+                        order_by=WearPredictionModel.created_at.desc()
+                    ).label("rank")
+                )
+                .where(WearPredictionModel.vehicle_id.in_(chunk))
+                .subquery()
             )
-            
-            prediction = await PredictionService.create_wear_prediction(db, prediction_data)
-            predictions.append(prediction)
+            result = await db.execute(
+                select(WearPredictionModel)
+                .join(ranked, ranked.c.id == WearPredictionModel.id)
+                .where(ranked.c.rank == 1)
+            )
+            for prediction in result.scalars():
+                grouped[prediction.vehicle_id].append(prediction)
+        for predictions in grouped.values():
+            predictions.sort(key=lambda p: COMPONENTS.index(p.component_type) if p.component_type in COMPONENTS else len(COMPONENTS))
+        return grouped
+
+    @staticmethod
+    async def _get_cached_predictions(
+        db: AsyncSession, vehicle_ids: List[UUID], fingerprints: Dict[UUID, str]
+    ) -> Dict[UUID, Tuple[List[WearPredictionModel], str, float, List[dict]]]:
+        """
+        返回输入指纹未变化车辆的已存储预测
 
-        # 确定风险等级
+        只复用 PREDICTION_INCREMENTAL_MAX_AGE_DAYS 天内的预测（历史窗口随日期滑动，需定期重算）。
+        剩余寿命天数（及按比例折算的剩余里程）和风险等级相对计算当天，复用时按已存储的更换日期
+        以今天重新推算，这些调整不写回数据库。
+        """
+        today = date.today()
+        oldest = today - timedelta(days=settings.PREDICTION_INCREMENTAL_MAX_AGE_DAYS)
+        latest_results = await PredictionService.get_latest_prediction_results_bulk(db, vehicle_ids)
+        unchanged = [
+            vehicle_id for vehicle_id, prediction_result in latest_results.items()
+            if prediction_result.input_fingerprint == fingerprints.get(vehicle_id)
+            and prediction_result.created_at is not None and prediction_result.created_at.date() >= oldest
+        ]
+        if not unchanged:
+            return {}
+
+        latest_predictions = await PredictionService.get_latest_wear_predictions_bulk(db, unchanged)
+        cached = {}
+        for vehicle_id in unchanged:
+            predictions = latest_predictions[vehicle_id]
+            if len(predictions) != len(COMPONENTS):
+                continue
+            for prediction in predictions:
+                db.expunge(prediction)
+                remaining_life_days = max(0, (prediction.replacement_date - today).days)
+                if prediction.remaining_life_days:
+                    prediction.remaining_life_mileage = round(
+                        prediction.remaining_life_mileage * remaining_life_days / prediction.remaining_life_days, 2
+                    )
+                prediction.remaining_life_days = remaining_life_days
+            prediction_result = latest_results[vehicle_id]
+            cached[vehicle_id] = (
+                predictions,
+                PredictionService._risk_level(predictions),
+                prediction_result.overall_confidence,
+                PredictionService._build_recommendations(predictions)
+            )
+        return cached
+
+    @staticmethod
+    async def iter_batch_predictions(
+        vehicle_ids: List[str],
+        prediction_horizon_days: int = 180,
+        max_concurrency: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        incremental: bool = False
+    ) -> AsyncIterator[Tuple[str, Optional[Tuple[List[WearPredictionModel], str, float, List[dict]]], Optional[str]]]:
+        """
+        并发批量预测
+
+        车辆按 chunk_size 分组，每组使用独立的 AsyncSessionLocal 会话调用
+        calculate_batch_prediction，同时运行的分组（会话）数不超过 max_concurrency，
+        分组在有空位时才创建。
+        按完成顺序逐辆产出 (车辆ID或编号, 预测结果, 错误信息)，成功时错误信息为 None，
+        失败时预测结果为 None。某组计算出错时回滚并二分重试，只报告出错车辆。
+        """
+        max_concurrency = max_concurrency or settings.PREDICTION_BATCH_CONCURRENCY
+        chunk_size = chunk_size or settings.PREDICTION_BATCH_CHUNK_SIZE
+
+        async def predict_chunk(session: AsyncSession, chunk: List[str]):
+            try:
+                results = await PredictionService.calculate_batch_prediction(
+                    session, chunk, prediction_horizon_days, incremental
+                )
+            except Exception as e:
+                await session.rollback()
+                if len(chunk) == 1:
+                    logger.error(f"Batch prediction failed for vehicle {chunk[0]}: {e}")
+                    return [(chunk[0], None, f"Prediction failed: {str(e)}")]
+                # 分组失败时二分重试，只有出错的车辆以各自的错误信息报告失败
+                middle = len(chunk) // 2
+                return await predict_chunk(session, chunk[:middle]) + await predict_chunk(session, chunk[middle:])
+            return [
+                (vehicle_id, results[vehicle_id], None) if vehicle_id in results
+                else (vehicle_id, None, f"Vehicle with ID or code {vehicle_id} not found")
+                for vehicle_id in chunk
+            ]
+
+        async def run_chunk(chunk: List[str]):
+            async with AsyncSessionLocal() as session:
+                return await predict_chunk(session, chunk)
+
+        chunks = _chunked(list(dict.fromkeys(vehicle_ids)), chunk_size)
+        pending = set()
+        try:
+            while True:
+                # 在途分组补足到 max_concurrency 个；已完成分组的结果被调用方消费后才启动新分组，
+                # 调用方（如 NDJSON 流）消费较慢时内存中最多保留 max_concurrency 组结果
+                for chunk in itertools.islice(chunks, max_concurrency - len(pending)):
+                    pending.add(asyncio.ensure_future(run_chunk(chunk)))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for item in task.result():
+                        yield item
+        finally:
+            # 调用方提前停止迭代（如客户端断开）时取消未完成的分组
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    def _risk_level(predictions: List[WearPredictionModel]) -> str:
+        """根据最短剩余寿命确定风险等级"""
         min_days = min(p.remaining_life_days for p in predictions)
         if min_days < 30:
-            risk_level = "high"
+            return "high"
         elif min_days < 90:
-            risk_level = "medium"
-        else:
-            risk_level = "low"
+            return "medium"
+        return "low"
 
-        # 生成维护建议
+    @staticmethod
+    def _build_recommendations(predictions: List[WearPredictionModel]) -> List[dict]:
+        """生成维护建议"""
         recommendations = []
-        for i, pred in enumerate(predictions):
+        for pred in predictions:
             if pred.remaining_life_days < 30:
                 priority = "high"
                 action = "立即更换"
@@ -264,20 +946,45 @@ class PredictionService:
                 "estimated_cost": int(base_cost * cost_multiplier),
                 "estimated_downtime_hours": int(base_downtime * downtime_multiplier)
             })
+        return recommendations
+
+
+def _input_fingerprint(
+    vehicle: Vehicle,
+    stats: Optional[WheelsetStatisticsModel],
+    trend_watermark: Optional[Tuple[Optional[datetime], Optional[date], int]],
+    prediction_horizon_days: int,
+    model_version: Optional[str] = None
+) -> str:
+    """计算车辆预测输入指纹，任一输入变化（或算法、模型版本、拟合配置变化）都会得到不同的值"""
+    parts = [
+        ENGINE_VERSION,
+        model_version,
+        settings.WEAR_MODEL_HISTORY_DAYS,
+        settings.WEAR_MODEL_HUBER_K,
+        vehicle.total_mileage or 0.0,
+        prediction_horizon_days,
+        [stats.inspection_date, stats.current_diameter, stats.last_rewheeling_date, stats.next_rewheeling_mileage] if stats else None,
+        list(trend_watermark) if trend_watermark else None,
+    ]
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+def _trend_bucket_expression(dialect_name: str, bucket: str):
+    """趋势数据分桶起始日期表达式（周以周一为起点）"""
+    column = WearTrendDataModel.date
+    if bucket == "day":
+        return column
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(bucket, column), Date)
+    if dialect_name == "sqlite":
+        if bucket == "week":
+            return func.date(column, "weekday 0", "-6 days")
+        return func.strftime("%Y-%m-01", column)
+    raise ValueError(f"Unsupported dialect for trend bucketing: {dialect_name}")
 
-        # 计算整体置信度
-        overall_confidence = round(sum(p.confidence_score for p in predictions) / len(predictions), 2)
-
-        # 创建预测结果记录
-        result_data = PredictionResultCreate(
-            vehicle_id=uuid_vehicle_id,
-            risk_level=risk_level,
-            overall_confidence=overall_confidence,
-            total_predictions=len(predictions),
-            maintenance_priority=risk_level,
-            next_maintenance_date=min(p.replacement_date for p in predictions)
-        )
-        
-        await PredictionService.create_prediction_result(db, result_data)
 
-        return predictions, risk_level, overall_confidence, recommendations
\ No newline at end of file
+def _chunked(items: List, size: int):
+    """按固定大小切分列表，避免 IN 子句参数过多"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
@@ -0,0 +1,258 @@
+"""
+多进程评分池
+
+磨耗率拟合、剩余寿命计算和蒙特卡洛抽样都是纯 CPU 计算，放在事件循环里会阻塞同一 worker 上的
+所有请求。评分池把这些计算交给 ProcessPoolExecutor：
+- 观测按车辆排序后与各车辆输入一起写入一块共享内存，子进程按名称映射为数组视图，
+  不传递 ORM 对象，也不序列化大数组；
+- 按车辆分批（SCORING_POOL_CHUNK_VEHICLES）切分任务，每个任务只处理本批车辆对应的观测区间；
+- 各批结果（按车辆排列的小数组）返回父进程后按车辆顺序拼接。
+未启用或车辆数少于 SCORING_POOL_MIN_VEHICLES 时在线程中计算，省去进程间调度开销。
+未指定车队先验时先验需由整批数据估计，此时不分批，整批作为一个任务执行。
+子进程以 spawn 方式启动，会重新导入主模块，自定义脚本调用预测服务时入口须有 if __name__ == "__main__" 保护。
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import os
+import sys
+
+import numpy as np
+
+from app.config import settings
+from app.ml.wear_rate_model import FleetPrior, WearRateFit
+from app.services.prediction_engine import LIFE_QUANTILES, compute_wear_arrays, fit_component_wear_rates, sample_life_distribution
+
+logger = logging.getLogger(__name__)
+
+# 观测列（按车辆排序后写入共享内存）与车辆列
+OBSERVATION_COLUMNS = ("vehicle_row", "component_col", "day", "mileage", "wear")
+VEHICLE_COLUMNS = ("current_mileage", "wheelset_diameter", "rewheeling_day")
+
+# 共享内存中各数组起始地址的对齐字节数
+SHARED_ALIGNMENT = 64
+
+
+@dataclass
+class ScoringInputs:
+    """一批车辆的评分输入：观测为扁平数组，车辆列长度为车辆数"""
+    vehicle_row: np.ndarray
+    component_col: np.ndarray
+    day: np.ndarray
+    mileage: np.ndarray
+    wear: np.ndarray
+    current_mileage: np.ndarray
+    wheelset_diameter: np.ndarray
+    rewheeling_day: np.ndarray
+    prior: Optional[FleetPrior] = None
+    huber_k: Optional[float] = None
+
+    @property
+    def n_vehicles(self) -> int:
+        return int(self.current_mileage.shape[0])
+
+
+class ScoringPool:
+    """CPU 密集评分的进程池，按需创建"""
+
+    def __init__(self, enabled: bool = True, max_workers: int = 0, chunk_vehicles: int = 2000, min_vehicles: int = 500):
+        self.enabled = enabled
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_vehicles = max(1, chunk_vehicles)
+        self.min_vehicles = min_vehicles
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        """创建进程池并预热子进程（spawn 启动，避免 fork 继承事件循环和数据库连接）"""
+        if not self.enabled or self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=get_context("spawn"))
+        for _ in range(self.max_workers):
+            self._executor.submit(os.getpid)
+        logger.info(f"Scoring pool started with {self.max_workers} processes")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def predict(self, inputs: ScoringInputs, prediction_horizon_days: int = 180) -> Dict[str, np.ndarray]:
+        """拟合磨耗率并计算点预测，结果同 compute_wear_arrays，形状 (车辆数, 3)"""
+        results = await self._map(inputs, {"mode": "predict", "prediction_horizon_days": prediction_horizon_days})
+        return _concatenate(results)
+
+    async def sample_distribution(
+        self,
+        inputs: ScoringInputs,
+        n_samples: int,
+        prediction_horizon_days: int = 180,
+        quantiles: Sequence[float] = LIFE_QUANTILES,
+        seed: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """拟合磨耗率并抽样剩余寿命分布，结果同 sample_life_distribution；随机流按车辆派生，结果与分批方式无关"""
+        options = {
+            "mode": "distribution",
+            "n_samples": n_samples,
+            "prediction_horizon_days": prediction_horizon_days,
+            "quantiles": tuple(quantiles),
+        }
+        results = await self._map(inputs, options, seed=seed)
+        return _concatenate(results)
+
+    async def fit(self, inputs: ScoringInputs) -> WearRateFit:
+        """只拟合磨耗率（用于训练，先验由整批数据估计，不分批）"""
+        results = await self._map(inputs, {"mode": "fit"})
+        return results[0]
+
+    async def _map(self, inputs: ScoringInputs, options: Dict[str, Any], seed: Optional[int] = None) -> List[Any]:
+        use_pool = self.enabled and inputs.n_vehicles >= self.min_vehicles
+        if not use_pool:
+            arrays, tasks = _prepare(inputs, options, inputs.n_vehicles or 1, seed)
+            return await asyncio.to_thread(lambda: [score_chunk(arrays, task) for task in tasks])
+
+        chunk_vehicles = self.chunk_vehicles if inputs.prior is not None else inputs.n_vehicles
+        shm, layout, tasks = await asyncio.to_thread(_prepare_shared, inputs, options, chunk_vehicles, seed)
+        try:
+            if self._executor is None:
+                self.start()
+            loop = asyncio.get_running_loop()
+            return await asyncio.gather(*(
+                loop.run_in_executor(self._executor, _run_shared, score_chunk, shm.name, layout, task)
+                for task in tasks
+            ))
+        except BrokenProcessPool:
+            # 子进程异常退出后进程池不可再用，下次调用时重建
+            logger.error("Scoring pool broken, it will be recreated on next use")
+            self._executor = None
+            raise
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+def score_chunk(arrays: Dict[str, np.ndarray], task: Dict[str, Any]) -> Any:
+    """计算一批车辆：arrays 为全部输入（观测已按车辆排序），task 给出本批车辆和观测区间"""
+    v0, v1 = task["vehicles"]
+    o0, o1 = task["observations"]
+    wear_fit = fit_component_wear_rates(
+        arrays["vehicle_row"][o0:o1] - v0,
+        arrays["component_col"][o0:o1],
+        arrays["day"][o0:o1],
+        arrays["mileage"][o0:o1],
+        arrays["wear"][o0:o1],
+        v1 - v0,
+        rewheeling_day=arrays["rewheeling_day"][v0:v1],
+        prior=task["prior"],
+        huber_k=task["huber_k"]
+    )
+    if task["mode"] == "fit":
+        return wear_fit
+    if task["mode"] == "predict":
+        return compute_wear_arrays(
+            arrays["current_mileage"][v0:v1], arrays["wheelset_diameter"][v0:v1], task["prediction_horizon_days"], wear_fit
+        )
+    return sample_life_distribution(
+        arrays["current_mileage"][v0:v1],
+        arrays["wheelset_diameter"][v0:v1],
+        wear_fit,
+        task["n_samples"],
+        task["prediction_horizon_days"],
+        task["quantiles"],
+        task["seed"],
+        vehicle_offset=v0
+    )
+
+
+def _prepare(
+    inputs: ScoringInputs, options: Dict[str, Any], chunk_vehicles: int, seed: Optional[int]
+) -> Tuple[Dict[str, np.ndarray], List[Dict[str, Any]]]:
+    """观测按车辆排序，并按车辆区间切分任务；只有一批时不排序"""
+    bounds = list(range(0, inputs.n_vehicles, chunk_vehicles))[1:]
+    bounds = [0] + bounds + [inputs.n_vehicles]
+    arrays = {"vehicle_row": np.asarray(inputs.vehicle_row, dtype=np.int64)}
+    arrays.update({name: np.asarray(getattr(inputs, name)) for name in OBSERVATION_COLUMNS[1:]})
+    if len(bounds) > 2:
+        order = np.argsort(arrays["vehicle_row"], kind="stable")
+        arrays = {name: values[order] for name, values in arrays.items()}
+        observation_bounds = np.searchsorted(arrays["vehicle_row"], bounds)
+    else:
+        observation_bounds = [0, arrays["vehicle_row"].shape[0]]
+    for name in VEHICLE_COLUMNS:
+        arrays[name] = np.asarray(getattr(inputs, name), dtype=np.float64)
+    # 各批共用同一种子序列（seed 为 None 时也只取一次熵），按全局车辆序号派生各车随机流
+    seed_sequence = np.random.SeedSequence(seed)
+    tasks = [
+        {
+            **options,
+            "vehicles": (bounds[i], bounds[i + 1]),
+            "observations": (int(observation_bounds[i]), int(observation_bounds[i + 1])),
+            "prior": inputs.prior,
+            "huber_k": inputs.huber_k,
+            "seed": seed_sequence,
+        }
+        for i in range(len(bounds) - 1)
+    ]
+    return arrays, tasks
+
+
+def _prepare_shared(
+    inputs: ScoringInputs, options: Dict[str, Any], chunk_vehicles: int, seed: Optional[int]
+) -> Tuple[SharedMemory, List[Tuple[str, str, tuple, int]], List[Dict[str, Any]]]:
+    """排序切分后把输入数组写入一块共享内存，返回 (共享内存, 布局, 任务)"""
+    arrays, tasks = _prepare(inputs, options, chunk_vehicles, seed)
+    layout = []
+    size = 0
+    for name, values in arrays.items():
+        size = -(-size // SHARED_ALIGNMENT) * SHARED_ALIGNMENT
+        layout.append((name, values.dtype.str, values.shape, size))
+        size += values.nbytes
+    shm = SharedMemory(create=True, size=max(size, 1))
+    for name, dtype, shape, offset in layout:
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = arrays[name]
+    return shm, layout, tasks
+
+
+def _run_shared(fn: Callable, name: str, layout: List[Tuple[str, str, tuple, int]], task: Dict[str, Any]) -> Any:
+    """子进程入口：映射共享内存为只读数组视图后执行 fn"""
+    shm = _attach(name)
+    try:
+        arrays = {key: _readonly_view(shm, dtype, shape, offset) for key, dtype, shape, offset in layout}
+        result = fn(arrays, task)
+        # 释放所有视图后才能关闭映射
+        del arrays
+        return result
+    finally:
+        shm.close()
+
+
+def _readonly_view(shm: SharedMemory, dtype: str, shape: tuple, offset: int) -> np.ndarray:
+    view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+    view.flags.writeable = False
+    return view
+
+
+def _attach(name: str) -> SharedMemory:
+    """连接父进程创建的共享内存，由父进程负责释放（spawn 子进程与父进程共用 resource_tracker）"""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+def _concatenate(results: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    if len(results) == 1:
+        return results[0]
+    return {name: np.concatenate([result[name] for result in results]) for name in results[0]}
+
+
+# 全局评分池实例
+scoring_pool = ScoringPool(
+    settings.SCORING_POOL_ENABLED,
+    settings.SCORING_POOL_WORKERS,
+    settings.SCORING_POOL_CHUNK_VEHICLES,
+    settings.SCORING_POOL_MIN_VEHICLES
+)
@@ -0,0 +1,150 @@
+"""
+车辆编号与ID解析
+
+维护进程内 vehicle_code <-> id 双向索引，启动时全量加载，
+由 VehicleService 的增删改同步更新；索引未命中时回退数据库查询并补入索引。
+其他进程（多 worker 部署）中的增删改不会同步到本进程，因此索引每 VEHICLE_RESOLVER_TTL 秒全量重新加载；
+写入路径（批量导入、批量写入轮对统计）以 verify=True 调用，直接以数据库为准并修正索引。
+"""
+from typing import Dict, List, Optional
+from uuid import UUID
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.vehicle import Vehicle
+
+logger = logging.getLogger(__name__)
+
+
+class VehicleResolver:
+    """车辆编号/ID双向索引"""
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self._code_to_id: Dict[str, UUID] = {}
+        self._id_to_code: Dict[UUID, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._reload_lock = asyncio.Lock()
+        self.loaded = False
+
+    async def load(self, db: AsyncSession) -> int:
+        """从数据库全量加载索引，返回车辆数"""
+        result = await db.execute(select(Vehicle.id, Vehicle.vehicle_code))
+        self._code_to_id.clear()
+        self._id_to_code.clear()
+        for vehicle_id, vehicle_code in result.all():
+            self.register(vehicle_id, vehicle_code)
+        self.loaded = True
+        self._loaded_at = time.monotonic()
+        logger.info(f"Vehicle resolver loaded {len(self._id_to_code)} vehicles")
+        return len(self._id_to_code)
+
+    async def refresh_if_stale(self, db: AsyncSession) -> None:
+        """索引超过 ttl 秒未加载时全量重新加载（ttl 为 0 时不过期）"""
+        if not self.ttl or (self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl):
+            return
+        async with self._reload_lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+                await self.load(db)
+
+    def register(self, vehicle_id: UUID, vehicle_code: str) -> None:
+        """登记或更新车辆编号"""
+        old_code = self._id_to_code.get(vehicle_id)
+        if old_code is not None and old_code != vehicle_code:
+            self._code_to_id.pop(old_code, None)
+        # 编号已改由另一辆车使用（改号后复用旧编号）
+        old_id = self._code_to_id.get(vehicle_code)
+        if old_id is not None and old_id != vehicle_id:
+            self._id_to_code.pop(old_id, None)
+        self._id_to_code[vehicle_id] = vehicle_code
+        self._code_to_id[vehicle_code] = vehicle_id
+
+    def unregister(self, vehicle_id: UUID) -> None:
+        """移除车辆"""
+        vehicle_code = self._id_to_code.pop(vehicle_id, None)
+        if vehicle_code is not None:
+            self._code_to_id.pop(vehicle_code, None)
+
+    def code_for(self, vehicle_id: UUID) -> Optional[str]:
+        """根据车辆ID获取车辆编号（仅查索引）"""
+        return self._id_to_code.get(vehicle_id)
+
+    async def codes_for(self, db: AsyncSession, vehicle_ids: List[UUID], verify: bool = False) -> Dict[UUID, str]:
+        """
+        批量获取车辆编号，索引未命中的ID合并为一次数据库查询；不存在的车辆不出现在结果中
+
+        verify=True 时全部ID都查询数据库（用于写入前确认车辆存在），已删除的车辆同时移出索引。
+        """
+        await self.refresh_if_stale(db)
+        codes = {}
+        missing_ids = []
+        for vehicle_id in vehicle_ids:
+            vehicle_code = None if verify else self._id_to_code.get(vehicle_id)
+            if vehicle_code is not None:
+                codes[vehicle_id] = vehicle_code
+            else:
+                missing_ids.append(vehicle_id)
+
+        if missing_ids:
+            result = await db.execute(
+                select(Vehicle.id, Vehicle.vehicle_code).where(Vehicle.id.in_(missing_ids))
+            )
+            for vehicle_id, vehicle_code in result.all():
+                self.register(vehicle_id, vehicle_code)
+                codes[vehicle_id] = vehicle_code
+            if verify:
+                for vehicle_id in missing_ids:
+                    if vehicle_id not in codes:
+                        self.unregister(vehicle_id)
+        return codes
+
+    async def resolve(self, db: AsyncSession, identifier: str) -> Optional[UUID]:
+        """将车辆ID或车辆编号解析为车辆ID，未找到返回 None"""
+        resolved = await self.resolve_many(db, [identifier])
+        return resolved.get(identifier)
+
+    async def resolve_many(self, db: AsyncSession, identifiers: List[str], verify: bool = False) -> Dict[str, UUID]:
+        """
+        批量解析车辆ID或车辆编号
+
+        UUID格式的输入直接返回（与原有行为一致，不校验存在性）；
+        车辆编号先查索引，未命中的编号合并为一次数据库查询。
+        verify=True 时车辆编号全部查询数据库，数据库中已不存在的编号同时移出索引。
+        """
+        await self.refresh_if_stale(db)
+        resolved = {}
+        missing_codes = []
+        for identifier in identifiers:
+            try:
+                resolved[identifier] = UUID(identifier)
+                continue
+            except ValueError:
+                pass
+            vehicle_id = None if verify else self._code_to_id.get(identifier)
+            if vehicle_id is not None:
+                resolved[identifier] = vehicle_id
+            else:
+                missing_codes.append(identifier)
+
+        if missing_codes:
+            result = await db.execute(
+                select(Vehicle.id, Vehicle.vehicle_code).where(Vehicle.vehicle_code.in_(missing_codes))
+            )
+            for vehicle_id, vehicle_code in result.all():
+                self.register(vehicle_id, vehicle_code)
+                resolved[vehicle_code] = vehicle_id
+            if verify:
+                for vehicle_code in missing_codes:
+                    stale_id = self._code_to_id.get(vehicle_code)
+                    if vehicle_code not in resolved and stale_id is not None:
+                        self.unregister(stale_id)
+        return resolved
+
+
+# 全局解析器
+vehicle_resolver = VehicleResolver(settings.VEHICLE_RESOLVER_TTL)
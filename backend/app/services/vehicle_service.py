@@ -7,6 +7,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.models.vehicle import Vehicle
 from app.schemas.vehicle import VehicleCreate, VehicleUpdate
+from app.services.dashboard_service import DashboardService
+from app.services.vehicle_resolver import vehicle_resolver
+from app.utils.pagination import paginate_keyset, split_page
+
+# 车辆列表排序键（游标分页）
+VEHICLE_SORT_KEY = (Vehicle.vehicle_code, Vehicle.id)
 
 
 class VehicleService:
@@ -30,9 +36,16 @@ class VehicleService:
         skip: int = 0,
         limit: int = 100,
         line_number: Optional[str] = None,
-        status: Optional[str] = None
-    ) -> tuple[List[Vehicle], int]:
-        """获取车辆列表"""
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True
+    ) -> tuple[List[Vehicle], Optional[int], Optional[str]]:
+        """
+        获取车辆列表
+
+        按车辆编号排序；提供 cursor 时按游标翻页（忽略 skip）。
+        返回 (车辆列表, 总数, 下一页游标)，with_total 为 False 时不统计总数。
+        """
         query = select(Vehicle)
         
         if line_number:
@@ -41,16 +54,18 @@ class VehicleService:
             query = query.where(Vehicle.status == status)
         
         # 获取总数
-        count_query = select(func.count()).select_from(query.subquery())
-        count_result = await db.execute(count_query)
-        total = count_result.scalar_one()
+        total = None
+        if with_total:
+            count_query = select(func.count()).select_from(query.subquery())
+            count_result = await db.execute(count_query)
+            total = count_result.scalar_one()
         
         # 获取分页数据
-        query = query.offset(skip).limit(limit)
+        query = paginate_keyset(query, VEHICLE_SORT_KEY, limit, cursor=cursor, skip=skip)
         result = await db.execute(query)
-        vehicles = result.scalars().all()
+        vehicles, next_cursor = split_page(result.scalars().all(), limit, VEHICLE_SORT_KEY)
         
-        return vehicles, total
+        return vehicles, total, next_cursor
 
     @staticmethod
     async def create_vehicle(db: AsyncSession, vehicle_data: VehicleCreate) -> Vehicle:
@@ -73,6 +88,8 @@ class VehicleService:
         db.add(vehicle)
         await db.commit()
         await db.refresh(vehicle)
+        vehicle_resolver.register(vehicle.id, vehicle.vehicle_code)
+        DashboardService.invalidate()
         
         return vehicle
 
@@ -89,6 +106,8 @@ class VehicleService:
         
         await db.commit()
         await db.refresh(vehicle)
+        vehicle_resolver.register(vehicle.id, vehicle.vehicle_code)
+        DashboardService.invalidate()
         
         return vehicle
 
@@ -101,5 +120,7 @@ class VehicleService:
         
         await db.delete(vehicle)
         await db.commit()
+        vehicle_resolver.unregister(vehicle_id)
+        DashboardService.invalidate()
         
         return True
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+磨耗趋势数据批量导入服务
+
+逐块读取上传的 CSV/Excel 文件：每块内车辆编号批量解析，逐行按 WearTrendDataCreate 校验，
+合格行批量写入（PostgreSQL 使用 COPY，其他数据库使用多行 INSERT），每块提交一次。
+不合格行记录行号和错误原因，不影响其余行导入。
+"""
+from typing import Any, BinaryIO, Dict, List, Optional
+from datetime import datetime, timezone
+from uuid import uuid4
+import asyncio
+import logging
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.prediction import WearTrendData as WearTrendDataModel
+from app.schemas.prediction import WearTrendDataCreate
+from app.services.vehicle_resolver import vehicle_resolver
+from app.utils.excel_handler import RowChunk, iter_row_chunks
+from app.utils.validators import format_validation_error
+
+logger = logging.getLogger(__name__)
+
+# 表头别名 -> 字段名
+COLUMN_ALIASES = {
+    "vehicle_code": "vehicle",
+    "vehicle_id": "vehicle",
+    "车辆编号": "vehicle",
+    "车辆ID": "vehicle",
+    "component_type": "component_type",
+    "部件类型": "component_type",
+    "date": "date",
+    "日期": "date",
+    "wear_value": "wear_value",
+    "磨耗值": "wear_value",
+    "mileage": "mileage",
+    "里程": "mileage",
+}
+REQUIRED_COLUMNS = ("vehicle", "component_type", "date", "wear_value", "mileage")
+
+# 报告中最多返回的错误行数
+MAX_REPORTED_ERRORS = 1000
+
+COPY_COLUMNS = ["id", "vehicle_id", "component_type", "date", "wear_value", "mileage", "created_at"]
+
+
+class WearTrendImportService:
+    """磨耗趋势数据导入服务类"""
+
+    @staticmethod
+    async def import_file(
+        db: AsyncSession,
+        file: BinaryIO,
+        extension: str,
+        chunk_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        导入磨耗趋势数据文件
+
+        返回导入报告：总行数、成功数、失败数及失败行明细（最多 MAX_REPORTED_ERRORS 条）。
+        文件表头缺少必需列时抛出 ValueError。
+        """
+        chunks = iter_row_chunks(file, extension, chunk_size or settings.WEAR_DATA_IMPORT_CHUNK_SIZE)
+        report = {"total_rows": 0, "imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+        while True:
+            # 文件解析为同步操作，放到线程中执行以免阻塞事件循环
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            records, errors = await WearTrendImportService._validate_chunk(db, chunk)
+            if records:
+                try:
+                    await WearTrendImportService._write_records(db, records)
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    logger.error(f"Wear trend import chunk failed: {e}")
+                    errors.extend({"row": row_number, "error": f"Database error: {e}"} for row_number, _ in records)
+                    records = []
+
+            report["total_rows"] += len(chunk)
+            report["imported"] += len(records)
+            report["failed"] += len(errors)
+            room = MAX_REPORTED_ERRORS - len(report["errors"])
+            if len(errors) > room:
+                report["errors_truncated"] = True
+            report["errors"].extend(sorted(errors, key=lambda item: item["row"])[:max(room, 0)])
+
+        logger.info(
+            f"Wear trend import finished: {report['imported']} imported, {report['failed']} failed"
+        )
+        return report
+
+    @staticmethod
+    async def _validate_chunk(db: AsyncSession, chunk: RowChunk) -> tuple[List[tuple], List[Dict[str, Any]]]:
+        """校验一块数据行，返回 ([(行号, WearTrendDataCreate)], [错误])"""
+        rows = []
+        for row_number, raw in chunk:
+            row = {}
+            for column, value in raw.items():
+                field = COLUMN_ALIASES.get(column)
+                if field and field not in row:
+                    row[field] = value.strip() if isinstance(value, str) else value
+            rows.append((row_number, row))
+
+        missing = [column for column in REQUIRED_COLUMNS if column not in rows[0][1]]
+        if missing:
+            names = ["vehicle_code" if column == "vehicle" else column for column in missing]
+            raise ValueError(f"Missing required columns: {', '.join(names)}")
+
+        # 车辆编号/ID批量解析；UUID格式的ID需确认车辆存在
+        identifiers = list({str(row["vehicle"]) for _, row in rows if row.get("vehicle") not in (None, "")})
+        resolved = await vehicle_resolver.resolve_many(db, identifiers, verify=True)
+        existing_ids = await vehicle_resolver.codes_for(db, list(set(resolved.values())), verify=True)
+
+        records = []
+        errors = []
+        for row_number, row in rows:
+            identifier = row.pop("vehicle", None)
+            vehicle_id = resolved.get(str(identifier)) if identifier not in (None, "") else None
+            if vehicle_id is None or vehicle_id not in existing_ids:
+                errors.append({"row": row_number, "error": f"Vehicle not found: {identifier}"})
+                continue
+            try:
+                records.append((row_number, WearTrendDataCreate(vehicle_id=vehicle_id, **row)))
+            except ValidationError as e:
+                errors.append({"row": row_number, "error": format_validation_error(e)})
+        return records, errors
+
+    @staticmethod
+    async def _write_records(db: AsyncSession, records: List[tuple]) -> None:
+        """批量写入校验通过的数据"""
+        if db.bind.dialect.name == "postgresql":
+            created_at = datetime.now(timezone.utc)
+            connection = await db.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                WearTrendDataModel.__tablename__,
+                records=[
+                    (uuid4(), data.vehicle_id, data.component_type, data.date, data.wear_value, data.mileage, created_at)
+                    for _, data in records
+                ],
+                columns=COPY_COLUMNS
+            )
+        else:
+            await db.execute(insert(WearTrendDataModel), [data.model_dump() for _, data in records])
@@ -1,12 +1,45 @@
 """
 轮对统计服务层
 """
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from uuid import UUID
+from datetime import date, datetime
+import logging
+import uuid
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from app.models.prediction import WheelsetStatistics as WheelsetStatisticsModel
+from sqlalchemy import select, insert, func, and_, text
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.prediction import WheelsetStatistics as WheelsetStatisticsModel, WheelsetMeasurement as WheelsetMeasurementModel
 from app.schemas.wheelset_statistics import WheelsetStatisticsCreate, WheelsetStatisticsUpdate
+from app.services.vehicle_resolver import vehicle_resolver
+from app.utils.pagination import paginate_keyset, split_page
+from app.utils.validators import format_validation_error
+
+# 轮对统计列表排序键（游标分页）：最近检查在前
+WHEELSET_STATISTICS_SORT_KEY = (WheelsetStatisticsModel.inspection_date, WheelsetStatisticsModel.id)
+
+# 批量 upsert 每条语句的行数（SQLite 绑定参数数量有限）
+UPSERT_CHUNK_SIZE = 200
+# 冲突时更新的列（测量值整条替换，保留 id 和 created_at）
+UPSERT_UPDATE_COLUMNS = [
+    "current_diameter", "flange_thickness", "flange_height", "qr_value", "mileage_at_measurement",
+    "last_rewheeling_date", "next_rewheeling_mileage", "wear_rate", "status", "inspection_date",
+    "inspector", "notes", "updated_at"
+]
+# 记入测量历史的列
+HISTORY_COLUMNS = [
+    "vehicle_id", "wheelset_position", "inspection_date", "current_diameter", "flange_thickness",
+    "flange_height", "qr_value", "mileage_at_measurement", "last_rewheeling_date",
+    "next_rewheeling_mileage", "wear_rate", "status", "inspector", "notes"
+]
+# 测量历史排序键（游标分页）
+MEASUREMENT_HISTORY_SORT_KEY = (WheelsetMeasurementModel.inspection_date, WheelsetMeasurementModel.id)
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL 上是否存在按月分区维护函数（迁移 005 创建），首次写入历史时检测
+_partition_function_available: Optional[bool] = None
 
 
 class WheelsetStatisticsService:
@@ -43,26 +76,13 @@ class WheelsetStatisticsService:
         db: AsyncSession, 
         vehicle_id: UUID, 
         skip: int = 0, 
-        limit: int = 100
-    ) -> tuple[List[WheelsetStatisticsModel], int]:
-        """根据车辆ID获取轮对统计数据列表"""
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        with_total: bool = True
+    ) -> tuple[List[WheelsetStatisticsModel], Optional[int], Optional[str]]:
+        """根据车辆ID获取轮对统计数据列表，返回 (数据列表, 总数, 下一页游标)"""
         query = select(WheelsetStatisticsModel).where(WheelsetStatisticsModel.vehicle_id == vehicle_id)
-        
-        # 获取总数
-        count_query = select(func.count()).select_from(
-            select(WheelsetStatisticsModel)
-            .where(WheelsetStatisticsModel.vehicle_id == vehicle_id)
-            .subquery()
-        )
-        count_result = await db.execute(count_query)
-        total = count_result.scalar_one()
-        
-        # 获取分页数据
-        query = query.offset(skip).limit(limit)
-        result = await db.execute(query)
-        statistics = result.scalars().all()
-        
-        return statistics, total
+        return await WheelsetStatisticsService._paginate(db, query, skip, limit, cursor, with_total)
 
     @staticmethod
     async def create_wheelset_statistics(
@@ -80,17 +100,100 @@ class WheelsetStatisticsService:
 
         statistics = WheelsetStatisticsModel(**statistics_data.dict())
         db.add(statistics)
+        await WheelsetStatisticsService.append_measurement_history(db, [statistics_data.model_dump()])
         await db.commit()
         await db.refresh(statistics)
         return statistics
 
+    @staticmethod
+    async def bulk_upsert_wheelset_statistics(
+        db: AsyncSession,
+        items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        批量上传轮对测量数据（按车辆+轮对位置）
+
+        逐条校验后，所有合格测量追加到测量历史；当前记录用 INSERT ... ON CONFLICT DO UPDATE 写入（按块），
+        仅当上传的检查日期不早于当前记录时才替换，整批一次提交。
+        同一请求中重复的车辆+位置以检查日期最新（相同时取最后一条）的测量作为当前记录。
+        返回与输入顺序一致的逐条结果：created / updated / history_only（仅记入历史）/ error。
+        """
+        results: List[Dict[str, Any]] = [{"index": index} for index in range(len(items))]
+
+        # 车辆编号/ID批量解析并确认车辆存在
+        identifiers = list({str(item["vehicle_id"]) for item in items if item.get("vehicle_id")})
+        resolved = await vehicle_resolver.resolve_many(db, identifiers, verify=True)
+        existing_vehicles = await vehicle_resolver.codes_for(db, list(set(resolved.values())), verify=True)
+
+        measurements: List[tuple] = []
+        current: Dict[tuple, tuple] = {}
+        for index, item in enumerate(items):
+            vehicle_id = resolved.get(str(item.get("vehicle_id")))
+            if vehicle_id is None or vehicle_id not in existing_vehicles:
+                results[index].update(status="error", error=f"Vehicle not found: {item.get('vehicle_id')}")
+                continue
+            try:
+                data = WheelsetStatisticsCreate(**{**item, "vehicle_id": vehicle_id})
+            except ValidationError as e:
+                results[index].update(status="error", error=format_validation_error(e))
+                continue
+            measurements.append((index, data))
+            results[index].update(
+                status="history_only", vehicle_id=data.vehicle_id, wheelset_position=data.wheelset_position
+            )
+            key = (data.vehicle_id, data.wheelset_position)
+            if key not in current or data.inspection_date >= current[key][1].inspection_date:
+                current[key] = (index, data)
+
+        if measurements:
+            # 已有记录：一次查询
+            vehicle_ids = list({vehicle_id for vehicle_id, _ in current})
+            existing_result = await db.execute(
+                select(WheelsetStatisticsModel.vehicle_id, WheelsetStatisticsModel.wheelset_position)
+                .where(WheelsetStatisticsModel.vehicle_id.in_(vehicle_ids))
+            )
+            existing_keys = set(existing_result.all())
+
+            now = datetime.utcnow()
+            values = [
+                {**data.model_dump(), "id": uuid.uuid4(), "created_at": now, "updated_at": now}
+                for _, data in current.values()
+            ]
+            insert_stmt = _dialect_insert(db.bind.dialect.name)
+            ids = {}
+            for chunk in _chunked(values, UPSERT_CHUNK_SIZE):
+                stmt = insert_stmt(WheelsetStatisticsModel).values(chunk)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["vehicle_id", "wheelset_position"],
+                    set_={column: stmt.excluded[column] for column in UPSERT_UPDATE_COLUMNS},
+                    # 较早的测量只记入历史，不覆盖当前记录
+                    where=stmt.excluded.inspection_date >= WheelsetStatisticsModel.inspection_date
+                ).returning(
+                    WheelsetStatisticsModel.id,
+                    WheelsetStatisticsModel.vehicle_id,
+                    WheelsetStatisticsModel.wheelset_position
+                )
+                for stat_id, vehicle_id, wheelset_position in (await db.execute(stmt)).all():
+                    ids[(vehicle_id, wheelset_position)] = stat_id
+
+            await WheelsetStatisticsService.append_measurement_history(
+                db, [data.model_dump() for _, data in measurements]
+            )
+            await db.commit()
+
+            for key, (index, _) in current.items():
+                if key in ids:
+                    results[index].update(status="updated" if key in existing_keys else "created", id=ids[key])
+
+        return results
+
     @staticmethod
     async def update_wheelset_statistics(
         db: AsyncSession, 
         stat_id: UUID, 
         statistics_data: WheelsetStatisticsUpdate
     ) -> Optional[WheelsetStatisticsModel]:
-        """更新轮对统计数据"""
+        """更新轮对统计数据（更新后的测量值同时记入测量历史）"""
         statistics = await WheelsetStatisticsService.get_wheelset_statistics(db, stat_id)
         if not statistics:
             return None
@@ -99,10 +202,51 @@ class WheelsetStatisticsService:
         for field, value in update_data.items():
             setattr(statistics, field, value)
 
+        await WheelsetStatisticsService.append_measurement_history(
+            db, [{column: getattr(statistics, column) for column in HISTORY_COLUMNS}]
+        )
         await db.commit()
         await db.refresh(statistics)
         return statistics
 
+    @staticmethod
+    async def append_measurement_history(db: AsyncSession, measurements: List[Dict[str, Any]]) -> None:
+        """追加测量历史（不提交，由调用方与当前记录在同一事务中提交）"""
+        if not measurements:
+            return
+        await _ensure_history_partitions(db, {measurement["inspection_date"] for measurement in measurements})
+        now = datetime.utcnow()
+        rows = [
+            {**{column: measurement.get(column) for column in HISTORY_COLUMNS}, "id": uuid.uuid4(), "recorded_at": now}
+            for measurement in measurements
+        ]
+        for chunk in _chunked(rows, UPSERT_CHUNK_SIZE):
+            await db.execute(insert(WheelsetMeasurementModel), chunk)
+
+    @staticmethod
+    async def get_measurement_history(
+        db: AsyncSession,
+        vehicle_id: UUID,
+        wheelset_position: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> tuple[List[WheelsetMeasurementModel], Optional[str]]:
+        """获取车辆（或单个轮对位置）的测量历史，按检查日期倒序，返回 (数据列表, 下一页游标)"""
+        query = select(WheelsetMeasurementModel).where(WheelsetMeasurementModel.vehicle_id == vehicle_id)
+        if wheelset_position:
+            query = query.where(WheelsetMeasurementModel.wheelset_position == wheelset_position)
+        # 日期条件可裁剪无关的月分区
+        if date_from:
+            query = query.where(WheelsetMeasurementModel.inspection_date >= date_from)
+        if date_to:
+            query = query.where(WheelsetMeasurementModel.inspection_date <= date_to)
+
+        query = paginate_keyset(query, MEASUREMENT_HISTORY_SORT_KEY, limit, cursor=cursor, descending=True)
+        result = await db.execute(query)
+        return split_page(result.scalars().all(), limit, MEASUREMENT_HISTORY_SORT_KEY)
+
     @staticmethod
     async def delete_wheelset_statistics(db: AsyncSession, stat_id: UUID) -> bool:
         """删除轮对统计数据"""
@@ -119,22 +263,68 @@ class WheelsetStatisticsService:
         db: AsyncSession,
         skip: int = 0,
         limit: int = 100,
-        status: Optional[str] = None
-    ) -> tuple[List[WheelsetStatisticsModel], int]:
-        """获取所有轮对统计数据"""
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True
+    ) -> tuple[List[WheelsetStatisticsModel], Optional[int], Optional[str]]:
+        """获取所有轮对统计数据，返回 (数据列表, 总数, 下一页游标)"""
         query = select(WheelsetStatisticsModel)
         
         if status:
             query = query.where(WheelsetStatisticsModel.status == status)
         
+        return await WheelsetStatisticsService._paginate(db, query, skip, limit, cursor, with_total)
+
+    @staticmethod
+    async def _paginate(
+        db: AsyncSession,
+        query,
+        skip: int,
+        limit: int,
+        cursor: Optional[str],
+        with_total: bool
+    ) -> tuple[List[WheelsetStatisticsModel], Optional[int], Optional[str]]:
+        """按检查日期倒序分页；提供 cursor 时按游标翻页（忽略 skip）"""
         # 获取总数
-        count_query = select(func.count()).select_from(query.subquery())
-        count_result = await db.execute(count_query)
-        total = count_result.scalar_one()
+        total = None
+        if with_total:
+            count_query = select(func.count()).select_from(query.subquery())
+            count_result = await db.execute(count_query)
+            total = count_result.scalar_one()
         
         # 获取分页数据
-        query = query.offset(skip).limit(limit)
+        query = paginate_keyset(query, WHEELSET_STATISTICS_SORT_KEY, limit, cursor=cursor, descending=True, skip=skip)
         result = await db.execute(query)
-        statistics = result.scalars().all()
+        statistics, next_cursor = split_page(result.scalars().all(), limit, WHEELSET_STATISTICS_SORT_KEY)
         
-        return statistics, total
\ No newline at end of file
+        return statistics, total, next_cursor
+
+
+async def _ensure_history_partitions(db: AsyncSession, inspection_dates: Iterable[date]) -> None:
+    """PostgreSQL 上确保测量历史的月分区存在（未执行迁移 005 时跳过）"""
+    global _partition_function_available
+    if db.bind.dialect.name != "postgresql":
+        return
+    if _partition_function_available is None:
+        result = await db.execute(text("SELECT to_regproc('ensure_wheelset_measurement_partition') IS NOT NULL"))
+        _partition_function_available = bool(result.scalar())
+        if not _partition_function_available:
+            logger.warning("wheelset_measurements is not partitioned, run migration 005 to enable monthly partitions")
+    if not _partition_function_available:
+        return
+    for month in sorted({inspection_date.replace(day=1) for inspection_date in inspection_dates}):
+        await db.execute(text("SELECT ensure_wheelset_measurement_partition(:month)"), {"month": month})
+
+
+def _dialect_insert(dialect_name: str):
+    """支持 ON CONFLICT 的 insert 构造函数"""
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    if dialect_name == "sqlite":
+        return sqlite.insert
+    raise ValueError(f"Bulk upsert is not supported on {dialect_name}")
+
+
+def _chunked(items: List[Any], size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
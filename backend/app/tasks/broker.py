@@ -0,0 +1,323 @@
+"""
+后台任务队列代理
+
+提供可替换的任务存储/分发后端：
+- memory://           进程内队列（开发、测试），已结束的任务按保留时间和数量上限淘汰
+- sqlite:///path.db   SQLite文件，多个进程可共享同一队列；领取的任务带租约，
+                      工作进程崩溃或重启后租约过期的任务重新入队
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+FINISHED_STATUSES = ("completed", "failed")
+
+
+class JobBroker(ABC):
+    """任务代理基类"""
+
+    @abstractmethod
+    async def enqueue(self, job_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """提交任务，返回任务记录"""
+
+    @abstractmethod
+    async def claim(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        """领取一个排队中的任务并标记为运行中，超时无任务返回 None"""
+
+    @abstractmethod
+    async def update(self, job_id: str, **fields: Any) -> None:
+        """更新任务记录字段"""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务记录"""
+
+    @abstractmethod
+    async def release(self, job_id: str) -> None:
+        """交还运行中的任务（工作协程停止时调用），任务重新排队且不计入领取次数"""
+
+    async def heartbeat(self, job_id: str) -> None:
+        """续租运行中的任务（进程内代理随进程退出，无需续租）"""
+
+    async def close(self) -> None:
+        """释放资源（可重复调用）"""
+
+    @staticmethod
+    def new_job(job_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """创建新的任务记录"""
+        return {
+            "id": str(uuid.uuid4()),
+            "job_type": job_type,
+            "payload": payload,
+            "status": "queued",
+            "total": 0,
+            "processed": 0,
+            "failed": 0,
+            "throughput": 0.0,
+            "result": None,
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "attempts": 0,
+        }
+
+
+class InMemoryBroker(JobBroker):
+    """进程内任务代理"""
+
+    def __init__(self, retention_seconds: float = 3600, max_retained: int = 1000):
+        self.retention_seconds = retention_seconds
+        self.max_retained = max_retained
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # 已结束任务 -> 结束时刻（单调时钟），按结束顺序排列
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        # 延迟创建，保证队列绑定到运行中的事件循环
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._evict()
+        job = self.new_job(job_type, payload)
+        self._jobs[job["id"]] = job
+        await self.queue.put(job["id"])
+        return dict(job)
+
+    async def claim(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        try:
+            job_id = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        job = self._jobs[job_id]
+        job["status"] = "running"
+        job["started_at"] = datetime.utcnow().isoformat()
+        job["attempts"] += 1
+        return dict(job)
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        if job_id in self._jobs:
+            self._jobs[job_id].update(fields)
+            if fields.get("status") in FINISHED_STATUSES:
+                self._finished[job_id] = time.monotonic()
+
+    async def release(self, job_id: str) -> None:
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] != "running":
+            return
+        job.update(status="queued", started_at=None, attempts=max(0, job["attempts"] - 1))
+        self.queue.put_nowait(job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._evict()
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    def _evict(self) -> None:
+        """淘汰超过保留时间的已结束任务，并将已结束任务数限制在 max_retained 以内（任务结果含整批车辆明细）"""
+        expires = time.monotonic() - self.retention_seconds
+        while self._finished:
+            job_id, finished = next(iter(self._finished.items()))
+            if finished > expires and len(self._finished) <= self.max_retained:
+                break
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+
+class SQLiteBroker(JobBroker):
+    """
+    基于SQLite文件的任务代理
+
+    领取任务时写入租约到期时间 lease_expires_at，运行期间由工作进程定期 heartbeat 续租。
+    租约过期仍为运行中的任务视为工作进程已退出，下次领取时重新分配；
+    领取次数达到 max_attempts 的任务不再重试，标记为失败。
+    连接在 close 后的下一次调用时重新打开，同一实例可随应用多次启停。
+    """
+
+    POLL_INTERVAL = 0.2  # 轮询间隔（秒）
+
+    def __init__(self, path: str, lease_seconds: float = 300, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        with self._lock:
+            self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """返回数据库连接，未打开或已关闭时重新打开（调用方持有 _lock）"""
+        if self._conn is not None:
+            return self._conn
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS prediction_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                lease_expires_at TEXT,
+                data TEXT NOT NULL
+            )
+            """
+        )
+        # 旧版本创建的队列文件没有租约列
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(prediction_jobs)")}
+        if "lease_expires_at" not in columns:
+            self._conn.execute("ALTER TABLE prediction_jobs ADD COLUMN lease_expires_at TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_prediction_jobs_status_created ON prediction_jobs (status, created_at)"
+        )
+        return self._conn
+
+    def _lease_expires_at(self) -> str:
+        return (datetime.utcnow() + timedelta(seconds=self.lease_seconds)).isoformat()
+
+    def _enqueue(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO prediction_jobs (id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                (job["id"], job["status"], job["created_at"], json.dumps(job, ensure_ascii=False))
+            )
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = datetime.utcnow().isoformat()
+                while True:
+                    # 排队中的任务，或租约已过期的运行中任务（无租约的运行中任务来自旧版本，同样视为过期）
+                    row = conn.execute(
+                        """
+                        SELECT id, data FROM prediction_jobs
+                        WHERE status = 'queued'
+                           OR (status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?))
+                        ORDER BY created_at LIMIT 1
+                        """,
+                        (now,)
+                    ).fetchone()
+                    if row is None:
+                        conn.execute("COMMIT")
+                        return None
+                    job = json.loads(row[1])
+                    if job.get("attempts", 0) >= self.max_attempts:
+                        job.update(status="failed", error="Job lease expired too many times", finished_at=now)
+                        conn.execute(
+                            "UPDATE prediction_jobs SET status = ?, lease_expires_at = NULL, data = ? WHERE id = ?",
+                            (job["status"], json.dumps(job, ensure_ascii=False), job["id"])
+                        )
+                        continue
+                    job["status"] = "running"
+                    job["started_at"] = now
+                    job["attempts"] = job.get("attempts", 0) + 1
+                    conn.execute(
+                        "UPDATE prediction_jobs SET status = ?, lease_expires_at = ?, data = ? WHERE id = ?",
+                        (job["status"], self._lease_expires_at(), json.dumps(job, ensure_ascii=False), job["id"])
+                    )
+                    conn.execute("COMMIT")
+                    return job
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _heartbeat(self, job_id: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE prediction_jobs SET lease_expires_at = ? WHERE id = ? AND status = 'running'",
+                (self._lease_expires_at(), job_id)
+            )
+
+    def _release(self, job_id: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT data FROM prediction_jobs WHERE id = ? AND status = 'running'", (job_id,)
+            ).fetchone()
+            if row is None:
+                return
+            job = json.loads(row[0])
+            job.update(status="queued", started_at=None, attempts=max(0, job.get("attempts", 0) - 1))
+            conn.execute(
+                "UPDATE prediction_jobs SET status = ?, lease_expires_at = NULL, data = ? WHERE id = ?",
+                (job["status"], json.dumps(job, ensure_ascii=False), job_id)
+            )
+
+    def _update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT data FROM prediction_jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            job = json.loads(row[0])
+            job.update(fields)
+            conn.execute(
+                "UPDATE prediction_jobs SET status = ?, data = ? WHERE id = ?",
+                (job["status"], json.dumps(job, ensure_ascii=False), job_id)
+            )
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT data FROM prediction_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        job = self.new_job(job_type, payload)
+        await asyncio.to_thread(self._enqueue, job)
+        return job
+
+    async def claim(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            job = await asyncio.to_thread(self._claim)
+            if job is not None or loop.time() >= deadline:
+                return job
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        await asyncio.to_thread(self._update, job_id, fields)
+
+    async def release(self, job_id: str) -> None:
+        await asyncio.to_thread(self._release, job_id)
+
+    async def heartbeat(self, job_id: str) -> None:
+        await asyncio.to_thread(self._heartbeat, job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_broker(
+    url: str,
+    lease_seconds: float = 300,
+    max_attempts: int = 3,
+    retention_seconds: float = 3600,
+    max_retained: int = 1000
+) -> JobBroker:
+    """根据URL创建任务代理"""
+    if url.startswith("memory://"):
+        return InMemoryBroker(retention_seconds, max_retained)
+    if url.startswith("sqlite:///"):
+        return SQLiteBroker(url[len("sqlite:///"):], lease_seconds, max_attempts)
+    raise ValueError(f"Unsupported job broker URL: {url}")
@@ -0,0 +1,167 @@
+"""
+预测后台任务
+
+POST /predictions/jobs 提交的车队/线路预测在此由工作协程池执行，
+执行过程中持续向任务代理回写进度和吞吐量。
+"""
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.vehicle import Vehicle
+from app.services.prediction_service import PredictionService
+from app.tasks.broker import JobBroker, create_broker
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_JOB_TYPE = "prediction"
+
+# 每处理该数量车辆回写一次进度
+PROGRESS_UPDATE_INTERVAL = 50
+
+
+class PredictionJobRunner:
+    """预测任务工作池"""
+
+    def __init__(self, broker: JobBroker, num_workers: int = 1):
+        self.broker = broker
+        self.num_workers = num_workers
+        self._workers: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """提交预测任务"""
+        return await self.broker.enqueue(PREDICTION_JOB_TYPE, payload)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """查询任务状态"""
+        return await self.broker.get(job_id)
+
+    def start(self) -> None:
+        """启动工作协程"""
+        self._stopping = False
+        for _ in range(self.num_workers - len(self._workers)):
+            self._workers.append(asyncio.create_task(self._work()))
+        logger.info(f"Prediction job runner started with {len(self._workers)} workers")
+
+    async def stop(self) -> None:
+        """停止工作协程，运行中的任务被取消并交还任务代理重新排队（不关闭任务代理，可再次 start）"""
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self) -> None:
+        while not self._stopping:
+            job = await self.broker.claim(timeout=1.0)
+            if job is None:
+                continue
+            heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+            try:
+                await self.run_job(job)
+            except asyncio.CancelledError:
+                # 停止或重新部署：任务重新排队，由本进程或其他进程下次领取时重跑
+                try:
+                    await self.broker.release(job["id"])
+                except Exception as e:
+                    # 交还失败时任务保持运行中，租约过期后同样会重新分配
+                    logger.warning(f"Prediction job {job['id']} release failed: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"Prediction job {job['id']} failed: {e}")
+                await self.broker.update(
+                    job["id"], status="failed", error=str(e), finished_at=datetime.utcnow().isoformat()
+                )
+            finally:
+                heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """任务运行期间定期续租，租约过期前续租三次"""
+        while True:
+            await asyncio.sleep(settings.PREDICTION_JOB_LEASE_SECONDS / 3)
+            try:
+                await self.broker.heartbeat(job_id)
+            except Exception as e:
+                logger.warning(f"Prediction job {job_id} heartbeat failed: {e}")
+
+    async def run_job(self, job: Dict[str, Any]) -> None:
+        """执行单个预测任务"""
+        payload = job["payload"]
+        vehicle_ids = await _resolve_job_vehicles(payload)
+        await self.broker.update(job["id"], total=len(vehicle_ids))
+
+        started = time.perf_counter()
+        processed = 0
+        results = []
+        failed = []
+        risk_counts = {"high_risk": 0, "medium_risk": 0, "low_risk": 0}
+        async for vehicle_id, outcome, error in PredictionService.iter_batch_predictions(
+            vehicle_ids, payload.get("prediction_horizon_days", 180),
+            incremental=payload.get("incremental", False)
+        ):
+            processed += 1
+            if error:
+                failed.append({"vehicle_id": vehicle_id, "error": error})
+            else:
+                predictions, risk_level, overall_confidence, _ = outcome
+                risk_key = f"{risk_level}_risk"
+                if risk_key in risk_counts:
+                    risk_counts[risk_key] += 1
+                results.append({
+                    "vehicle_id": vehicle_id,
+                    "risk_level": risk_level,
+                    "overall_confidence": overall_confidence,
+                    "next_maintenance_date": min(p.replacement_date for p in predictions).isoformat()
+                })
+            if processed % PROGRESS_UPDATE_INTERVAL == 0:
+                await self.broker.update(
+                    job["id"], processed=processed, failed=len(failed),
+                    throughput=_throughput(processed, started)
+                )
+
+        await self.broker.update(
+            job["id"],
+            status="completed",
+            processed=processed,
+            failed=len(failed),
+            throughput=_throughput(processed, started),
+            result={"summary": risk_counts, "predictions": results, "failed": failed},
+            finished_at=datetime.utcnow().isoformat()
+        )
+
+
+async def _resolve_job_vehicles(payload: Dict[str, Any]) -> List[str]:
+    """根据任务范围查询需要预测的车辆ID（排除已退役车辆）"""
+    query = select(Vehicle.id).where(Vehicle.status != "retired")
+    if payload.get("scope") == "line":
+        query = query.where(Vehicle.line_number == payload["line_number"])
+    query = query.order_by(Vehicle.vehicle_code)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(query)
+        return [str(vehicle_id) for vehicle_id in result.scalars()]
+
+
+def _throughput(processed: int, started: float) -> float:
+    """计算吞吐量（辆/秒）"""
+    elapsed = time.perf_counter() - started
+    return round(processed / elapsed, 2) if elapsed > 0 else 0.0
+
+
+# 全局任务工作池
+prediction_job_runner = PredictionJobRunner(
+    create_broker(
+        settings.PREDICTION_JOB_BROKER_URL,
+        lease_seconds=settings.PREDICTION_JOB_LEASE_SECONDS,
+        max_attempts=settings.PREDICTION_JOB_MAX_ATTEMPTS,
+        retention_seconds=settings.PREDICTION_JOB_RETENTION_SECONDS,
+        max_retained=settings.PREDICTION_JOB_MAX_RETAINED
+    ),
+    num_workers=settings.PREDICTION_JOB_WORKERS
+)
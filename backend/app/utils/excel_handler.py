@@ -0,0 +1,72 @@
+"""
+表格文件读取工具
+
+按块迭代 CSV / Excel(.xlsx) 文件的数据行，不一次性加载整个文件。
+"""
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+import csv
+import io
+
+import openpyxl
+
+# 数据行从表格第2行开始（第1行为表头）
+FIRST_DATA_ROW = 2
+
+RowChunk = List[Tuple[int, Dict[str, Any]]]
+
+
+def iter_row_chunks(file: BinaryIO, extension: str, chunk_size: int = 5000) -> Iterator[RowChunk]:
+    """
+    按块迭代表格数据行
+
+    每块为 [(行号, {表头: 值})] 列表，行号与表格中显示的行号一致；空行被跳过。
+    """
+    extension = extension.lower()
+    if extension == ".csv":
+        rows = _iter_csv_rows(file)
+    elif extension == ".xlsx":
+        rows = _iter_xlsx_rows(file)
+    else:
+        raise ValueError(f"Unsupported file type: {extension}")
+
+    chunk: RowChunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_csv_rows(file: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = [column.strip() for column in next(reader, [])]
+        for row_number, values in enumerate(reader, start=FIRST_DATA_ROW):
+            if not any(value.strip() for value in values):
+                continue
+            yield row_number, _row_dict(header, values)
+    finally:
+        # 不随包装器关闭上传文件
+        text.detach()
+
+
+def _iter_xlsx_rows(file: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(column).strip() if column is not None else "" for column in next(rows, ())]
+        for row_number, values in enumerate(rows, start=FIRST_DATA_ROW):
+            if all(value is None or str(value).strip() == "" for value in values):
+                continue
+            yield row_number, _row_dict(header, values)
+    finally:
+        workbook.close()
+
+
+def _row_dict(header: List[str], values: Any) -> Dict[str, Any]:
+    """按表头组装行数据，缺少的单元格补 None"""
+    values = list(values)
+    return {column: values[i] if i < len(values) else None for i, column in enumerate(header)}
@@ -0,0 +1,106 @@
+"""
+游标（keyset）分页工具
+
+游标为排序键取值的 JSON 经 URL 安全 base64 编码后的不透明字符串。
+翻页条件按排序键展开为 (k1 < v1) OR (k1 = v1 AND k2 < v2) ... 的形式，
+可直接利用排序键上的索引，深分页与首页代价相同。
+"""
+from typing import Any, List, Optional, Sequence, Tuple
+from datetime import date, datetime
+from uuid import UUID
+import base64
+import json
+
+from sqlalchemy import and_, or_
+
+# 以列表形式返回的接口通过响应头携带分页信息
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """将排序键取值编码为游标"""
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """解析游标并按列类型还原取值，游标无效时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    try:
+        return [_from_json(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError("Invalid cursor")
+
+
+def keyset_order(columns: Sequence[Any], descending: bool = False) -> List[Any]:
+    """排序键对应的 ORDER BY 子句"""
+    return [column.desc() if descending else column.asc() for column in columns]
+
+
+def keyset_filter(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """位于游标之后的行的过滤条件"""
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        after = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+
+def paginate_keyset(
+    query,
+    columns: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    skip: int = 0
+):
+    """
+    为查询加上键集排序与翻页条件
+
+    提供 cursor 时按游标翻页并忽略 skip；多取一行用于判断是否还有下一页，
+    结果交给 split_page 截断并生成下一页游标。
+    """
+    if cursor:
+        query = query.where(keyset_filter(columns, decode_cursor(cursor, columns), descending))
+    elif skip:
+        query = query.offset(skip)
+    return query.order_by(*keyset_order(columns, descending)).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int, columns: Sequence[Any]) -> Tuple[List[Any], Optional[str]]:
+    """截断多取的一行，返回 (当前页数据, 下一页游标)"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _from_json(column: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
@@ -0,0 +1,10 @@
+"""数据验证工具"""
+
+from pydantic import ValidationError
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """将 Pydantic 校验错误整理为一行说明，如 "date: Input should be a valid date" """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
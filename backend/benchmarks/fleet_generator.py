@@ -0,0 +1,275 @@
+"""
+合成车队数据生成器
+
+车辆、当前轮对统计和大修计划由 factory-boy 工厂生成（字段取值来自 Faker）；
+数量大的轮对测量历史和磨耗趋势按车辆分批用 NumPy 生成：
+- 日均走行里程、各部件磨耗率因车而异，磨耗值随累计里程线性减小并叠加测量噪声；
+- 制动片、受电弓磨到更换阈值后恢复新品厚度（锯齿形），轮对在镟修日恢复轮径。
+所有数据以批量 INSERT（executemany）分批写入，适用于任意 SQLAlchemy 异步库（SQLite / PostgreSQL）。
+
+调用前需已设置 DATABASE_URL 并将 backend 目录加入 sys.path（见 run_benchmarks.py）。
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Sequence
+import random
+import re
+import uuid
+
+import factory
+import factory.random
+import numpy as np
+from sqlalchemy import insert
+
+from app.models.overhaul import OverhaulLevel, OverhaulPlan, OverhaulStatus, OverhaulType
+from app.models.prediction import WearTrendData, WheelsetMeasurement, WheelsetStatistics
+from app.models.vehicle import Vehicle
+from app.services.prediction_engine import COMPONENTS, MIN_THRESHOLDS, WHEELSET_INDEX
+
+LINES = ("1", "2", "4", "5", "6", "8", "10", "13")
+VEHICLE_MODELS = ("A型", "B型", "As型")
+# 大修计划列车编号格式 Tr01-Tr16（见 OverhaulPlanBase.train_number）
+TRAIN_NUMBERS = tuple(f"Tr{i:02d}" for i in range(1, 17))
+WHEELSET_POSITIONS = ("1A", "1B", "2A", "2B", "3A", "3B", "4A", "4B")
+
+# 各部件新品磨耗值（轮径/厚度 mm）与车队平均磨耗率（mm/万km）
+NEW_WEAR_VALUES = np.array([870.0, 30.0, 10.0])
+MEAN_WEAR_RATES = np.array([0.15, 0.5, 0.3])
+# 磨耗值距最小阈值该余量时更换（制动片、受电弓）
+REPLACEMENT_MARGIN = np.array([0.0, 2.0, 1.0])
+MEASUREMENT_NOISE = np.array([0.05, 0.1, 0.05])
+# 镟修前轮对相对新轮径已磨耗量（mm）
+PRE_REWHEELING_WEAR = 3.0
+
+# 形如数字的十六进制串（见 _row_id）
+NUMERIC_HEX = re.compile(r"[0-9]+(e[0-9]+)?")
+
+# 每次写入的行数；趋势数据按该车辆数分批生成，避免一次性占用大量内存
+INSERT_BATCH_SIZE = 5000
+VEHICLE_BATCH_SIZE = 200
+
+
+@dataclass
+class FleetSpec:
+    """合成车队规模"""
+    n_vehicles: int
+    wheelsets_per_vehicle: int = 4
+    years: float = 2.0
+    trend_interval_days: int = 7
+    measurement_interval_days: int = 90
+    overhaul_plans_per_vehicle: float = 0.2
+    seed: int = 42
+
+
+def _row_id() -> uuid.UUID:
+    """
+    生成主键 UUID
+
+    SQLite 中 UUID 类型的列为 NUMERIC 亲和性，十六进制串恰好形如数字（如 "12e45..."）时按数值存储，
+    指数过大时都变为 Inf 而违反主键唯一约束；百万行级数据会遇到这种情况，生成时跳过这类值。
+    """
+    while True:
+        value = uuid.uuid4()
+        if not NUMERIC_HEX.fullmatch(value.hex):
+            return value
+
+
+class VehicleFactory(factory.DictFactory):
+    id = factory.LazyFunction(_row_id)
+    vehicle_code = factory.Sequence(lambda n: f"BM{n:05d}")
+    model = factory.Faker("random_element", elements=VEHICLE_MODELS)
+    line_number = factory.Faker("random_element", elements=LINES)
+    manufacture_date = factory.Faker("date_between", start_date="-15y", end_date="-4y")
+    commissioning_date = factory.LazyAttribute(lambda o: o.manufacture_date + timedelta(days=180))
+    total_mileage = 0.0  # 由趋势数据的最新里程回填
+    status = factory.Faker("random_element", elements=OrderedDict(active=0.9, maintenance=0.08, retired=0.02))
+    last_inspection_date = factory.Faker("date_between", start_date="-90d", end_date="today")
+
+
+class WheelsetStatisticsFactory(factory.DictFactory):
+    id = factory.LazyFunction(_row_id)
+    vehicle_id = None
+    wheelset_position = None
+    current_diameter = factory.Faker("pyfloat", min_value=845, max_value=870, right_digits=2)
+    flange_thickness = factory.Faker("pyfloat", min_value=26, max_value=33, right_digits=2)
+    flange_height = factory.Faker("pyfloat", min_value=27, max_value=32, right_digits=2)
+    qr_value = factory.Faker("pyfloat", min_value=6.5, max_value=12, right_digits=2)
+    mileage_at_measurement = None
+    last_rewheeling_date = None
+    next_rewheeling_mileage = factory.LazyAttribute(lambda o: (o.mileage_at_measurement or 0.0) + 150000.0)
+    wear_rate = factory.Faker("pyfloat", min_value=0.08, max_value=0.25, right_digits=4)
+    status = factory.Faker("random_element", elements=OrderedDict(normal=0.85, warning=0.12, critical=0.03))
+    inspection_date = None
+    inspector = factory.Faker("name", locale="zh_CN")
+
+
+class OverhaulPlanFactory(factory.DictFactory):
+    id = factory.LazyFunction(_row_id)
+    plan_code = factory.Sequence(lambda n: f"OH-BM-{n:06d}")
+    vehicle_id = None
+    train_number = factory.Faker("random_element", elements=TRAIN_NUMBERS)
+    overhaul_type = factory.Faker("random_element", elements=list(OverhaulType))
+    overhaul_level = factory.Faker("random_element", elements=list(OverhaulLevel))
+    status = factory.Faker("random_element", elements=list(OverhaulStatus))
+    planned_start_date = factory.Faker("date_between", start_date="-2y", end_date="+1y")
+    planned_end_date = factory.LazyAttribute(lambda o: o.planned_start_date + timedelta(days=30))
+    actual_start_date = factory.LazyAttribute(
+        lambda o: o.planned_start_date if o.status in (OverhaulStatus.IN_PROGRESS, OverhaulStatus.COMPLETED) else None
+    )
+    actual_end_date = factory.LazyAttribute(
+        lambda o: o.planned_start_date + timedelta(days=random.randint(20, 45)) if o.status == OverhaulStatus.COMPLETED else None
+    )
+    estimated_cost = factory.Faker("pyfloat", min_value=2e5, max_value=5e6, right_digits=2)
+    actual_cost = factory.LazyAttribute(
+        lambda o: round(o.estimated_cost * random.uniform(0.85, 1.25), 2) if o.status == OverhaulStatus.COMPLETED else None
+    )
+    contractor = factory.Faker("company", locale="zh_CN")
+    workshop = factory.Faker("random_element", elements=("车辆段一车间", "车辆段二车间", "检修基地"))
+    responsible_person = factory.Faker("name", locale="zh_CN")
+
+
+async def generate_fleet(session_factory, spec: FleetSpec) -> Dict[str, int]:
+    """按 spec 生成车队并写入数据库，返回各表写入行数"""
+    factory.random.reseed_random(spec.seed)
+    random.seed(spec.seed)
+    rng = np.random.default_rng(spec.seed)
+    for factory_class in (VehicleFactory, OverhaulPlanFactory):
+        factory_class.reset_sequence(force=True)
+
+    today = date.today()
+    n_days = int(spec.years * 365)
+    trend_days = np.arange(-n_days, 1, spec.trend_interval_days) + today.toordinal()
+    measurement_days = np.arange(-n_days, 1, spec.measurement_interval_days) + today.toordinal()
+    positions = WHEELSET_POSITIONS[:spec.wheelsets_per_vehicle]
+
+    vehicles = VehicleFactory.build_batch(spec.n_vehicles)
+    # 每车日均走行里程、历史起点里程和各部件磨耗率
+    daily_mileage = rng.uniform(300.0, 500.0, spec.n_vehicles)
+    start_mileage = rng.uniform(1e5, 1.5e6, spec.n_vehicles)
+    wear_rates = MEAN_WEAR_RATES * rng.uniform(0.7, 1.3, (spec.n_vehicles, len(COMPONENTS)))
+    rewheeling_day = today.toordinal() - rng.integers(30, n_days, spec.n_vehicles)
+    for row, vehicle in enumerate(vehicles):
+        vehicle["total_mileage"] = round(float(start_mileage[row] + daily_mileage[row] * n_days), 1)
+
+    counts = {"vehicles": 0, "wheelset_statistics": 0, "wheelset_measurements": 0, "wear_trend_data": 0, "overhaul_plans": 0}
+    async with session_factory() as db:
+        counts["vehicles"] = await _insert(db, Vehicle, vehicles)
+
+        for start in range(0, spec.n_vehicles, VEHICLE_BATCH_SIZE):
+            rows = slice(start, min(start + VEHICLE_BATCH_SIZE, spec.n_vehicles))
+            batch = vehicles[rows]
+            trend_rows = list(_trend_rows(
+                rng, batch, trend_days, start_mileage[rows], daily_mileage[rows], wear_rates[rows], rewheeling_day[rows]
+            ))
+            counts["wear_trend_data"] += await _insert(db, WearTrendData, trend_rows)
+
+            stats_rows, measurement_rows = _wheelset_rows(
+                rng, batch, positions, measurement_days, start_mileage[rows], daily_mileage[rows],
+                wear_rates[rows, WHEELSET_INDEX], rewheeling_day[rows], trend_days[0]
+            )
+            counts["wheelset_statistics"] += await _insert(db, WheelsetStatistics, stats_rows)
+            counts["wheelset_measurements"] += await _insert(db, WheelsetMeasurement, measurement_rows)
+
+        n_plans = int(round(spec.n_vehicles * spec.overhaul_plans_per_vehicle))
+        plan_vehicles = rng.integers(0, spec.n_vehicles, n_plans)
+        plans = [
+            OverhaulPlanFactory.build(
+                vehicle_id=vehicles[row]["id"],
+                mileage_at_overhaul=vehicles[row]["total_mileage"]
+            )
+            for row in plan_vehicles
+        ]
+        counts["overhaul_plans"] = await _insert(db, OverhaulPlan, plans)
+        await db.commit()
+    return counts
+
+
+def _trend_rows(
+    rng: np.random.Generator,
+    vehicles: Sequence[Dict[str, Any]],
+    trend_days: np.ndarray,
+    start_mileage: np.ndarray,
+    daily_mileage: np.ndarray,
+    wear_rates: np.ndarray,
+    rewheeling_day: np.ndarray
+) -> Iterator[Dict[str, Any]]:
+    """一批车辆各部件的趋势行"""
+    dates = [date.fromordinal(int(day)) for day in trend_days]
+    mileage_at = start_mileage[:, None] + daily_mileage[:, None] * (trend_days - trend_days[0])
+    for col, component in enumerate(COMPONENTS):
+        if col == WHEELSET_INDEX:
+            # 镟修前为上一轮廓（起点已磨耗 PRE_REWHEELING_WEAR），镟修日起从新轮径重新计算
+            after = trend_days >= rewheeling_day[:, None]
+            rewheeling_mileage = start_mileage + daily_mileage * (rewheeling_day - trend_days[0])
+            base_mileage = np.where(after, rewheeling_mileage[:, None], mileage_at[:, :1])
+            worn = wear_rates[:, col, None] * (mileage_at - base_mileage) / 1e4 + np.where(after, 0.0, PRE_REWHEELING_WEAR)
+        else:
+            # 磨到更换阈值后换新
+            worn = (wear_rates[:, col, None] * mileage_at / 1e4) % (NEW_WEAR_VALUES[col] - MIN_THRESHOLDS[col] - REPLACEMENT_MARGIN[col])
+        wear = NEW_WEAR_VALUES[col] - worn + rng.normal(0.0, MEASUREMENT_NOISE[col], worn.shape)
+        for row, vehicle in enumerate(vehicles):
+            vehicle_id = vehicle["id"]
+            for i, day in enumerate(dates):
+                yield {
+                    "id": _row_id(),
+                    "vehicle_id": vehicle_id,
+                    "component_type": component,
+                    "date": day,
+                    "wear_value": round(float(wear[row, i]), 3),
+                    "mileage": round(float(mileage_at[row, i]), 1),
+                }
+
+
+def _wheelset_rows(
+    rng: np.random.Generator,
+    vehicles: Sequence[Dict[str, Any]],
+    positions: Sequence[str],
+    measurement_days: np.ndarray,
+    start_mileage: np.ndarray,
+    daily_mileage: np.ndarray,
+    wear_rates: np.ndarray,
+    rewheeling_day: np.ndarray,
+    first_day: int
+):
+    """一批车辆各轮对位置的测量历史及当前统计（取最近一次测量）"""
+    stats_rows: List[Dict[str, Any]] = []
+    measurement_rows: List[Dict[str, Any]] = []
+    for row, vehicle in enumerate(vehicles):
+        rewheeling_date = date.fromordinal(int(rewheeling_day[row]))
+        for position in positions:
+            new_diameter = NEW_WEAR_VALUES[WHEELSET_INDEX] - rng.uniform(0.0, 2.0)
+            for day in measurement_days:
+                mileage = start_mileage[row] + daily_mileage[row] * (day - first_day)
+                if day >= rewheeling_day[row]:
+                    worn = wear_rates[row] * daily_mileage[row] * (day - rewheeling_day[row]) / 1e4
+                else:
+                    worn = PRE_REWHEELING_WEAR + wear_rates[row] * daily_mileage[row] * (day - first_day) / 1e4
+                diameter = new_diameter - worn + rng.normal(0.0, MEASUREMENT_NOISE[WHEELSET_INDEX])
+                measurement_rows.append({
+                    "id": _row_id(),
+                    "vehicle_id": vehicle["id"],
+                    "wheelset_position": position,
+                    "current_diameter": round(float(diameter), 2),
+                    "mileage_at_measurement": round(float(mileage), 1),
+                    "last_rewheeling_date": rewheeling_date if day >= rewheeling_day[row] else None,
+                    "wear_rate": round(float(wear_rates[row]), 4),
+                    "status": "normal",
+                    "inspection_date": date.fromordinal(int(day)),
+                })
+            latest = measurement_rows[-1]
+            stats_rows.append(WheelsetStatisticsFactory.build(
+                vehicle_id=vehicle["id"],
+                wheelset_position=position,
+                current_diameter=latest["current_diameter"],
+                mileage_at_measurement=latest["mileage_at_measurement"],
+                last_rewheeling_date=rewheeling_date,
+                inspection_date=latest["inspection_date"]
+            ))
+    return stats_rows, measurement_rows
+
+
+async def _insert(db, model, rows: List[Dict[str, Any]]) -> int:
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        await db.execute(insert(model.__table__), rows[start:start + INSERT_BATCH_SIZE])
+    return len(rows)
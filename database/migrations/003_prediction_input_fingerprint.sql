@@ -0,0 +1,9 @@
+-- =====================================================
+-- 增量预测：预测结果输入指纹
+-- Incremental Prediction: input fingerprint on prediction results
+-- Version: 3.0
+-- =====================================================
+
+ALTER TABLE prediction_results ADD COLUMN IF NOT EXISTS input_fingerprint VARCHAR(64);
+
+COMMENT ON COLUMN prediction_results.input_fingerprint IS '预测输入指纹（里程、最新轮对检查、趋势数据水位线、预测范围、算法版本）';
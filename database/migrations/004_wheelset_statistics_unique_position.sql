@@ -0,0 +1,20 @@
+-- =====================================================
+-- 轮对统计：车辆+轮对位置唯一约束（批量 upsert 所需）
+-- Wheelset Statistics: unique (vehicle_id, wheelset_position) for bulk upsert
+-- Version: 4.0
+-- =====================================================
+
+-- 清理重复记录，保留每个车辆+位置最近一次检查的记录
+DELETE FROM wheelset_statistics ws
+USING (
+    SELECT id,
+           ROW_NUMBER() OVER (
+               PARTITION BY vehicle_id, wheelset_position
+               ORDER BY inspection_date DESC, updated_at DESC NULLS LAST
+           ) AS rank
+    FROM wheelset_statistics
+) ranked
+WHERE ws.id = ranked.id AND ranked.rank > 1;
+
+ALTER TABLE wheelset_statistics
+    ADD CONSTRAINT uq_wheelset_statistics_vehicle_position UNIQUE (vehicle_id, wheelset_position);
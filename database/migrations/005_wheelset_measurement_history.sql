@@ -0,0 +1,79 @@
+-- =====================================================
+-- 轮对测量历史（只追加，按检查日期按月分区）
+-- Wheelset Measurement History: append-only, monthly range partitions on inspection_date
+-- Version: 5.0
+-- =====================================================
+-- wheelset_statistics 继续作为每个车辆+轮对位置的当前记录；
+-- 每次测量写入时同时追加一条历史记录到 wheelset_measurements。
+
+CREATE TABLE IF NOT EXISTS wheelset_measurements (
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    inspection_date DATE NOT NULL,
+    vehicle_id UUID NOT NULL REFERENCES vehicles(id),
+    wheelset_position VARCHAR(20) NOT NULL,
+    current_diameter DOUBLE PRECISION NOT NULL,
+    flange_thickness DOUBLE PRECISION,
+    flange_height DOUBLE PRECISION,
+    qr_value DOUBLE PRECISION,
+    mileage_at_measurement DOUBLE PRECISION,
+    last_rewheeling_date DATE,
+    next_rewheeling_mileage DOUBLE PRECISION,
+    wear_rate DOUBLE PRECISION,
+    status VARCHAR(20),
+    inspector VARCHAR(100),
+    notes TEXT,
+    recorded_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (id, inspection_date)
+) PARTITION BY RANGE (inspection_date);
+
+-- 在分区表上创建，自动作用于每个分区
+CREATE INDEX IF NOT EXISTS idx_wheelset_measurements_vehicle_position_date
+    ON wheelset_measurements (vehicle_id, wheelset_position, inspection_date);
+
+-- 创建指定月份的分区（已存在时跳过），应用写入历史前会调用
+CREATE OR REPLACE FUNCTION ensure_wheelset_measurement_partition(month DATE)
+RETURNS VOID AS $$
+DECLARE
+    start_date DATE := date_trunc('month', month)::DATE;
+    end_date DATE := (date_trunc('month', month) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := 'wheelset_measurements_' || to_char(start_date, 'YYYY_MM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF wheelset_measurements FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_date, end_date
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- 预建已有数据所在月份及未来12个月的分区
+DO $$
+DECLARE
+    month DATE;
+BEGIN
+    FOR month IN
+        SELECT DISTINCT date_trunc('month', inspection_date)::DATE FROM wheelset_statistics
+        UNION
+        SELECT generate_series(
+            date_trunc('month', CURRENT_DATE),
+            date_trunc('month', CURRENT_DATE) + INTERVAL '12 months',
+            INTERVAL '1 month'
+        )::DATE
+    LOOP
+        PERFORM ensure_wheelset_measurement_partition(month);
+    END LOOP;
+END;
+$$;
+
+-- 以现有当前记录初始化历史
+INSERT INTO wheelset_measurements (
+    inspection_date, vehicle_id, wheelset_position, current_diameter, flange_thickness, flange_height,
+    qr_value, mileage_at_measurement, last_rewheeling_date, next_rewheeling_mileage, wear_rate,
+    status, inspector, notes, recorded_at
+)
+SELECT
+    inspection_date, vehicle_id, wheelset_position, current_diameter, flange_thickness, flange_height,
+    qr_value, mileage_at_measurement, last_rewheeling_date, next_rewheeling_mileage, wear_rate,
+    status, inspector, notes, COALESCE(updated_at, created_at, NOW())
+FROM wheelset_statistics;
+
+COMMENT ON TABLE wheelset_measurements IS '轮对测量历史（只追加，按检查日期按月分区）';
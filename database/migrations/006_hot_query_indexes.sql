@@ -0,0 +1,30 @@
+-- =====================================================
+-- 热点查询复合索引
+-- Composite indexes for hot prediction / statistics / overhaul queries
+-- Version: 6.0
+-- =====================================================
+-- 使用 CONCURRENTLY 在线建索引，不阻塞写入；该语句不能在事务块中执行，
+-- 请使用 psql 直接执行本文件（不要加 --single-transaction）。
+-- idx_overhaul_items_plan 已由迁移 002 创建。
+
+-- 磨耗趋势：按车辆+部件+日期范围查询、分桶聚合和水位线
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wear_trend_data_vehicle_component_date
+    ON wear_trend_data (vehicle_id, component_type, date);
+
+-- 磨耗预测 / 预测结果：每辆车最新记录
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wear_predictions_vehicle_created
+    ON wear_predictions (vehicle_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prediction_results_vehicle_created
+    ON prediction_results (vehicle_id, created_at);
+
+-- 轮对统计：每辆车最近一次检查；列表游标分页
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wheelset_statistics_vehicle_inspection
+    ON wheelset_statistics (vehicle_id, inspection_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wheelset_statistics_inspection_id
+    ON wheelset_statistics (inspection_date, id);
+
+-- 大修计划：列表游标分页；备件按计划加载
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_overhaul_plans_planned_start_id
+    ON overhaul_plans (planned_start_date, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_overhaul_spare_parts_plan
+    ON overhaul_spare_parts (overhaul_plan_id);